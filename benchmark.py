@@ -0,0 +1,604 @@
+"""Assignment 1 - Grocery Store Benchmarks
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file contains timing benchmarks for the grocery store simulation.
+Run it directly to print the results, for example:
+
+    python benchmark.py queues --sizes 10000 100000 1000000
+
+The fastsim benchmark compares fastsim.assign_lines with
+GroceryStoreSimulation.run on the same events:
+
+    python benchmark.py fastsim --sizes 200000
+
+The trace benchmark measures how much writing a trace slows down a run of
+a Workload preset, which should be less than TRACE_OVERHEAD_LIMIT:
+
+    python benchmark.py trace --preset weekday --repeat 9
+
+The suite benchmark times each stage of the simulation pipeline and can save
+the results, so that two commits can be compared:
+
+    python benchmark.py suite --out before.json
+    python benchmark.py suite --out after.json
+    python benchmark.py compare --files before.json after.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from typing import Callable
+
+from container import Container, PriorityQueue, HeapPriorityQueue, \
+    CalendarQueue
+from event import Event, CustomerArrival, CheckoutCompleted, \
+    create_event_list
+from eventlog import read_event_columns
+from fastsim import assign_lines
+from simulation import GroceryStoreSimulation
+from store import Customer, Item, RegularLine, GroceryStore
+from workload import Workload, PRESETS
+
+# The largest number of events the list-based PriorityQueue is timed with.
+# Its add is O(n), so anything larger takes hours rather than seconds.
+LIST_QUEUE_LIMIT = 10 ** 4
+
+# The store used by the end-to-end simulation benchmarks. It has enough lines
+# to keep up with the one arrival per second made by write_event_file.
+BENCH_CONFIG = {'regular_count': 60, 'express_count': 20,
+                'self_serve_count': 40, 'line_capacity': 10}
+
+# The largest fraction by which writing a trace may slow a run down.
+TRACE_OVERHEAD_LIMIT = 0.1
+
+QUEUE_TYPES = {
+    'list': PriorityQueue,
+    'heap': HeapPriorityQueue,
+    'calendar': CalendarQueue,
+}
+
+
+def _timed(func: Callable[[], object]) -> float:
+    """Return the number of seconds it takes to call <func>."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def queue_workload(queue: Container, n: int, seed: int = 148) -> None:
+    """Run a simulation-like workload of <n> events through <queue>.
+
+    <n> events are loaded first, as GroceryStoreSimulation.run does with the
+    initial events, and then each removed event schedules a follow-up at the
+    same time or a little later, until <n> follow-ups have been scheduled.
+    """
+    rng = random.Random(seed)
+    for _ in range(n):
+        queue.add(Event(rng.randrange(n)))
+    scheduled = 0
+    while not queue.is_empty():
+        event = queue.remove()
+        if scheduled < n:
+            queue.add(Event(event.timestamp + rng.choice((0, 0, 1, 1, 5))))
+            scheduled += 1
+
+
+def bench_queues(sizes: list[int],
+                 list_limit: int = LIST_QUEUE_LIMIT) -> list[dict]:
+    """Return the time each queue type takes to run queue_workload at each
+    of the given <sizes>.
+
+    The list-based queue is skipped (reported as None) above <list_limit>.
+    """
+    results = []
+    for n in sizes:
+        for name, queue_type in QUEUE_TYPES.items():
+            if name == 'list' and n > list_limit:
+                seconds = None
+            else:
+                seconds = _timed(lambda: queue_workload(queue_type(), n))
+            results.append({'benchmark': 'queue', 'queue': name, 'n': n,
+                            'seconds': seconds})
+    return results
+
+
+class _DictItem:
+    """An Item as it was stored before Item had __slots__."""
+
+    def __init__(self, name: str, time: int) -> None:
+        self.name = name
+        self.time = time
+
+
+class _DictCustomer:
+    """A Customer as it was stored before Customer had __slots__."""
+
+    def __init__(self, name: str, items: list) -> None:
+        self.name = name
+        self.arrival_time = None
+        self._items = items.copy()
+
+
+class _DictArrival:
+    """A CustomerArrival as it was stored before Event had __slots__."""
+
+    def __init__(self, timestamp: int, c: _DictCustomer) -> None:
+        self.timestamp = timestamp
+        self.customer = c
+        if c.arrival_time is None:
+            c.arrival_time = timestamp
+
+
+def bytes_per_customer(n: int, items_per_customer: int = 5,
+                       compact: bool = True) -> float:
+    """Return the average number of bytes allocated per customer to hold
+    <n> CustomerArrival events, each for a customer with
+    <items_per_customer> items.
+
+    Measure the current event and store classes if <compact> is True, and
+    equivalent classes that keep their attributes in a __dict__ otherwise.
+    """
+    if compact:
+        item_type, customer_type, arrival_type = Item, Customer, \
+            CustomerArrival
+    else:
+        item_type, customer_type, arrival_type = _DictItem, _DictCustomer, \
+            _DictArrival
+    names = [f'c{i}' for i in range(n)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    events = []
+    for i in range(n):
+        items = [item_type('item', 3) for _ in range(items_per_customer)]
+        events.append(arrival_type(i, customer_type(names[i], items)))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / n
+
+
+def bench_memory(sizes: list[int]) -> list[dict]:
+    """Return the bytes per customer with and without __slots__ for each of
+    the given <sizes>."""
+    results = []
+    for n in sizes:
+        results.append({'benchmark': 'memory', 'n': n,
+                        'dict_bytes': bytes_per_customer(n, compact=False),
+                        'slots_bytes': bytes_per_customer(n)})
+    return results
+
+
+class _ListLine(RegularLine):
+    """A RegularLine as it was stored before CheckoutLine used a deque."""
+
+    def __init__(self, capacity: int) -> None:
+        RegularLine.__init__(self, capacity)
+        self._queue = []
+
+    def remove_front_customer(self) -> int:
+        if len(self._queue) == 0:
+            return 0
+        self._queue = self._queue[1:]
+        return len(self._queue)
+
+    def close(self) -> list[Customer]:
+        self.is_open = False
+        if len(self._queue) == 0:
+            return []
+        temp = self._queue[1:]
+        self._queue = self._queue[:1]
+        return temp
+
+
+def line_workload(line_type: type, capacity: int, rounds: int = 5) -> None:
+    """Fill a line of <line_type> with <capacity> customers and check them
+    all out, <rounds> times, then fill it once more and close it."""
+    customers = [Customer.from_item_times(str(i), [1])
+                 for i in range(capacity)]
+    line = line_type(capacity)
+    for _ in range(rounds):
+        for customer in customers:
+            line.accept(customer)
+        while line.remove_front_customer() > 0:
+            pass
+    for customer in customers:
+        line.accept(customer)
+    line.close()
+
+
+def bench_lines(capacities: list[int]) -> list[dict]:
+    """Return the time line_workload takes with a deque-backed and a
+    list-backed line at each of the given <capacities>."""
+    results = []
+    for capacity in capacities:
+        for name, line_type in [('list', _ListLine), ('deque', RegularLine)]:
+            results.append({
+                'benchmark': 'line', 'queue': name, 'capacity': capacity,
+                'seconds': _timed(lambda: line_workload(line_type, capacity))
+            })
+    return results
+
+
+def write_event_file(event_file_name: str, n: int, seed: int = 148) -> None:
+    """Write an event file named <event_file_name> with <n> events, mostly
+    arrivals with one to twenty items each, in timestamp order."""
+    rng = random.Random(seed)
+    with open(event_file_name, 'w') as event_file:
+        for i in range(n):
+            if rng.random() < 0.001:
+                event_file.write(f'{i} Close {rng.randrange(10)}\n')
+            else:
+                items = ' '.join(f'item{j} {rng.randint(1, 9)}'
+                                 for j in range(rng.randint(1, 20)))
+                event_file.write(f'{i} Arrive c{i} {items}\n')
+
+
+def bench_parse(sizes: list[int]) -> list[dict]:
+    """Return the throughput of create_event_list and read_event_columns, in
+    MB per second, on an event file with each of the given <sizes>."""
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            event_file_name = os.path.join(tmp, 'events.txt')
+            write_event_file(event_file_name, n)
+            megabytes = os.path.getsize(event_file_name) / 2 ** 20
+
+            def parse_text() -> None:
+                with open(event_file_name) as event_file:
+                    create_event_list(event_file)
+
+            row = {'benchmark': 'parse', 'n': n, 'megabytes': megabytes}
+            row['text_mb_per_s'] = megabytes / _timed(parse_text)
+            row['columns_mb_per_s'] = megabytes / _timed(
+                lambda: read_event_columns(event_file_name))
+            results.append(row)
+    return results
+
+
+def new_simulation(config: dict[str, int] | None = None) \
+        -> GroceryStoreSimulation:
+    """Return a new simulation of a store with <config>, or BENCH_CONFIG if
+    <config> is None."""
+    return GroceryStoreSimulation(
+        StringIO(json.dumps(BENCH_CONFIG if config is None else config)))
+
+
+def _reference_run(sim: GroceryStoreSimulation, events: list[Event]) -> None:
+    """Run <sim> on <events> with the same batched loop as run, but without
+    checking for instrumentation, statistics collection, tracing or
+    checkpointing."""
+    stats = sim.stats
+    store = sim._store
+
+    def handle(event: Event, customers: set[str]) -> list[Event]:
+        if isinstance(event, CheckoutCompleted):
+            stats['total_time'] = event.timestamp
+            stats['max_wait'] = max(
+                stats['max_wait'],
+                event.timestamp - event.customer.arrival_time)
+        if isinstance(event, CustomerArrival):
+            customers.add(event.customer.name)
+        return event.do(store)
+
+    customers = set()
+    sim.start(events)
+    while True:
+        batch = sim._next_batch(None, None)
+        if not batch:
+            break
+        sim._handle_batch(batch, handle, customers)
+    stats['num_customers'] = len(customers)
+
+
+def bench_instrumentation(sizes: list[int], repeat: int = 3) -> list[dict]:
+    """Return the time taken to simulate each of the given <sizes> of event
+    file without instrumentation, with it, and with a cProfile profile too.
+
+    'overhead' is how much slower run was without instrumentation than the
+    same batched loop with none of the checks for it, as a fraction. The
+    uninstrumented times are the best of <repeat>.
+    """
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            event_file_name = os.path.join(tmp, 'events.txt')
+            write_event_file(event_file_name, n)
+            with open(event_file_name) as event_file:
+                events = create_event_list(event_file)
+        row = {'benchmark': 'instrumentation', 'n': n}
+        row['reference_seconds'] = _best_of(
+            repeat, new_simulation, lambda sim: _reference_run(sim, events))
+        row['disabled_seconds'] = _best_of(
+            repeat, new_simulation, lambda sim: sim.run(events))
+        row['overhead'] = \
+            row['disabled_seconds'] / row['reference_seconds'] - 1
+        for key, profile in [('enabled_seconds', False),
+                             ('profiled_seconds', True)]:
+            sim = new_simulation()
+            sim.instrument(profile)
+            row[key] = _timed(lambda: sim.run(events))
+        results.append(row)
+    return results
+
+
+def _best_of(repeat: int, setup: Callable[[], object],
+             func: Callable[[object], object]) -> float:
+    """Return the fewest seconds it takes to call <func> on the value
+    returned by <setup>, over <repeat> tries. Only <func> is timed."""
+    best = math.inf
+    for _ in range(repeat):
+        value = setup()
+        start = time.perf_counter()
+        func(value)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _fill_queue(queue_type: type, n: int) -> Container:
+    """Return a new queue of <queue_type> with <n> events at random times.
+    """
+    queue = queue_type()
+    rng = random.Random(148)
+    for _ in range(n):
+        queue.add(Event(rng.randrange(n)))
+    return queue
+
+
+def _drain(queue: Container) -> None:
+    """Remove every event from <queue>."""
+    while not queue.is_empty():
+        queue.remove()
+
+
+def _enter_lines(store_and_customers: tuple[GroceryStore, list[Customer]]) \
+        -> None:
+    """Have every customer in the pair <store_and_customers> enter a line
+    of the store."""
+    store, customers = store_and_customers
+    for customer in customers:
+        store.enter_line(customer)
+
+
+def bench_suite(sizes: list[int], repeat: int = 3,
+                list_limit: int = LIST_QUEUE_LIMIT) -> list[dict]:
+    """Return the best of <repeat> times for each stage of the simulation
+    pipeline, at each of the given <sizes>:
+
+    'queue.add', 'queue.remove': adding <n> events at random times to each
+        queue type, and then removing them all
+    'store.enter_line': <n> customers entering lines of a store with room
+        for all of them
+    'event.create_event_list': parsing an event file of <n> events
+    'simulation.run': running a simulation of <n> events end to end
+
+    The events come from a Workload with one arrival per unit of time, run
+    in the store configuration it is meant for. Each row also has the mean
+    'microseconds' per operation. The list-based queue is skipped above
+    <list_limit> events.
+    """
+    results = []
+
+    def record(name: str, n: int, seconds: float, **extra) -> None:
+        results.append({'benchmark': name, 'n': n, **extra,
+                        'seconds': seconds, 'microseconds': seconds / n * 1e6})
+
+    for n in sizes:
+        for queue_name, queue_type in QUEUE_TYPES.items():
+            if queue_name == 'list' and n > list_limit:
+                continue
+            record('queue.add', n, _best_of(
+                repeat, lambda: queue_type,
+                lambda q: _fill_queue(q, n)), queue=queue_name)
+            record('queue.remove', n, _best_of(
+                repeat, lambda: _fill_queue(queue_type, n), _drain),
+                queue=queue_name)
+
+        workload = Workload(n, rate=1)
+        columns = workload.columns(148)
+        config = dict(BENCH_CONFIG)
+        config['line_capacity'] = -(-n // sum(
+            BENCH_CONFIG[key] for key in ['regular_count', 'express_count',
+                                          'self_serve_count']))
+        record('store.enter_line', n, _best_of(
+            repeat, lambda: (GroceryStore(StringIO(json.dumps(config))),
+                             [columns.event(i).customer for i in range(n)]),
+            _enter_lines))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            event_file_name = os.path.join(tmp, 'events.txt')
+            with open(event_file_name, 'w') as event_file:
+                workload.write(event_file, 148)
+
+            def parse(event_file: object) -> None:
+                create_event_list(event_file)
+                event_file.close()
+
+            record('event.create_event_list', n, _best_of(
+                repeat, lambda: open(event_file_name), parse))
+
+        record('simulation.run', n, _best_of(
+            repeat,
+            lambda: (new_simulation(workload.store_config), list(columns)),
+            lambda pair: pair[0].run(pair[1])))
+    return results
+
+
+def bench_fastsim(sizes: list[int], repeat: int = 3) -> list[dict]:
+    """Return the best of <repeat> times taken by GroceryStoreSimulation.run
+    and by fastsim.assign_lines on a Workload of each of the given <sizes>,
+    which has no closes, in the store configuration it is meant for.
+
+    'speedup' is how many times faster assign_lines was than run.
+    """
+    results = []
+    for n in sizes:
+        workload = Workload(n, rate=1)
+        columns = workload.columns(148)
+        row = {'benchmark': 'fastsim', 'n': n}
+        row['run_seconds'] = _best_of(
+            repeat,
+            lambda: (new_simulation(workload.store_config), list(columns)),
+            lambda pair: pair[0].run(pair[1]))
+        row['assign_lines_seconds'] = _best_of(
+            repeat, lambda: columns,
+            lambda c: assign_lines(workload.store_config, c))
+        row['speedup'] = row['run_seconds'] / row['assign_lines_seconds']
+        results.append(row)
+    return results
+
+
+def bench_trace(preset: str = 'weekday', repeat: int = 9) -> list[dict]:
+    """Return the best of <repeat> times taken by GroceryStoreSimulation.run
+    on the Workload preset named <preset>, without a trace, with a binary
+    trace and with a CSV trace, in the store configuration it is meant for.
+
+    The three kinds of run take turns, so that the machine getting slower
+    or faster part way through affects them all alike. 'overhead' is how
+    much slower the run with a trace was than the run without, as a
+    fraction, and 'within_limit' is whether it was below
+    TRACE_OVERHEAD_LIMIT.
+    """
+    workload = PRESETS[preset]
+    columns = workload.columns(148)
+    file_names = {'none': None, 'binary': 'trace.bin', 'csv': 'trace.csv'}
+    best = dict.fromkeys(file_names, math.inf)
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            for trace, file_name in file_names.items():
+                sim = new_simulation(workload.store_config)
+                if file_name is not None:
+                    sim.trace_to(os.path.join(tmp, file_name))
+                events = list(columns)
+                best[trace] = min(best[trace],
+                                  _timed(lambda: sim.run(events)))
+    results = []
+    for trace, seconds in best.items():
+        row = {'benchmark': 'trace', 'preset': preset,
+               'events': len(columns), 'trace': trace, 'seconds': seconds}
+        if trace != 'none':
+            row['overhead'] = seconds / best['none'] - 1
+            row['within_limit'] = row['overhead'] < TRACE_OVERHEAD_LIMIT
+        results.append(row)
+    return results
+
+
+def _git_commit() -> str | None:
+    """Return the hash of the git commit checked out, or None if it cannot
+    be found."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, results: list[dict]) -> None:
+    """Write <results> to a JSON file at <path>, along with the git commit,
+    Python version and machine they were measured on."""
+    with open(path, 'w') as out:
+        json.dump({'commit': _git_commit(),
+                   'python': platform.python_version(),
+                   'machine': platform.machine(),
+                   'results': results}, out, indent=2)
+
+
+def _row_key(row: dict) -> tuple:
+    """Return what identifies the benchmark measured by <row>."""
+    return tuple((key, value) for key, value in row.items()
+                 if key not in ('seconds', 'microseconds'))
+
+
+def compare_results(old_path: str, new_path: str) -> list[dict]:
+    """Return, for each benchmark in both of the results files at <old_path>
+    and <new_path>, its old and new seconds and the 'ratio' of new to old.
+    A ratio above 1 means the new results are slower."""
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old = {_row_key(row): row['seconds']
+               for row in json.load(old_file)['results']}
+        new = json.load(new_file)['results']
+    comparison = []
+    for row in new:
+        key = _row_key(row)
+        if key in old:
+            comparison.append({**dict(key), 'old_seconds': old[key],
+                               'new_seconds': row['seconds'],
+                               'ratio': row['seconds'] / old[key]})
+    return comparison
+
+
+def _print_results(results: list[dict]) -> None:
+    """Print <results>, one row per line."""
+    for row in results:
+        cells = []
+        for key, value in row.items():
+            if isinstance(value, float):
+                value = f'{value:.4f}'
+            cells.append(f'{key}={value}')
+        print('  '.join(cells))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('benchmark',
+                        choices=['queues', 'memory', 'lines', 'parse',
+                                 'instrumentation', 'fastsim', 'trace',
+                                 'suite', 'compare'])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10 ** 4, 10 ** 5, 10 ** 6])
+    parser.add_argument('--list-limit', type=int, default=LIST_QUEUE_LIMIT)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--preset', choices=sorted(PRESETS),
+                        default='weekday',
+                        help='the workload the trace benchmark runs')
+    parser.add_argument('--out', help='where suite saves its results')
+    parser.add_argument('--files', nargs=2, metavar=('OLD', 'NEW'),
+                        help='the suite results compare reads')
+    args = parser.parse_args()
+
+    if args.benchmark == 'queues':
+        _print_results(bench_queues(args.sizes, args.list_limit))
+    elif args.benchmark == 'memory':
+        _print_results(bench_memory(args.sizes))
+    elif args.benchmark == 'lines':
+        _print_results(bench_lines(args.sizes))
+    elif args.benchmark == 'parse':
+        _print_results(bench_parse(args.sizes))
+    elif args.benchmark == 'instrumentation':
+        _print_results(bench_instrumentation(args.sizes, args.repeat))
+    elif args.benchmark == 'fastsim':
+        _print_results(bench_fastsim(args.sizes, args.repeat))
+    elif args.benchmark == 'trace':
+        _print_results(bench_trace(args.preset, args.repeat))
+    elif args.benchmark == 'suite':
+        suite = bench_suite(args.sizes, args.repeat, args.list_limit)
+        _print_results(suite)
+        if args.out is not None:
+            write_results(args.out, suite)
+    elif args.files is None:
+        parser.error('compare needs --files OLD NEW')
+    else:
+        _print_results(compare_results(*args.files))
@@ -0,0 +1,194 @@
+"""Assignment 1 - Grocery Store Chains
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file simulates a chain of independent grocery stores, spreading the
+stores over several processes. The events for the whole chain are in one
+chain event file, in which each line is the id of a store followed by a line
+in the event file format, for example:
+
+    store7 10 Arrive Bo bread 4 milk 2
+    store2 12 Close 1
+
+The store configurations are in a JSON file that maps each store id to its
+configuration. Run a chain with:
+
+    python chain.py configs.json chain_events.txt --out chain.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from typing import Any
+
+from event import create_event_list
+from metrics import QuantileSketch
+from simulation import GroceryStoreSimulation
+
+# The number of lines buffered for each store before they are written to its
+# slice of the chain event file.
+FLUSH_LINES = 1024
+
+
+def split_chain_events(chain_file_name: str, out_dir: str) -> dict[str, str]:
+    """Split the chain event file named <chain_file_name> into one event file
+    per store in the directory <out_dir>, and return the name of each
+    store's event file, by store id.
+
+    Each store's lines keep their order, without the store id. Blank lines
+    are skipped.
+    """
+    paths = {}
+    buffers = {}
+    with open(chain_file_name) as chain_file:
+        for line in chain_file:
+            store_id, _, event_line = line.strip().partition(' ')
+            if not store_id:
+                continue
+            buffer = buffers.get(store_id)
+            if buffer is None:
+                buffer = buffers[store_id] = []
+                paths[store_id] = os.path.join(out_dir, f'{len(paths)}.txt')
+                open(paths[store_id], 'w').close()
+            buffer.append(event_line + '\n')
+            if len(buffer) >= FLUSH_LINES:
+                _flush(paths[store_id], buffer)
+    for store_id, buffer in buffers.items():
+        _flush(paths[store_id], buffer)
+    return paths
+
+
+def _flush(path: str, buffer: list[str]) -> None:
+    """Append the lines in <buffer> to the file at <path>, and empty
+    <buffer>."""
+    with open(path, 'a') as out:
+        out.writelines(buffer)
+    buffer.clear()
+
+
+def _run_store(task: tuple[str, dict[str, int], str, float]) \
+        -> tuple[str, dict[str, int], QuantileSketch]:
+    """Return the id, the stats and a sketch of the waiting times from
+    simulating one store, where <task> is the store id, its configuration,
+    the name of its event file and the accuracy of the sketch."""
+    store_id, config, event_file_name, accuracy = task
+    sim = GroceryStoreSimulation(StringIO(json.dumps(config)))
+    collector = sim.collect_stats(accuracy)
+    with open(event_file_name) as event_file:
+        sim.run(create_event_list(event_file))
+    return store_id, sim.stats, collector.waits
+
+
+def _summary(stats: dict[str, int], waits: QuantileSketch) -> dict[str, Any]:
+    """Return <stats> with the count, mean and p50, p90 and p99 quantiles of
+    the waiting times summarized by <waits> added."""
+    summary = dict(stats)
+    summary['waits'] = waits.count
+    if waits.count > 0:
+        summary['mean_wait'] = waits.total / waits.count
+        for q in [50, 90, 99]:
+            summary[f'p{q}_wait'] = waits.quantile(q / 100)
+    return summary
+
+
+def run_chain(configs: dict[str, dict[str, int]],
+              event_file_names: dict[str, str],
+              max_workers: int | None = None,
+              accuracy: float = 0.01) -> dict[str, Any]:
+    """Simulate each store in <event_file_names>, which maps store ids to
+    the names of their event files, with its configuration in <configs>.
+
+    Return a dictionary with these keys:
+
+    'stores': for each store id, the stats of its simulation, plus the
+        number of 'waits' recorded and their 'mean_wait', 'p50_wait',
+        'p90_wait' and 'p99_wait' (estimated to within a relative error of
+        <accuracy>)
+    'chain': the same for the whole chain: the total 'num_customers', the
+        largest 'total_time' and 'max_wait', and the waits of all stores
+
+    The stores are run over <max_workers> processes, or one per CPU if
+    <max_workers> is None, or in this process if <max_workers> is 1. The
+    stores with the largest event files are started first, and each worker
+    takes the next store as soon as it finishes one, so that a few large
+    stores do not leave the other workers idle at the end.
+
+    Precondition:
+    - every store id in event_file_names is a key of configs
+    """
+    tasks = sorted(((store_id, configs[store_id], name, accuracy)
+                    for store_id, name in event_file_names.items()),
+                   key=lambda task: os.path.getsize(task[2]), reverse=True)
+    if max_workers == 1:
+        results = [_run_store(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers or os.cpu_count() or 1) \
+                as executor:
+            results = list(executor.map(_run_store, tasks))
+    stores = {}
+    chain = {'num_customers': 0, 'total_time': 0, 'max_wait': 0}
+    chain_waits = QuantileSketch(accuracy)
+    for store_id, stats, waits in sorted(results, key=lambda r: r[0]):
+        stores[store_id] = _summary(stats, waits)
+        chain['num_customers'] += stats['num_customers']
+        chain['total_time'] = max(chain['total_time'], stats['total_time'])
+        chain['max_wait'] = max(chain['max_wait'], stats['max_wait'])
+        chain_waits.merge(waits)
+    return {'stores': stores, 'chain': _summary(chain, chain_waits)}
+
+
+def run_chain_file(configs: dict[str, dict[str, int]], chain_file_name: str,
+                   max_workers: int | None = None,
+                   accuracy: float = 0.01) -> dict[str, Any]:
+    """Return the results of run_chain for the stores in the chain event
+    file named <chain_file_name>, with their configurations in <configs>.
+
+    The file is split into one event file per store in a temporary
+    directory, which is removed afterwards.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        event_file_names = split_chain_events(chain_file_name, tmp)
+        return run_chain(configs, event_file_names, max_workers, accuracy)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the chain described by the command line arguments <argv>."""
+    parser = argparse.ArgumentParser(
+        description='Simulate a chain of independent grocery stores.')
+    parser.add_argument('configs')
+    parser.add_argument('events')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='-')
+    args = parser.parse_args(argv)
+
+    with open(args.configs) as config_file:
+        configs = json.load(config_file)
+    results = run_chain_file(configs, args.events, args.workers)
+    if args.out == '-':
+        json.dump(results, sys.stdout, indent=1)
+    else:
+        with open(args.out, 'w') as out:
+            json.dump(results, out, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Assignment 1 - Grocery Store Simulation Checkpoints
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file saves and loads checkpoints: snapshots of the state of a grocery
+store simulation part way through a run, from which the run can be resumed.
+A checkpoint holds only the events in progress, and how many of the events
+the run was started with have been handled, so its size does not grow with
+the length of the input. A checkpoint is MAGIC followed by the state,
+pickled and then compressed with zlib.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+import zlib
+from typing import Any, Callable
+
+# The first bytes of a checkpoint file.
+MAGIC = b'GSCKPT01'
+
+
+def write_checkpoint(path: str, state: bytes, level: int = 1) -> None:
+    """Write a checkpoint holding the pickled <state> to <path>, compressed
+    at zlib compression <level>.
+
+    The checkpoint is written to a temporary file first and then moved to
+    <path>, so <path> always holds a complete checkpoint, even if writing is
+    interrupted.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as out:
+        out.write(MAGIC)
+        out.write(zlib.compress(state, level))
+    os.replace(temp_path, path)
+
+
+def read_checkpoint(path: str) -> dict[str, Any]:
+    """Return the state saved in the checkpoint at <path>.
+
+    Raise a ValueError if <path> is not a checkpoint.
+    """
+    with open(path, 'rb') as checkpoint_file:
+        data = checkpoint_file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f'{path} is not a simulation checkpoint')
+    return pickle.loads(zlib.decompress(data[len(MAGIC):]))
+
+
+class Checkpointer:
+    """Saves a checkpoint of a running simulation every few events.
+
+    The state is pickled while the simulation waits, so that the checkpoint
+    is consistent, but it is compressed and written in a background thread
+    while the simulation carries on. At most one checkpoint is being written
+    at a time.
+
+    Attributes:
+    - path: Where the checkpoints are written. Each replaces the last.
+    - every: The number of events handled between checkpoints. A checkpoint
+      is only saved once the simulation has finished a timestamp, so there
+      may be more.
+    - level: The zlib compression level of the checkpoints.
+    - saved: The number of checkpoints written so far.
+    - _countdown: The number of events left to handle before the next
+      checkpoint.
+    - _writer: The thread writing the latest checkpoint, or None if none has
+      been started.
+    - _error: The exception raised while writing a checkpoint in the
+      background, or None if there was none.
+
+    Representation Invariants:
+    - self.every >= 1
+    - 1 <= self._countdown <= self.every
+    """
+
+    path: str
+    every: int
+    level: int
+    saved: int
+    _countdown: int
+    _writer: threading.Thread | None
+    _error: Exception | None
+
+    def __init__(self, path: str, every: int, level: int = 1) -> None:
+        """Initialize a Checkpointer that writes a checkpoint to <path> every
+        <every> events, compressed at zlib compression <level>.
+
+        Precondition:
+        - every >= 1
+        """
+        self.path = path
+        self.every = every
+        self.level = level
+        self.saved = 0
+        self._countdown = every
+        self._writer = None
+        self._error = None
+
+    def events_handled(self, handled: int,
+                       state: Callable[[], dict[str, Any]]) -> None:
+        """Record that <handled> more events were handled, and save a
+        checkpoint of <state>, if one is due. <state> is called with no
+        arguments to get the state to save."""
+        self._countdown -= handled
+        if self._countdown <= 0:
+            self._countdown = self.every
+            self.save(state())
+
+    def save(self, state: dict[str, Any]) -> None:
+        """Start writing a checkpoint of <state> in the background, once the
+        previous checkpoint has been written."""
+        data = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        self.wait()
+        self._writer = threading.Thread(target=self._write, args=(data,))
+        self._writer.start()
+
+    def _write(self, data: bytes) -> None:
+        """Write the pickled state <data> to self.path."""
+        try:
+            write_checkpoint(self.path, data, self.level)
+            self.saved += 1
+        except OSError as error:
+            self._error = error
+
+    def wait(self) -> None:
+        """Wait until the latest checkpoint has been written.
+
+        Raise the error that stopped a checkpoint from being written, if
+        there was one.
+        """
+        if self._writer is not None:
+            self._writer.join()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -0,0 +1,67 @@
+"""Assignment 1 - Shared test helpers
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains the store configuration, random event files and
+expected statistics shared by the test modules, which import them from
+here.
+"""
+from __future__ import annotations
+
+import json
+import random
+from io import StringIO
+
+CONFIG = {'regular_count': 2, 'express_count': 1, 'self_serve_count': 1,
+          'line_capacity': 3}
+
+# The stats for running make_event_file(seed) in a store with CONFIG, for
+# seeds 0 to 4, as computed by the original list-based implementation of the
+# simulation.
+EXPECTED_STATS = [
+    {'num_customers': 200, 'total_time': 1767, 'max_wait': 210},
+    {'num_customers': 200, 'total_time': 2180, 'max_wait': 805},
+    {'num_customers': 200, 'total_time': 2744, 'max_wait': 1556},
+    {'num_customers': 200, 'total_time': 1802, 'max_wait': 210},
+    {'num_customers': 200, 'total_time': 2035, 'max_wait': 725},
+]
+
+
+def make_config(config: dict = None) -> StringIO:
+    """Return an open JSON store configuration file for <config>."""
+    return StringIO(json.dumps(CONFIG if config is None else config))
+
+
+def make_event_file(seed: int, n: int = 200, closes: int = 2) -> StringIO:
+    """Return an open event file with <n> random arrivals and <closes>
+    CloseLine events, in random timestamp order."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        items = ' '.join(f'item{j} {rng.randint(1, 6)}'
+                         for j in range(rng.randint(1, 10)))
+        lines.append(f'{rng.randrange(n * 8)} Arrive c{i} {items}')
+    for line_number in range(closes):
+        lines.append(f'{rng.randrange(n * 8)} Close {line_number}')
+    rng.shuffle(lines)
+    return StringIO('\n'.join(lines))
+
+
+def write_event_files(tmp_path, seeds: list[int]) -> list[str]:
+    """Write the random event file for each of <seeds> into <tmp_path> and
+    return their names."""
+    names = []
+    for seed in seeds:
+        path = tmp_path / f'events{seed}.txt'
+        path.write_text(make_event_file(seed).getvalue())
+        names.append(str(path))
+    return names
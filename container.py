@@ -21,7 +21,10 @@ abstract data types.
 """
 
 from __future__ import annotations
-from typing import Any
+from collections import deque
+from heapq import heappush, heappop, heapify
+from itertools import count
+from typing import Any, Iterable
 
 
 class Container:
@@ -38,6 +41,29 @@ class Container:
         """Remove and return a single item from this Container."""
         raise NotImplementedError
 
+    def add_all(self, items: Iterable[Any]) -> None:
+        """Add each of <items> to this Container, in order."""
+        for item in items:
+            self.add(item)
+
+    def remove_all_equal(self) -> deque:
+        """Remove the item that remove would return next, and every item
+        equal to it, and return them in the order remove would have.
+
+        Precondition:
+        - not self.is_empty()
+        """
+        first = self.remove()
+        items = deque([first])
+        while not self.is_empty() and self.peek() == first:
+            items.append(self.remove())
+        return items
+
+    def peek(self) -> Any:
+        """Return the item that remove would return next, without removing
+        it from this Container."""
+        raise NotImplementedError
+
     def is_empty(self) -> bool:
         """Return True iff this Container is empty."""
         raise NotImplementedError
@@ -91,6 +117,20 @@ class PriorityQueue(Container):
         """
         return self._items.pop(0)
 
+    def peek(self) -> Any:
+        """Return the next item from this PriorityQueue without removing it.
+
+        Precondition:
+        - not self.is_empty()
+
+        >>> pq = PriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('anna')
+        >>> pq.peek()
+        'anna'
+        """
+        return self._items[0]
+
     def is_empty(self) -> bool:
         """
         Return True iff this PriorityQueue is empty.
@@ -124,6 +164,286 @@ class PriorityQueue(Container):
         self._items.insert(index, item)
 
 
+class HeapPriorityQueue(Container):
+    """A queue of items that operates in priority order, backed by a binary
+    heap.
+
+    Items are removed in exactly the same order as from a PriorityQueue: the
+    item with the highest priority is removed first, and ties are resolved in
+    FIFO order. Unlike PriorityQueue, both add and remove take O(log n) time.
+
+    If x < y, then x has a *HIGHER* priority than y.
+
+    Attributes:
+    - _heap: A binary heap of (item, sequence number) pairs. The sequence
+             number records insertion order, so that equal items are removed
+             in the order they were added.
+    - _counter: The source of sequence numbers for newly added items.
+
+    Representation Invariants:
+    - self._heap satisfies the heap property from the heapq module
+    - all sequence numbers in self._heap are distinct
+    - all objects in self._heap can be compared to each other using
+      comparison operators
+    """
+
+    _heap: list[tuple[Any, int]]
+    _counter: count
+
+    def __init__(self) -> None:
+        """Initialize an empty HeapPriorityQueue."""
+        self._heap = []
+        self._counter = count()
+
+    def remove(self) -> Any:
+        """Remove and return the next item from this HeapPriorityQueue.
+
+        Precondition:
+        - not self.is_empty()
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('anna')
+        >>> pq.add('mona')
+        >>> pq.add('hat')
+        >>> pq.remove()
+        'anna'
+        >>> pq.remove()
+        'fred'
+        >>> pq.remove()
+        'hat'
+        >>> pq.remove()
+        'mona'
+        """
+        return heappop(self._heap)[0]
+
+    def peek(self) -> Any:
+        """Return the next item from this HeapPriorityQueue without removing
+        it.
+
+        Precondition:
+        - not self.is_empty()
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('anna')
+        >>> pq.peek()
+        'anna'
+        """
+        return self._heap[0][0]
+
+    def is_empty(self) -> bool:
+        """
+        Return True iff this HeapPriorityQueue is empty.
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.is_empty()
+        True
+        >>> pq.add('fred')
+        >>> pq.is_empty()
+        False
+        """
+        return len(self._heap) == 0
+
+    def add(self, item: Any) -> None:
+        """Add <item> to this HeapPriorityQueue.
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add('anna')
+        >>> pq.add('sophia')
+        >>> pq.add('mona')
+        >>> [pq.remove() for _ in range(4)]
+        ['anna', 'fred', 'mona', 'sophia']
+        """
+        heappush(self._heap, (item, next(self._counter)))
+
+    def add_all(self, items: Iterable[Any]) -> None:
+        """Add each of <items> to this HeapPriorityQueue, in order.
+
+        >>> pq = HeapPriorityQueue()
+        >>> pq.add('fred')
+        >>> pq.add_all(['anna', 'sophia', 'mona'])
+        >>> [pq.remove() for _ in range(4)]
+        ['anna', 'fred', 'mona', 'sophia']
+        """
+        entries = [(item, seq) for item, seq in zip(items, self._counter)]
+        heap = self._heap
+        if len(entries) > len(heap):
+            # Rebuilding the heap is cheaper than pushing each entry.
+            heap.extend(entries)
+            heapify(heap)
+        else:
+            for entry in entries:
+                heappush(heap, entry)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state of this HeapPriorityQueue for pickling.
+
+        The counter is not saved: __setstate__ restarts it after the largest
+        sequence number in the heap, which keeps the order of ties.
+        """
+        return {'_heap': self._heap}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore this HeapPriorityQueue from a pickled <state>.
+
+        >>> import pickle
+        >>> pq = HeapPriorityQueue()
+        >>> for item in [2, 1, 2, 1]:
+        ...     pq.add(item)
+        >>> pq.remove()
+        1
+        >>> copy = pickle.loads(pickle.dumps(pq))
+        >>> copy.add(1)
+        >>> [copy.remove() for _ in range(4)]
+        [1, 1, 2, 2]
+        """
+        self._heap = state['_heap']
+        self._counter = count(max((seq for _, seq in self._heap), default=-1)
+                              + 1)
+
+
+class CalendarQueue(Container):
+    """A queue of timestamped items, bucketed by their integer timestamp.
+
+    Items are removed in order of their <timestamp> attribute, earliest first.
+    Items with the same timestamp are removed in FIFO order. For events, whose
+    comparison methods compare timestamps only, this is exactly the order a
+    PriorityQueue would remove them in.
+
+    Adding an item at a timestamp that already has a bucket, and removing an
+    item that leaves its bucket non-empty, are both O(1). Only the first item
+    at a new timestamp costs O(log k), where k is the number of distinct
+    timestamps currently in the queue. In a simulation, most new events land
+    at the current time or just after it, so k stays small and nearly every
+    operation hits an existing bucket.
+
+    Attributes:
+    - _buckets: A mapping from each timestamp in the queue to the items with
+                that timestamp, in the order they were added.
+    - _times: A binary heap of the keys of self._buckets.
+    - _size: The number of items in the queue.
+
+    Representation Invariants:
+    - sorted(self._times) == sorted(self._buckets)
+    - no bucket in self._buckets is empty
+    - self._size == sum(len(b) for b in self._buckets.values())
+    - every item in the queue has an int attribute named timestamp
+    """
+
+    _buckets: dict[int, deque]
+    _times: list[int]
+    _size: int
+
+    def __init__(self) -> None:
+        """Initialize an empty CalendarQueue."""
+        self._buckets = {}
+        self._times = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of items in this CalendarQueue.
+
+        >>> from event import Event
+        >>> cq = CalendarQueue()
+        >>> cq.add(Event(3))
+        >>> cq.add(Event(3))
+        >>> len(cq)
+        2
+        """
+        return self._size
+
+    def remove(self) -> Any:
+        """Remove and return the item with the earliest timestamp from this
+        CalendarQueue.
+
+        Precondition:
+        - not self.is_empty()
+
+        >>> from event import CloseLine
+        >>> cq = CalendarQueue()
+        >>> for t, n in [(5, 0), (2, 1), (5, 2), (2, 3)]:
+        ...     cq.add(CloseLine(t, n))
+        >>> [cq.remove().line_number for _ in range(4)]
+        [1, 3, 0, 2]
+        """
+        time = self._times[0]
+        bucket = self._buckets[time]
+        item = bucket.popleft()
+        if not bucket:
+            del self._buckets[time]
+            heappop(self._times)
+        self._size -= 1
+        return item
+
+    def peek(self) -> Any:
+        """Return the item with the earliest timestamp from this CalendarQueue
+        without removing it.
+
+        Precondition:
+        - not self.is_empty()
+
+        >>> from event import CloseLine
+        >>> cq = CalendarQueue()
+        >>> cq.add(CloseLine(5, 0))
+        >>> cq.add(CloseLine(2, 1))
+        >>> cq.peek().line_number
+        1
+        """
+        return self._buckets[self._times[0]][0]
+
+    def is_empty(self) -> bool:
+        """Return True iff this CalendarQueue is empty.
+
+        >>> from event import Event
+        >>> cq = CalendarQueue()
+        >>> cq.is_empty()
+        True
+        >>> cq.add(Event(1))
+        >>> cq.is_empty()
+        False
+        """
+        return self._size == 0
+
+    def add(self, item: Any) -> None:
+        """Add <item> to this CalendarQueue.
+
+        Precondition:
+        - item has an int attribute named timestamp
+        """
+        time = item.timestamp
+        bucket = self._buckets.get(time)
+        if bucket is None:
+            bucket = deque()
+            self._buckets[time] = bucket
+            heappush(self._times, time)
+        bucket.append(item)
+        self._size += 1
+
+    def remove_all_equal(self) -> deque:
+        """Remove and return every item with the earliest timestamp in this
+        CalendarQueue, in the order they were added.
+
+        This takes O(log k) time, however many items are removed.
+
+        Precondition:
+        - not self.is_empty()
+
+        >>> from event import CloseLine
+        >>> cq = CalendarQueue()
+        >>> for t, n in [(5, 0), (2, 1), (5, 2), (2, 3)]:
+        ...     cq.add(CloseLine(t, n))
+        >>> [event.line_number for event in cq.remove_all_equal()]
+        [1, 3]
+        >>> len(cq)
+        2
+        """
+        bucket = self._buckets.pop(heappop(self._times))
+        self._size -= len(bucket)
+        return bucket
+
+
 if __name__ == '__main__':
     import doctest
 
@@ -135,6 +455,9 @@ if __name__ == '__main__':
 
         python_ta.check_all(
             config={'allowed-import-modules': ['__future__',
+                                               'collections',
+                                               'heapq',
+                                               'itertools',
                                                'typing',
                                                'python_ta',
                                                'doctest']}
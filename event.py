@@ -21,9 +21,10 @@ necessary to model the different kinds of events in the simulation.
 """
 from __future__ import annotations
 
+from heapq import heappush, heappop
 from io import StringIO
-from typing import TextIO
-from store import GroceryStore, Customer, Item, NoAvailableLineError
+from typing import Iterable, Iterator, TextIO
+from store import GroceryStore, Customer, EXPRESS_LIMIT
 
 
 class Event:
@@ -42,6 +43,7 @@ class Event:
     - timestamp >= 0
     """
 
+    __slots__ = ('timestamp',)
     timestamp: int
 
     def __init__(self, timestamp: int) -> None:
@@ -115,6 +117,7 @@ class CustomerArrival(Event):
     - customer: The arriving customer
     """
 
+    __slots__ = ('customer',)
     timestamp: int
     customer: Customer
 
@@ -135,13 +138,114 @@ class CustomerArrival(Event):
             self.customer.arrival_time = timestamp
 
     def do(self, store: GroceryStore) -> list[Event]:
-        try:
-            checkout_line = store.enter_line(self.customer)
-            if len(store.lines[checkout_line]) == 1:
-                return [CheckoutStarted(self.timestamp, checkout_line)]
-            return []
-        except NoAvailableLineError:
-            return [CustomerArrival(self.timestamp + 1, self.customer)]
+        checkout_line = store.try_enter_line(self.customer)
+        if checkout_line == -1:
+            express_openings = None
+            if self.customer.num_items() <= EXPRESS_LIMIT:
+                express_openings = store.express_openings
+            return [CustomerRetry(self.timestamp + 1, [self.customer],
+                                  store.openings, express_openings)]
+        if len(store.lines[checkout_line]) == 1:
+            return [CheckoutStarted(self.timestamp, checkout_line)]
+        return []
+
+
+class CustomerRetry(Event):
+    """Customers who found no line to join try again.
+
+    Doing a CustomerRetry is the same as doing a CustomerArrival for each of
+    its customers in turn: each one who still finds no line to join tries
+    again one time unit later. Consecutive retries at the same time can be
+    combined into one CustomerRetry, so that a crowd of waiting customers
+    moves to the next time unit as one event.
+
+    A customer who found no line can only find one once a customer has left
+    a line they could use, so the crowd moves on in O(1) time, without any
+    of its customers trying, until the store's openings change. The list of
+    customers is never changed in place, so events may share it.
+
+    Attributes:
+    - customers: The customers trying again, in the order they try.
+    - openings: The store's openings when these customers last found no
+      line.
+    - express_openings: The store's express_openings when the customers who
+      could use an express line last found no line, or None if none of them
+      could.
+    """
+
+    __slots__ = ('customers', 'openings', 'express_openings')
+    timestamp: int
+    customers: list[Customer]
+    openings: int
+    express_openings: int | None
+
+    def __init__(self, timestamp: int, customers: list[Customer],
+                 openings: int, express_openings: int | None) -> None:
+        """Initialize a CustomerRetry event for <customers> at the given
+        <timestamp>, who last found no line when the store had the given
+        <openings> and <express_openings>.
+
+        Preconditions:
+        - timestamp >= 0
+        - every customer in customers has arrived
+        - express_openings is None iff no customer in customers could use
+          an express line
+        """
+        super().__init__(timestamp)
+        self.customers = customers
+        self.openings = openings
+        self.express_openings = express_openings
+
+    def must_wait(self, store: GroceryStore) -> bool:
+        """Return True iff none of these customers can join a line in
+        <store> yet, without any of them trying.
+        """
+        if not store.has_room():
+            return True
+        return store.openings == self.openings and (
+            self.express_openings is None
+            or store.express_openings == self.express_openings)
+
+    def merge(self, other: CustomerRetry) -> None:
+        """Add the customers of <other>, who retry straight after the
+        customers of this event and at the same time, to this event."""
+        self.customers = self.customers + other.customers
+        self.openings = min(self.openings, other.openings)
+        if self.express_openings is None:
+            self.express_openings = other.express_openings
+        elif other.express_openings is not None:
+            self.express_openings = min(self.express_openings,
+                                        other.express_openings)
+
+    def do(self, store: GroceryStore) -> list[Event]:
+        if self.must_wait(store):
+            return [CustomerRetry(self.timestamp + 1, self.customers,
+                                  self.openings, self.express_openings)]
+        new_events = []
+        still_waiting = []
+        express_openings = None
+        customers = self.customers
+        for i, customer in enumerate(customers):
+            checkout_line = store.try_enter_line(customer)
+            if checkout_line != -1:
+                if len(store.lines[checkout_line]) == 1:
+                    new_events.append(
+                        CheckoutStarted(self.timestamp, checkout_line))
+                continue
+            still_waiting.append(customer)
+            if customer.num_items() <= EXPRESS_LIMIT:
+                express_openings = store.express_openings
+            if not store.has_room():
+                # Nobody after this customer can find a line either.
+                still_waiting.extend(customers[i + 1:])
+                if self.express_openings is not None:
+                    express_openings = store.express_openings
+                break
+        if still_waiting:
+            new_events.append(
+                CustomerRetry(self.timestamp + 1, still_waiting,
+                              store.openings, express_openings))
+        return new_events
 
 
 class CheckoutStarted(Event):
@@ -151,6 +255,7 @@ class CheckoutStarted(Event):
     - line_number: The number of the checkout line.
     """
 
+    __slots__ = ('line_number',)
     timestamp: int
     line_number: int
 
@@ -185,6 +290,7 @@ class CheckoutCompleted(Event):
     - customer: The finishing customer.
     """
 
+    __slots__ = ('line_number', 'customer')
     timestamp: int
     line_number: int
     customer: Customer
@@ -209,6 +315,7 @@ class CloseLine(Event):
     - line_number: The number of the checkout line.
     """
 
+    __slots__ = ('line_number',)
     timestamp: int
     line_number: int
 
@@ -251,21 +358,71 @@ def create_event_list(event_file: TextIO) -> list[Event]:
     >>> isinstance(samp_events[2], CloseLine)
     True
     """
-    event_list = []
+    return list(iter_events(event_file))
+
+
+def iter_events(event_file: TextIO) -> Iterator[Event]:
+    """Yield Event objects to represent the events in <event_file>, one line
+    at a time, in the same order as they are in the file.
+
+    Unlike create_event_list, only the event currently being yielded is kept
+    in memory. Blank lines are skipped.
+
+    Preconditions:
+    - <event_file> is open.
+    - <event_file> is in the format specified by the assignment handout.
+
+    >>> events = iter_events(StringIO('4 Close 1\\n\\n2 Arrive Bo milk 2'))
+    >>> [type(event).__name__ for event in events]
+    ['CloseLine', 'CustomerArrival']
+    """
     for line in event_file:
-        contents = line.strip().split()
+        contents = line.split()
+        if not contents:
+            continue
         timestamp = int(contents[0])
         if contents[1] == 'Arrive':
-            customer_name = contents[2]
-            items = []
-            for i in range(3, len(contents), 2):
-                items.append(Item(contents[i], int(contents[i + 1])))
-            customer = Customer(customer_name, items)
-            event_list.append(CustomerArrival(timestamp, customer))
+            customer = Customer.from_item_times(contents[2],
+                                                map(int, contents[4::2]))
+            yield CustomerArrival(timestamp, customer)
         elif contents[1] == 'Close':
             line_number = int(contents[2])
-            event_list.append(CloseLine(timestamp, line_number))
-    return event_list
+            yield CloseLine(timestamp, line_number)
+
+
+def in_timestamp_order(events: Iterable[Event],
+                       window: int = 0) -> Iterator[Event]:
+    """Yield the events in <events> in timestamp order, with events that have
+    the same timestamp in the order they appear in <events>.
+
+    At most <window> events are held back at a time to reorder them, so an
+    event may appear at most <window> positions later in <events> than an
+    event with a larger timestamp. Raise a ValueError if it appears later
+    than that.
+
+    Preconditions:
+    - window >= 0
+
+    >>> events = [CloseLine(3, 0), CloseLine(1, 1), CloseLine(3, 2)]
+    >>> [e.line_number for e in in_timestamp_order(events, 1)]
+    [1, 0, 2]
+    >>> list(in_timestamp_order(events))
+    Traceback (most recent call last):
+    ...
+    ValueError: event at time 1 is out of order by more than 0 events
+    """
+    held = []
+    last_time = None
+    for position, event in enumerate(events):
+        if last_time is not None and event.timestamp < last_time:
+            raise ValueError(f'event at time {event.timestamp} is out of '
+                             f'order by more than {window} events')
+        heappush(held, (event.timestamp, position, event))
+        if len(held) > window:
+            last_time, _, earliest = heappop(held)
+            yield earliest
+    while held:
+        yield heappop(held)[2]
 
 
 if __name__ == '__main__':
@@ -282,6 +439,7 @@ if __name__ == '__main__':
                 'allowed-import-modules': [
                     '__future__',
                     'typing',
+                    'heapq',
                     'store',
                     'python_ta',
                     'doctest',
@@ -0,0 +1,377 @@
+"""Assignment 1 - Grocery Store Event Logs
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file contains a fast reader for event files in the format read by
+create_event_list. Instead of creating an Event for every line, it reads the
+file in large blocks and stores the events in columns of compact arrays,
+creating Event objects only when they are asked for.
+
+It also contains a compiled, binary form of event files, which can be read
+back without parsing any text. The events in a compiled log are in
+timestamp order, so it can be streamed into a simulation without holding any
+of it back. Compile an event file with:
+
+    python eventlog.py events.txt events.bin
+"""
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterator
+
+from event import Event, CustomerArrival, CloseLine
+from store import Customer
+
+# The kinds of events in an event file, as stored in EventColumns.kinds.
+ARRIVE = 0
+CLOSE = 1
+
+# The number of bytes read from an event file at a time.
+CHUNK_SIZE = 1 << 22
+
+# The first bytes of a compiled event log.
+MAGIC = b'GSEVLOG2'
+
+# The header of a compiled event log, after MAGIC: the byte order of the
+# arrays (1 for little-endian), and the number of events, items, distinct
+# customer names, and bytes of encoded customer names.
+HEADER = struct.Struct('<Bxxxxxxxqqqq')
+
+
+class EventColumns:
+    """The events from an event file, stored column by column.
+
+    Event i is described by the i-th entry of each column. Its items, if it
+    is a CustomerArrival, are the entries of item_times from
+    item_offsets[i] up to (but not including) item_offsets[i + 1].
+
+    Attributes:
+    - timestamps: The time of each event.
+    - kinds: The kind of each event, either ARRIVE or CLOSE.
+    - names: The name of the arriving customer for each ARRIVE event, and ''
+      for each CLOSE event.
+    - line_numbers: The line closed by each CLOSE event, and -1 for each
+      ARRIVE event.
+    - item_offsets: Where the items of each event start in item_times.
+    - item_times: The time it takes to check out each item, for all events.
+
+    Representation Invariants:
+    - len(self.timestamps) == len(self.kinds) == len(self.names)
+      == len(self.line_numbers) == len(self.item_offsets) - 1
+    - self.item_offsets[0] == 0
+    - self.item_offsets[-1] == len(self.item_times)
+    - self.item_offsets is sorted in non-decreasing order
+    """
+
+    timestamps: array
+    kinds: bytearray
+    names: list[str]
+    line_numbers: array
+    item_offsets: array
+    item_times: array
+
+    def __init__(self) -> None:
+        """Initialize an EventColumns with no events."""
+        self.timestamps = array('q')
+        self.kinds = bytearray()
+        self.names = []
+        self.line_numbers = array('i')
+        self.item_offsets = array('q', [0])
+        self.item_times = array('i')
+
+    def __len__(self) -> int:
+        """Return the number of events in this EventColumns."""
+        return len(self.timestamps)
+
+    def event(self, i: int) -> Event:
+        """Return a new Event for event <i>.
+
+        Precondition:
+        - 0 <= i < len(self)
+        """
+        if self.kinds[i] == CLOSE:
+            return CloseLine(self.timestamps[i], self.line_numbers[i])
+        items = self.item_times[self.item_offsets[i]:self.item_offsets[i + 1]]
+        return CustomerArrival(self.timestamps[i],
+                               Customer.from_item_times(self.names[i], items))
+
+    def __iter__(self) -> Iterator[Event]:
+        """Yield a new Event for each event, in order."""
+        for i in range(len(self)):
+            yield self.event(i)
+
+    def add_lines(self, lines: list[bytes]) -> None:
+        """Add the events described by <lines>, which are lines of an event
+        file without their line endings. Blank lines are skipped.
+        """
+        timestamps = []
+        line_numbers = []
+        item_offsets = []
+        offset = self.item_offsets[-1]
+        item_times = []
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            kind = parts[1]
+            if kind == b'Arrive':
+                self.kinds.append(ARRIVE)
+                self.names.append(parts[2].decode())
+                line_numbers.append(-1)
+                times = parts[4::2]
+                item_times.extend(times)
+                offset += len(times)
+            elif kind == b'Close':
+                self.kinds.append(CLOSE)
+                self.names.append('')
+                line_numbers.append(int(parts[2]))
+            else:
+                continue
+            timestamps.append(parts[0])
+            item_offsets.append(offset)
+        self.timestamps.extend(map(int, timestamps))
+        self.line_numbers.extend(line_numbers)
+        self.item_offsets.extend(item_offsets)
+        self.item_times.extend(map(int, item_times))
+
+
+def read_event_columns(event_file_name: str,
+                       chunk_size: int = CHUNK_SIZE) -> EventColumns:
+    """Return the events in the file named <event_file_name>, in the same
+    order as they are in the file.
+
+    The file is memory-mapped and split into lines <chunk_size> bytes at a
+    time.
+
+    Preconditions:
+    - the file is in the format specified by the assignment handout
+    - chunk_size > 0
+    """
+    columns = EventColumns()
+    with open(event_file_name, 'rb') as event_file:
+        try:
+            data = mmap.mmap(event_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be memory-mapped.
+            return columns
+        with data:
+            start = 0
+            while start < len(data):
+                end = data.find(b'\n', start + chunk_size)
+                end = len(data) if end == -1 else end + 1
+                columns.add_lines(data[start:end].split(b'\n'))
+                start = end
+    return columns
+
+
+def describe(event: Event) -> tuple:
+    """Return a tuple with everything about <event> that can change a
+    simulation, for an event from an event file.
+
+    Events read in different ways from the same event file have the same
+    descriptions.
+
+    >>> describe(CloseLine(4, 1))
+    (4, 'Close', 1)
+    """
+    if isinstance(event, CustomerArrival):
+        customer = event.customer
+        return (event.timestamp, 'Arrive', customer.name,
+                customer.num_items(), customer.item_time())
+    if isinstance(event, CloseLine):
+        return event.timestamp, 'Close', event.line_number
+    return event.timestamp, type(event).__name__
+
+
+def _write_section(out: BinaryIO, data: bytes) -> None:
+    """Write <data> to <out>, padded with zeros to a multiple of 8 bytes so
+    that the next section is aligned."""
+    out.write(data)
+    out.write(bytes(-len(data) % 8))
+
+
+def compile_events(event_file_name: str, out_path: str) -> int:
+    """Compile the event file named <event_file_name> into a binary event
+    log at <out_path>, and return the number of events in it.
+
+    The log holds the columns of an EventColumns, with each customer name
+    replaced by its index in a table of distinct names. The events are
+    sorted by timestamp, with events that have the same timestamp kept in
+    the order they are in the file, which is the order run handles them in.
+
+    Preconditions:
+    - the event file is in the format specified by the assignment handout
+    """
+    columns = _sorted_by_timestamp(read_event_columns(event_file_name))
+    name_ids = {}
+    args = array('i')
+    for kind, name, line_number in zip(columns.kinds, columns.names,
+                                       columns.line_numbers):
+        if kind == ARRIVE:
+            args.append(name_ids.setdefault(name, len(name_ids)))
+        else:
+            args.append(line_number)
+    encoded = [name.encode() for name in name_ids]
+    name_offsets = array('q', [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+    with open(out_path, 'wb') as out:
+        out.write(MAGIC)
+        out.write(HEADER.pack(sys.byteorder == 'little', len(columns),
+                              len(columns.item_times), len(encoded),
+                              name_offsets[-1]))
+        for section in [columns.timestamps, columns.kinds, args,
+                        columns.item_offsets, columns.item_times,
+                        name_offsets, b''.join(encoded)]:
+            _write_section(out, bytes(section))
+    return len(columns)
+
+
+def _sorted_by_timestamp(columns: EventColumns) -> EventColumns:
+    """Return the events in <columns> sorted by timestamp, with events that
+    have the same timestamp in the same order as in <columns>.
+
+    Return <columns> itself if it is already sorted.
+    """
+    timestamps = columns.timestamps
+    if all(map(int.__le__, timestamps, timestamps[1:])):
+        return columns
+    result = EventColumns()
+    offsets = columns.item_offsets
+    for i in sorted(range(len(columns)), key=timestamps.__getitem__):
+        result.timestamps.append(timestamps[i])
+        result.kinds.append(columns.kinds[i])
+        result.names.append(columns.names[i])
+        result.line_numbers.append(columns.line_numbers[i])
+        result.item_times.extend(
+            columns.item_times[offsets[i]:offsets[i + 1]])
+        result.item_offsets.append(len(result.item_times))
+    return result
+
+
+class CompiledEventLog:
+    """A compiled event log, read through a memory map.
+
+    The columns of the log are views of the mapped file, so opening a log
+    reads nothing but its header, and Event objects are only created as
+    they are asked for. The events are in timestamp order, so a log can be
+    passed straight to GroceryStoreSimulation.run_stream.
+
+    Attributes:
+    - timestamps: The time of each event.
+    - kinds: The kind of each event, either ARRIVE or CLOSE.
+    - args: The index of the customer's name in the name table for each
+      ARRIVE event, and the line number for each CLOSE event.
+    - item_offsets, item_times: As in EventColumns.
+    - _name_offsets: Where each name in the name table starts and ends in
+      self._names.
+    - _names: The UTF-8 encoded names in the name table, end to end.
+    - _file: The open log file.
+    - _map: The memory map of self._file.
+    """
+
+    timestamps: memoryview
+    kinds: memoryview
+    args: memoryview
+    item_offsets: memoryview
+    item_times: memoryview
+    _name_offsets: memoryview
+    _names: memoryview
+    _file: BinaryIO
+    _map: mmap.mmap
+
+    def __init__(self, path: str) -> None:
+        """Open the compiled event log at <path>.
+
+        Raise a ValueError if <path> is not a compiled event log for this
+        machine's byte order.
+        """
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not a compiled event log')
+        little, num_events, num_items, num_names, name_bytes = \
+            HEADER.unpack_from(self._map, len(MAGIC))
+        if bool(little) != (sys.byteorder == 'little'):
+            self.close()
+            raise ValueError(f'{path} was compiled with another byte order')
+        view = memoryview(self._map)
+        start = len(MAGIC) + HEADER.size
+        sections = []
+        for size, code in [(num_events * 8, 'q'), (num_events, 'B'),
+                           (num_events * 4, 'i'), ((num_events + 1) * 8, 'q'),
+                           (num_items * 4, 'i'), ((num_names + 1) * 8, 'q'),
+                           (name_bytes, 'B')]:
+            sections.append(view[start:start + size].cast(code))
+            start += size + (-size % 8)
+        view.release()
+        self.timestamps, self.kinds, self.args, self.item_offsets, \
+            self.item_times, self._name_offsets, self._names = sections
+
+    def __len__(self) -> int:
+        """Return the number of events in this log."""
+        return len(self.timestamps)
+
+    def name(self, name_id: int) -> str:
+        """Return the customer name with index <name_id> in the name table.
+        """
+        start = self._name_offsets[name_id]
+        return str(self._names[start:self._name_offsets[name_id + 1]],
+                   'utf-8')
+
+    def event(self, i: int) -> Event:
+        """Return a new Event for event <i>.
+
+        Precondition:
+        - 0 <= i < len(self)
+        """
+        if self.kinds[i] == CLOSE:
+            return CloseLine(self.timestamps[i], self.args[i])
+        items = self.item_times[self.item_offsets[i]:self.item_offsets[i + 1]]
+        return CustomerArrival(
+            self.timestamps[i],
+            Customer.from_item_times(self.name(self.args[i]), items))
+
+    def __iter__(self) -> Iterator[Event]:
+        """Yield a new Event for each event, in order."""
+        for i in range(len(self)):
+            yield self.event(i)
+
+    def close(self) -> None:
+        """Close this log. Its columns can no longer be used."""
+        for attr in ['timestamps', 'kinds', 'args', 'item_offsets',
+                     'item_times', '_name_offsets', '_names']:
+            if hasattr(self, attr):
+                getattr(self, attr).release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> CompiledEventLog:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python eventlog.py EVENT_FILE OUT_PATH')
+    print(f'compiled {compile_events(sys.argv[1], sys.argv[2])} events')
@@ -0,0 +1,389 @@
+"""Assignment 1 - Grocery Store Simulation Traces
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file records a trace of every event a simulation handles, as rows of
+(timestamp, event type, line number, customer name). The rows are written
+into a block of compact arrays, allocated a block at a time, and each full
+block of rows is written to the trace file by a background thread while the
+simulation carries on. At most
+MAX_PENDING_BLOCKS full blocks wait for the writer; after that, recording
+waits for it to catch up.
+
+A trace file whose name ends in .csv is written as CSV with a header row.
+Any other trace file is binary: TRACE_MAGIC, then for each block its number
+of rows, its timestamps, line numbers and event types, the length in bytes
+of each customer name, and the total length of the names followed by the
+names themselves in UTF-8, each section padded to a multiple of 8 bytes and
+in this machine's byte order. Read a binary trace with read_trace.
+"""
+from __future__ import annotations
+
+import csv
+import queue
+import struct
+import threading
+from array import array
+from itertools import accumulate
+from typing import Any, BinaryIO, TextIO
+
+from event import Event, CustomerArrival, CustomerRetry, CheckoutStarted, \
+    CheckoutCompleted, CloseLine
+from store import Customer
+
+# The event types in a trace, by their code in TraceColumns.types.
+EVENT_TYPES = [CustomerArrival, CustomerRetry, CheckoutStarted,
+               CheckoutCompleted, CloseLine]
+
+# The number of rows in each block written to a trace file.
+BLOCK_ROWS = 1 << 16
+
+# The number of full blocks that may wait to be written at a time.
+MAX_PENDING_BLOCKS = 4
+
+# The first bytes of a binary trace file.
+TRACE_MAGIC = b'GSTRACE2'
+
+# The number of rows in a block, or the length of its names.
+COUNT = struct.Struct('<q')
+
+
+class TraceColumns:
+    """The rows of a trace, stored column by column.
+
+    Attributes:
+    - timestamps: The time of each event.
+    - types: The index in EVENT_TYPES of the type of each event.
+    - lines: The checkout line of each event, or -1 if it has none.
+    - names: The name of the customer in each event, or '' if it has none.
+
+    Representation Invariants:
+    - len(self.timestamps) == len(self.types) == len(self.lines)
+      == len(self.names)
+    """
+
+    timestamps: array
+    types: bytearray
+    lines: array
+    names: list[str]
+
+    def __init__(self, rows: int = 0) -> None:
+        """Initialize a TraceColumns with <rows> rows, each with timestamp
+        0, event type 0, line number 0 and customer name ''."""
+        self.timestamps = array('q', bytes(8 * rows))
+        self.types = bytearray(rows)
+        self.lines = array('i', bytes(4 * rows))
+        self.names = [''] * rows
+
+    def __len__(self) -> int:
+        """Return the number of rows in this TraceColumns."""
+        return len(self.timestamps)
+
+    def resize(self, rows: int) -> None:
+        """Remove rows from the end of this TraceColumns, or add rows to it
+        as __init__ does, so that it has <rows> rows.
+
+        >>> columns = TraceColumns(3)
+        >>> columns.resize(5)
+        >>> len(columns), columns.names[4]
+        (5, '')
+        >>> columns.resize(1)
+        >>> len(columns), len(columns.names)
+        (1, 1)
+        """
+        extra = rows - len(self)
+        if extra < 0:
+            del self.timestamps[rows:]
+            del self.types[rows:]
+            del self.lines[rows:]
+            del self.names[rows:]
+        else:
+            self.timestamps.frombytes(bytes(8 * extra))
+            self.types.extend(bytes(extra))
+            self.lines.frombytes(bytes(4 * extra))
+            self.names.extend([''] * extra)
+
+
+class TraceSink:
+    """Records the events handled by a simulation and writes them to a trace
+    file.
+
+    The writer thread is only started once the first block is full, and
+    does not keep Python running, so a sink that is never closed does not
+    stop the program from exiting, but the rows it has not written are
+    lost.
+
+    Attributes:
+    - path: The trace file being written.
+    - csv: True iff the trace file is written as CSV.
+    - block_rows: The number of rows handed to the writer at a time.
+    - rows: The number of rows handed to the writer so far.
+    - _block: The block the rows not yet handed to the writer are written
+      into, with room for the rows still to come.
+    - _recorded: The number of rows recorded in self._block.
+    - _joined: The number of rows in self._block, including those written
+      by join for the event that is recorded next.
+    - _file: The open trace file.
+    - _csv_writer: The CSV writer for the trace file, or None if it is
+      binary.
+    - _blocks: The blocks waiting to be written, followed by None once
+      this sink is closed.
+    - _writer: The thread writing the blocks, or None if no block has been
+      handed to it yet.
+    - _error: The exception raised while writing, or None if there was
+      none.
+
+    Representation Invariants:
+    - self.block_rows >= 1
+    - 0 <= self._recorded < self.block_rows
+    - self._recorded <= self._joined <= len(self._block)
+    - (self._csv_writer is None) == (not self.csv)
+    """
+
+    path: str
+    csv: bool
+    block_rows: int
+    rows: int
+    _block: TraceColumns
+    _recorded: int
+    _joined: int
+    _file: BinaryIO | TextIO
+    _csv_writer: Any
+    _blocks: queue.Queue[TraceColumns | None]
+    _writer: threading.Thread | None
+    _error: Exception | None
+
+    def __init__(self, path: str, block_rows: int = BLOCK_ROWS) -> None:
+        """Initialize a TraceSink that writes to a new trace file at <path>
+        in blocks of <block_rows> rows.
+
+        Precondition:
+        - block_rows >= 1
+        """
+        self.path = path
+        self.csv = path.endswith('.csv')
+        self.block_rows = block_rows
+        self.rows = 0
+        self._block = TraceColumns(block_rows)
+        self._recorded = 0
+        self._joined = 0
+        self._error = None
+        if self.csv:
+            self._file = open(path, 'w', newline='')
+            self._csv_writer = csv.writer(self._file)
+            self._csv_writer.writerow(['timestamp', 'event', 'line',
+                                       'customer'])
+        else:
+            self._file = open(path, 'wb')
+            self._file.write(TRACE_MAGIC)
+            self._csv_writer = None
+        self._blocks = queue.Queue(MAX_PENDING_BLOCKS)
+        self._writer = None
+
+    def join(self, line_number: int, customer: Customer) -> None:
+        """Record that <customer> joined line <line_number> while doing the
+        event that is recorded next, which fills in the rest of the row."""
+        block = self._block
+        i = self._joined
+        if i == len(block.names):
+            # Only a CustomerRetry can fill the block before it is recorded,
+            # since a full block is handed off after each event.
+            block.resize(i + self.block_rows)
+        block.lines[i] = line_number
+        block.names[i] = customer.name
+        self._joined = i + 1
+
+    def record(self, event: Event, new_events: list[Event]) -> None:
+        """Record <event>, which has just been done and generated
+        <new_events>.
+
+        An event with no customer, such as a CloseLine, or a CheckoutStarted
+        for an empty line, has customer name ''. A CustomerRetry is recorded
+        as one row for each customer who joined a line, or as one row with
+        line -1 and no customer if none did.
+        """
+        block = self._block
+        i = self._joined
+        kind = type(event)
+        if kind is CheckoutCompleted:
+            block.types[i] = 3
+            block.lines[i] = event.line_number
+            block.names[i] = event.customer.name
+        elif kind is CheckoutStarted:
+            block.types[i] = 2
+            block.lines[i] = event.line_number
+            if new_events:
+                block.names[i] = new_events[0].customer.name
+        elif kind is CustomerArrival:
+            # New rows already have event type 0, for a CustomerArrival.
+            if i > self._recorded:
+                i -= 1
+            else:
+                block.lines[i] = -1
+                block.names[i] = event.customer.name
+        elif kind is CustomerRetry:
+            start = self._recorded
+            if i > start:
+                block.types[start:i] = b'\x01' * (i - start)
+                block.timestamps[start:i] = \
+                    array('q', [event.timestamp]) * (i - start)
+                i -= 1
+            else:
+                block.types[i] = 1
+                block.lines[i] = -1
+        else:
+            block.types[i] = 4
+            block.lines[i] = event.line_number
+        block.timestamps[i] = event.timestamp
+        i += 1
+        self._recorded = self._joined = i
+        if i >= self.block_rows:
+            self._hand_off()
+
+    def _hand_off(self) -> None:
+        """Hand the rows recorded in the current block to the writer,
+        starting the writer if it has not been started, and start a new
+        block.
+
+        Wait for the writer if MAX_PENDING_BLOCKS blocks are already waiting.
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_blocks,
+                                            daemon=True)
+            self._writer.start()
+        block = self._block
+        block.resize(self._recorded)
+        self.rows += self._recorded
+        self._blocks.put(block)
+        self._block = TraceColumns(self.block_rows)
+        self._recorded = self._joined = 0
+
+    def _write_blocks(self) -> None:
+        """Write each block handed to the writer until this sink is closed.
+
+        After an error, the remaining blocks are discarded.
+        """
+        while True:
+            block = self._blocks.get()
+            if block is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                if self._csv_writer is not None:
+                    self._write_csv(block)
+                else:
+                    self._write_binary(block)
+            except OSError as error:
+                self._error = error
+
+    def _write_csv(self, block: TraceColumns) -> None:
+        """Write the rows of <block> to the trace file as CSV."""
+        type_names = map([kind.__name__ for kind in EVENT_TYPES].__getitem__,
+                         block.types)
+        if _needs_quotes(''.join(block.names)):
+            self._csv_writer.writerows(zip(block.timestamps, type_names,
+                                           block.lines, block.names))
+        else:
+            # No field needs quoting, so the rows are written as
+            # self._csv_writer would write them, but much faster.
+            self._file.writelines(map('{},{},{},{}\r\n'.format,
+                                      block.timestamps, type_names,
+                                      block.lines, block.names))
+
+    def _write_binary(self, block: TraceColumns) -> None:
+        """Write <block> to the trace file as a binary block."""
+        out = self._file
+        out.write(COUNT.pack(len(block)))
+        for column in [block.timestamps, block.lines, block.types]:
+            _write_section(out, bytes(column))
+        text = ''.join(block.names)
+        if text.isascii():
+            # Each name has as many bytes as characters, so they can all be
+            # encoded at once.
+            data = text.encode()
+            lengths = array('q', map(len, block.names))
+        else:
+            names = [name.encode() for name in block.names]
+            data = b''.join(names)
+            lengths = array('q', map(len, names))
+        _write_section(out, bytes(lengths))
+        out.write(COUNT.pack(len(data)))
+        _write_section(out, data)
+
+    def close(self) -> None:
+        """Write the rows recorded so far and close the trace file.
+
+        Raise the error that stopped the trace from being written, if there
+        was one.
+        """
+        if self._recorded > 0:
+            self._hand_off()
+        if self._writer is not None:
+            self._blocks.put(None)
+            self._writer.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+
+def _needs_quotes(text: str) -> bool:
+    """Return True iff <text> has a character that a CSV writer with the
+    default dialect would quote a field for."""
+    return ',' in text or '"' in text or '\r' in text or '\n' in text
+
+
+def _write_section(out: BinaryIO, data: bytes) -> None:
+    """Write <data> to <out>, padded with zeros to a multiple of 8 bytes."""
+    out.write(data)
+    out.write(bytes(-len(data) % 8))
+
+
+def read_trace(path: str) -> TraceColumns:
+    """Return the rows of the binary trace file at <path>.
+
+    Raise a ValueError if <path> is not a binary trace file.
+
+    Precondition:
+    - the trace was written on a machine with the same byte order
+    """
+    with open(path, 'rb') as trace_file:
+        data = memoryview(trace_file.read())
+    if data[:len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError(f'{path} is not a binary trace')
+    trace = TraceColumns()
+    start = len(TRACE_MAGIC)
+    while start < len(data):
+        count = COUNT.unpack_from(data, start)[0]
+        start += COUNT.size
+        for column in [trace.timestamps, trace.lines]:
+            size = count * column.itemsize
+            column.frombytes(data[start:start + size])
+            start += size + (-size % 8)
+        trace.types.extend(data[start:start + count])
+        start += count + (-count % 8)
+        lengths = array('q')
+        lengths.frombytes(data[start:start + count * lengths.itemsize])
+        start += count * lengths.itemsize
+        size = COUNT.unpack_from(data, start)[0]
+        start += COUNT.size
+        names = data[start:start + size]
+        ends = list(accumulate(lengths))
+        trace.names.extend(str(names[end - length:end], 'utf-8')
+                           for end, length in zip(ends, lengths))
+        start += size + (-size % 8)
+    return trace
@@ -0,0 +1,211 @@
+"""Assignment 1 - Fast Fixed-Policy Grocery Store Simulation
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file contains a fast alternative to GroceryStoreSimulation for event
+files with no CloseLine events, in stores where no customer ever finds every
+line they may join full. Under those conditions, the simulation is fully
+described by which line each customer joins and when they start and finish
+checking out, and these can be computed straight from the columns of an
+EventColumns without creating any Event, Customer or CheckoutLine objects.
+
+The customers follow the same policy as in store.py: each joins the
+shortest line that can accept them, choosing the lowest index among lines
+of equal length, where only customers with at most EXPRESS_LIMIT items may
+join an express line, and checking out at a self-serve line takes twice as
+long.
+"""
+from __future__ import annotations
+
+from array import array
+from heapq import heapify, heappush, heappop, heapreplace
+from itertools import accumulate, islice
+from operator import gt, sub
+
+from eventlog import EventColumns, CLOSE
+from store import EXPRESS_LIMIT
+
+
+class Assignment:
+    """The checkout line, start time and finish time of every customer in an
+    EventColumns.
+
+    Customer i is the customer arriving in event i of the EventColumns.
+
+    Attributes:
+    - names: The name of each customer.
+    - arrival_times: The time each customer arrived.
+    - lines: The index of the line each customer joined.
+    - starts: The time each customer started checking out.
+    - finishes: The time each customer finished checking out.
+
+    Representation Invariants:
+    - len(self.names) == len(self.arrival_times) == len(self.lines)
+      == len(self.starts) == len(self.finishes)
+    - self.arrival_times[i] <= self.starts[i] <= self.finishes[i] for each i
+    """
+
+    names: list[str]
+    arrival_times: array
+    lines: array
+    starts: array
+    finishes: array
+
+    def __init__(self, columns: EventColumns) -> None:
+        """Initialize an Assignment for the customers in <columns>, with
+        every customer in line 0 from time 0 until they are assigned."""
+        n = len(columns)
+        self.names = columns.names
+        self.arrival_times = columns.timestamps
+        self.lines = array('i', bytes(4 * n))
+        self.starts = array('q', bytes(8 * n))
+        self.finishes = array('q', bytes(8 * n))
+
+    def __len__(self) -> int:
+        """Return the number of customers in this Assignment."""
+        return len(self.lines)
+
+    def stats(self) -> dict[str, int]:
+        """Return the stats that GroceryStoreSimulation.run would report for
+        these customers."""
+        return {'num_customers': len(set(self.names)),
+                'total_time': max(self.finishes, default=0),
+                'max_wait': max(map(sub, self.finishes, self.arrival_times),
+                                default=0)}
+
+
+def assign_lines(config: dict[str, int], columns: EventColumns) -> Assignment:
+    """Return the line, start time and finish time of every customer in
+    <columns>, arriving at a store with the configuration <config>.
+
+    The customers are simulated exactly as GroceryStoreSimulation would, so
+    the stats of the Assignment are the stats of a run of the same events.
+
+    Raise a ValueError if <columns> has a CLOSE event, or if a customer
+    arrives to find every line they may join full, since customers then
+    wait for a line to open and this function does not model that. Run
+    those events with GroceryStoreSimulation instead.
+
+    Preconditions:
+    - config has the keys regular_count, express_count, self_serve_count,
+      and line_capacity, all >= 0
+    """
+    if CLOSE in columns.kinds:
+        raise ValueError('assign_lines cannot simulate CloseLine events')
+    capacity = config['line_capacity']
+    first_express = config['regular_count']
+    first_self_serve = first_express + config['express_count']
+    num_lines = first_self_serve + config['self_serve_count']
+    factors = [2 if i >= first_self_serve else 1 for i in range(num_lines)]
+    is_express = [first_express <= i < first_self_serve
+                  for i in range(num_lines)]
+
+    # The checkout time and number of items of every customer, from the
+    # running totals of item_times.
+    ends = columns.item_offsets[1:]
+    starts = columns.item_offsets[:-1]
+    totals = array('q', accumulate(columns.item_times, initial=0))
+    item_times = list(map(sub, map(totals.__getitem__, ends),
+                          map(totals.__getitem__, starts)))
+    num_items = list(map(sub, ends, starts))
+
+    result = Assignment(columns)
+    timestamps = columns.timestamps
+    # Whether each customer may join an express line, found for all of them
+    # at once.
+    may_express = [k <= EXPRESS_LIMIT for k in num_items]
+    order = range(len(timestamps))
+    if any(map(gt, timestamps, islice(timestamps, 1, None))):
+        order = sorted(order, key=timestamps.__getitem__)
+    lengths = [0] * num_lines
+    last_finish = [0] * num_lines
+    # (length, index) of the lines with room, as in GroceryStore, where an
+    # entry is current iff the length is the line's length. Express lines
+    # are in a heap of their own, and heaps[i] is the heap for line i. A
+    # customer joins the line at the top of a heap, so its entry is replaced
+    # there, and only customers leaving leave entries that are not current.
+    open_lines = []
+    open_express = []
+    heaps = [open_express if is_express[i] else open_lines
+             for i in range(num_lines)]
+    if capacity > 0:
+        for i in range(num_lines):
+            heaps[i].append((0, i))
+    # (finish, line) of every customer still in a line.
+    in_line = []
+    lines, starts, finishes = result.lines, result.starts, result.finishes
+    for i in order:
+        now = timestamps[i]
+        # Customers finishing at the time of an arrival are still in line,
+        # since arrivals from the event file are handled first.
+        while in_line and in_line[0][0] < now:
+            line = heappop(in_line)[1]
+            lengths[line] -= 1
+            heappush(heaps[line], (lengths[line], line))
+        heap = open_lines
+        best = _current_top(open_lines, lengths)
+        if may_express[i] and open_express:
+            express = _current_top(open_express, lengths)
+            if express is not None and (best is None or express < best):
+                heap = open_express
+                best = express
+        if best is None:
+            raise ValueError(f'customer {columns.names[i]} finds every line '
+                             f'full at time {now}')
+        line = best[1]
+        length = lengths[line] = best[0] + 1
+        if length < capacity:
+            heapreplace(heap, (length, line))
+        else:
+            heappop(heap)
+        start = now if now > last_finish[line] else last_finish[line]
+        finish = last_finish[line] = start + item_times[i] * factors[line]
+        heappush(in_line, (finish, line))
+        lines[i] = line
+        starts[i] = start
+        finishes[i] = finish
+        if len(open_lines) + len(open_express) > 2 * num_lines + 8:
+            # Entries that are no longer current pile up, so start over.
+            for heap in open_lines, open_express:
+                heap[:] = [(lengths[j], j) for j in range(num_lines)
+                           if heaps[j] is heap and lengths[j] < capacity]
+                heapify(heap)
+    return result
+
+
+def _current_top(heap: list[tuple[int, int]],
+                 lengths: list[int]) -> tuple[int, int] | None:
+    """Discard the entries at the top of <heap> that are no longer current,
+    and return the top entry, or None if there is none."""
+    while heap and heap[0][0] != lengths[heap[0][1]]:
+        heappop(heap)
+    return heap[0] if heap else None
+
+
+if __name__ == '__main__':
+    check_pyta = True
+    if check_pyta:
+        import python_ta
+
+        python_ta.check_all(
+            config={
+                'allowed-import-modules': [
+                    '__future__', 'array', 'heapq', 'itertools', 'operator',
+                    'eventlog', 'store', 'python_ta'
+                ],
+            }
+        )
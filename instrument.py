@@ -0,0 +1,198 @@
+"""Assignment 1 - Grocery Store Simulation Instrumentation
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file contains the classes that measure where a grocery store simulation
+spends its time. Instrumentation is turned on for a simulation with
+GroceryStoreSimulation.instrument, and costs nothing when it is off.
+"""
+from __future__ import annotations
+
+import cProfile
+import pstats
+from collections import deque
+from time import perf_counter
+from typing import Any, Iterable, TextIO
+
+from container import Container
+
+
+class Instrumentation:
+    """Measurements of a grocery store simulation.
+
+    Attributes:
+    - event_counts: The number of events handled, by event class name.
+    - event_seconds: The time spent handling events, by event class name.
+      This includes doing the event and updating the statistics, but not
+      adding the events it generates to the event queue.
+    - queue: The event queue being measured.
+    - profiler: A cProfile profiler that runs while the simulation runs, or
+      None if no profile is being captured.
+
+    Representation Invariants:
+    - self.event_counts.keys() == self.event_seconds.keys()
+    """
+
+    event_counts: dict[str, int]
+    event_seconds: dict[str, float]
+    queue: InstrumentedQueue
+    profiler: cProfile.Profile | None
+
+    def __init__(self, events: Container, profile: bool = False) -> None:
+        """Initialize an Instrumentation that measures the event queue
+        <events>, and that captures a cProfile profile iff <profile> is True.
+        """
+        self.event_counts = {}
+        self.event_seconds = {}
+        self.queue = InstrumentedQueue(events)
+        self.profiler = cProfile.Profile() if profile else None
+
+    def record_event(self, event_class: str, seconds: float) -> None:
+        """Record that an event of class <event_class> took <seconds> to
+        handle."""
+        if event_class in self.event_counts:
+            self.event_counts[event_class] += 1
+            self.event_seconds[event_class] += seconds
+        else:
+            self.event_counts[event_class] = 1
+            self.event_seconds[event_class] = seconds
+
+    def report(self) -> dict[str, Any]:
+        """Return the measurements so far as a dictionary with these keys:
+
+        'events': for each event class name, a dictionary with the 'count'
+            of events handled, their total 'seconds', and the mean
+            'microseconds' per event
+        'queue': a dictionary with the number of 'adds' and 'removes', the
+            total 'add_seconds' and 'remove_seconds', and the
+            'peak_depth' of the event queue
+        """
+        events = {}
+        for name, count in self.event_counts.items():
+            seconds = self.event_seconds[name]
+            events[name] = {'count': count, 'seconds': seconds,
+                            'microseconds': seconds / count * 1e6}
+        queue = self.queue
+        return {'events': events,
+                'queue': {'adds': queue.adds, 'removes': queue.removes,
+                          'add_seconds': queue.add_seconds,
+                          'remove_seconds': queue.remove_seconds,
+                          'peak_depth': queue.peak_depth}}
+
+    def print_profile(self, out: TextIO | None = None,
+                      limit: int = 20) -> None:
+        """Print the <limit> entries of the captured profile with the most
+        cumulative time to <out>, or to standard output if <out> is None.
+
+        Precondition:
+        - self.profiler is not None
+        """
+        stats = pstats.Stats(self.profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+
+
+class InstrumentedQueue(Container):
+    """A Container that measures the operations on another Container.
+
+    Attributes:
+    - adds: The number of items added.
+    - removes: The number of items removed.
+    - add_seconds: The total time spent adding items.
+    - remove_seconds: The total time spent removing items.
+    - depth: The number of items in the container.
+    - peak_depth: The largest number of items that were in the container at
+      once.
+    - _items: The container being measured.
+
+    Representation Invariants:
+    - self.depth == self.adds - self.removes
+    - self.peak_depth >= self.depth
+    """
+
+    adds: int
+    removes: int
+    add_seconds: float
+    remove_seconds: float
+    depth: int
+    peak_depth: int
+    _items: Container
+
+    def __init__(self, items: Container) -> None:
+        """Initialize an InstrumentedQueue that measures <items>.
+
+        Precondition:
+        - items.is_empty()
+        """
+        self.adds = 0
+        self.removes = 0
+        self.add_seconds = 0.0
+        self.remove_seconds = 0.0
+        self.depth = 0
+        self.peak_depth = 0
+        self._items = items
+
+    def add(self, item: Any) -> None:
+        """Add <item> to the measured container."""
+        start = perf_counter()
+        self._items.add(item)
+        self.add_seconds += perf_counter() - start
+        self.adds += 1
+        self.depth += 1
+        if self.depth > self.peak_depth:
+            self.peak_depth = self.depth
+
+    def remove(self) -> Any:
+        """Remove and return the next item from the measured container."""
+        start = perf_counter()
+        item = self._items.remove()
+        self.remove_seconds += perf_counter() - start
+        self.removes += 1
+        self.depth -= 1
+        return item
+
+    def add_all(self, items: Iterable[Any]) -> None:
+        """Add each of <items> to the measured container, in order."""
+        items = list(items)
+        start = perf_counter()
+        self._items.add_all(items)
+        self.add_seconds += perf_counter() - start
+        self.adds += len(items)
+        self.depth += len(items)
+        if self.depth > self.peak_depth:
+            self.peak_depth = self.depth
+
+    def remove_all_equal(self) -> deque:
+        """Remove and return the next item from the measured container and
+        every item equal to it."""
+        start = perf_counter()
+        items = self._items.remove_all_equal()
+        self.remove_seconds += perf_counter() - start
+        self.removes += len(items)
+        self.depth -= len(items)
+        return items
+
+    def peek(self) -> Any:
+        """Return the next item from the measured container."""
+        return self._items.peek()
+
+    def measured(self) -> Container:
+        """Return the container being measured."""
+        return self._items
+
+    def is_empty(self) -> bool:
+        """Return True iff the measured container is empty."""
+        return self._items.is_empty()
@@ -0,0 +1,317 @@
+"""Assignment 1 - Grocery Store Simulation Metrics
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file contains the classes that collect detailed statistics while a
+grocery store simulation runs, using memory proportional to the number of
+checkout lines rather than the number of customers.
+"""
+from __future__ import annotations
+
+import math
+from hashlib import blake2b
+from array import array
+from typing import Any
+
+from event import Event, CustomerArrival, CustomerRetry, CheckoutStarted, \
+    CheckoutCompleted, CloseLine
+from store import GroceryStore
+
+
+class QuantileSketch:
+    """A summary of a stream of non-negative numbers that can estimate any
+    quantile of the stream to within a relative error, in constant memory.
+
+    Positive values are counted in buckets whose bounds grow geometrically,
+    so the number of buckets grows only with the logarithm of the largest
+    value. Every estimate is within a factor of (1 +/- accuracy) of a value
+    with the requested rank.
+
+    Attributes:
+    - accuracy: The relative error of the estimates.
+    - count: The number of values added.
+    - total: The sum of the values added.
+    - _gamma: The ratio between the bounds of consecutive buckets.
+    - _log_gamma: The natural logarithm of self._gamma.
+    - _zeros: The number of values added that were 0.
+    - _buckets: For each bucket that has any values, the number of values in
+      it. Bucket i holds the values in (gamma ** (i - 1), gamma ** i].
+
+    Representation Invariants:
+    - 0 < self.accuracy < 1
+    - self.count == self._zeros + sum(self._buckets.values())
+    """
+
+    accuracy: float
+    count: int
+    total: float
+    _gamma: float
+    _log_gamma: float
+    _zeros: int
+    _buckets: dict[int, int]
+
+    def __init__(self, accuracy: float = 0.01) -> None:
+        """Initialize an empty QuantileSketch with the given <accuracy>.
+
+        Preconditions:
+        - 0 < accuracy < 1
+        """
+        self.accuracy = accuracy
+        self.count = 0
+        self.total = 0
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._zeros = 0
+        self._buckets = {}
+
+    def add(self, value: float) -> None:
+        """Add <value> to this sketch.
+
+        Precondition:
+        - value >= 0
+        """
+        self.count += 1
+        self.total += value
+        if value == 0:
+            self._zeros += 1
+            return
+        i = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[i] = self._buckets.get(i, 0) + 1
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Add all the values summarized by <other> to this sketch.
+
+        Precondition:
+        - other.accuracy == self.accuracy
+        """
+        self.count += other.count
+        self.total += other.total
+        self._zeros += other._zeros
+        for i, n in other._buckets.items():
+            self._buckets[i] = self._buckets.get(i, 0) + n
+
+    def quantile(self, q: float) -> float:
+        """Return an estimate of the <q>-quantile of the values added.
+
+        Preconditions:
+        - 0 <= q <= 1
+        - self.count > 0
+
+        >>> sketch = QuantileSketch(0.01)
+        >>> for value in range(1, 1001):
+        ...     sketch.add(value)
+        >>> abs(sketch.quantile(0.5) - 500) <= 5
+        True
+        >>> abs(sketch.quantile(0.99) - 990) <= 10
+        True
+        """
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0
+        for i in sorted(self._buckets):
+            seen += self._buckets[i]
+            if rank < seen:
+                return 2 * self._gamma ** i / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+
+class HyperLogLog:
+    """An estimate of the number of distinct strings in a stream, in memory
+    that does not depend on the length of the stream.
+
+    Each string is hashed to 64 bits. The low bits of the hash choose a
+    register, and the register keeps the largest number of leading zeros
+    (plus one) seen in the rest of the hash. Hashes do not depend on the
+    process, so sketches can be saved and merged anywhere.
+
+    Like a set of strings, a HyperLogLog has add and len, so it can be used
+    in place of one to count the distinct strings.
+
+    Attributes:
+    - error: The relative standard error of the estimate.
+    - _precision: The number of hash bits that choose a register.
+    - _registers: The register for each value of the low bits of the hash.
+
+    Representation Invariants:
+    - len(self._registers) == 2 ** self._precision
+    - 4 <= self._precision <= 18
+    """
+
+    error: float
+    _precision: int
+    _registers: bytearray
+
+    def __init__(self, error: float = 0.01) -> None:
+        """Initialize an empty HyperLogLog with a relative standard error of
+        at most <error>, or as close to it as 2 ** 18 registers allow.
+
+        Precondition:
+        - 0 < error < 1
+        """
+        self._precision = min(18, max(4, math.ceil(
+            2 * math.log2(1.04 / error))))
+        self.error = 1.04 / math.sqrt(2 ** self._precision)
+        self._registers = bytearray(2 ** self._precision)
+
+    def add(self, item: str) -> None:
+        """Add <item> to the stream."""
+        x = int.from_bytes(blake2b(item.encode(), digest_size=8).digest(),
+                           'little')
+        i = x & (len(self._registers) - 1)
+        rank = 65 - self._precision - (x >> self._precision).bit_length()
+        if rank > self._registers[i]:
+            self._registers[i] = rank
+
+    def merge(self, other: HyperLogLog) -> None:
+        """Add all the strings counted by <other> to this HyperLogLog.
+
+        Precondition:
+        - other.error == self.error
+        """
+        self._registers = bytearray(map(max, self._registers,
+                                        other._registers))
+
+    def __len__(self) -> int:
+        """Return the estimated number of distinct strings added.
+
+        >>> counter = HyperLogLog(0.01)
+        >>> for i in range(20000):
+        ...     counter.add(f'c{i % 10000}')
+        >>> abs(len(counter) - 10000) <= 300
+        True
+        """
+        m = len(self._registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(
+            2.0 ** -r for r in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small counts.
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+class StatsCollector:
+    """Detailed statistics about a grocery store simulation, updated as each
+    event is handled.
+
+    Attributes:
+    - waits: A sketch of the waiting time of every customer who finished
+      checking out, from their first arrival to the end of their checkout.
+    - now: The timestamp of the latest event handled.
+    - _line_types: The class name of each checkout line.
+    - _lengths: The length of each line after the latest event on it.
+    - _since: When each line last changed length.
+    - _length_area: For each line, the integral over time of its length,
+      up to self._since for that line.
+    - _busy: For each line, the total time spent checking out customers.
+    - _completed: For each line, the number of customers who finished
+      checking out there.
+
+    Representation Invariants:
+    - _line_types, _lengths, _since, _length_area, _busy and _completed all
+      have one entry per checkout line
+    """
+
+    waits: QuantileSketch
+    now: int
+    _line_types: list[str]
+    _lengths: array
+    _since: array
+    _length_area: array
+    _busy: array
+    _completed: array
+
+    def __init__(self, store: GroceryStore, accuracy: float = 0.01) -> None:
+        """Initialize a StatsCollector for a simulation of <store>, with wait
+        time quantiles estimated to within a relative error of <accuracy>.
+
+        Precondition:
+        - every line in store is empty
+        """
+        self.waits = QuantileSketch(accuracy)
+        self.now = 0
+        self._line_types = [type(line).__name__ for line in store.lines]
+        self._lengths = array('q', [0] * store.num_lines)
+        self._since = array('q', [0] * store.num_lines)
+        self._length_area = array('q', [0] * store.num_lines)
+        self._busy = array('q', [0] * store.num_lines)
+        self._completed = array('q', [0] * store.num_lines)
+
+    def observe(self, event: Event, new_events: list[Event],
+                store: GroceryStore) -> None:
+        """Update the statistics for <event>, which was just done in <store>
+        and generated <new_events>.
+
+        Precondition:
+        - store.joins holds the lines joined, and the customers who joined
+          them, while doing <event>. It is cleared once they are counted.
+        """
+        self.now = event.timestamp
+        if isinstance(event, (CustomerArrival, CustomerRetry)):
+            for line_number, _ in store.joins:
+                self._line_changed(line_number, store)
+            store.joins.clear()
+        elif isinstance(event, CheckoutStarted):
+            if new_events:
+                self._busy[event.line_number] += \
+                    new_events[0].timestamp - event.timestamp
+        elif isinstance(event, CheckoutCompleted):
+            self._completed[event.line_number] += 1
+            self.waits.add(event.timestamp - event.customer.arrival_time)
+            self._line_changed(event.line_number, store)
+        elif isinstance(event, CloseLine):
+            self._line_changed(event.line_number, store)
+
+    def _line_changed(self, line_number: int, store: GroceryStore) -> None:
+        """Record that line <line_number> may have changed length at time
+        self.now."""
+        self._length_area[line_number] += self._lengths[line_number] * (
+            self.now - self._since[line_number])
+        self._since[line_number] = self.now
+        self._lengths[line_number] = len(store.lines[line_number])
+
+    def report(self) -> dict[str, Any]:
+        """Return the statistics so far as a dictionary with these keys:
+
+        'wait': the 'count', 'mean', and 'p50', 'p90', 'p99' quantiles of
+            the customers' waiting times, or just the count if it is 0
+        'lines': for each line, a dictionary with its 'type', its
+            'utilization' (the fraction of time it spent checking out
+            customers), its 'mean_length' over time, and its 'completed'
+            customers
+        'throughput': for each line type, the number of customers who
+            finished checking out at a line of that type per unit of time
+        """
+        elapsed = self.now or 1
+        wait = {'count': self.waits.count}
+        if self.waits.count > 0:
+            wait['mean'] = self.waits.total / self.waits.count
+            for q in [50, 90, 99]:
+                wait[f'p{q}'] = self.waits.quantile(q / 100)
+        lines = []
+        throughput = {}
+        for i, line_type in enumerate(self._line_types):
+            area = self._length_area[i] + self._lengths[i] * (
+                self.now - self._since[i])
+            lines.append({'type': line_type,
+                          'utilization': self._busy[i] / elapsed,
+                          'mean_length': area / elapsed,
+                          'completed': self._completed[i]})
+            throughput[line_type] = \
+                throughput.get(line_type, 0) + self._completed[i] / elapsed
+        return {'wait': wait, 'lines': lines, 'throughput': throughput}
@@ -0,0 +1,329 @@
+"""Assignment 1 - Real-Time Grocery Store Replays
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file replays a grocery store simulation against the clock with asyncio,
+for example to drive a live dashboard. Simulated time advances at a fixed
+number of time units per second, and a snapshot of the statistics is
+produced every few time units. While the replay runs, new events can be
+injected into it, either from the same program or by writing lines in the
+event file format to a local socket. For example, to replay a day at one
+simulated minute per second, printing a snapshot every simulated minute:
+
+    python replay.py config.json events.txt --speed 60 --interval 60 \
+        --port 8765
+
+Event files and the lines sent to the socket are parsed in a thread pool, so
+the event loop never waits for parsing.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from itertools import islice
+from typing import AsyncIterator, TextIO
+
+from container import HeapPriorityQueue
+from event import Event, CustomerArrival, CloseLine, create_event_list, \
+    in_timestamp_order
+from simulation import GroceryStoreSimulation
+
+# The number of lines of an event file parsed at a time.
+CHUNK_LINES = 4096
+
+# The number of bytes read from a socket at a time.
+READ_SIZE = 1 << 16
+
+
+def _read_events(event_file: TextIO, num_lines: int, last_read: int) \
+        -> tuple[list[Event], bool]:
+    """Return the events in the next <num_lines> lines of <event_file>, and
+    whether there may be more lines after them.
+
+    Raise a ValueError if the events are not in timestamp order, or if the
+    first is earlier than <last_read>, the time of the event before them.
+    """
+    lines = list(islice(event_file, num_lines))
+    events = list(in_timestamp_order(create_event_list(lines)))
+    if events and events[0].timestamp < last_read:
+        raise ValueError(f'event at time {events[0].timestamp} is out of '
+                         f'order after an event at time {last_read}')
+    return events, len(lines) == num_lines
+
+
+def _parse_lines(lines: list[bytes]) -> list[Event]:
+    """Return the events described by <lines>, which are lines of an event
+    file without their line endings."""
+    return create_event_list([line.decode() for line in lines])
+
+
+class ReplayRunner:
+    """Replays a GroceryStoreSimulation in real time.
+
+    Attributes:
+    - sim: The simulation being replayed.
+    - speed: The number of simulated time units that pass per second, or
+      None to replay as fast as possible.
+    - interval: The number of simulated time units between snapshots.
+    - chunk_lines: The number of lines of the event file parsed at a time.
+    - time: The simulated time handled so far.
+    - inbox: Events injected into the replay, not yet scheduled, or None to
+      wake the replay up when it is stopped.
+    - _incoming: The events read from the event file or injected that have
+      not been handled yet.
+    - _stopped: True iff stop has been called.
+
+    Representation Invariants:
+    - self.speed is None or self.speed > 0
+    - self.interval >= 1
+    - self.chunk_lines >= 1
+    - every event in self._incoming has a timestamp > self.time
+    """
+
+    sim: GroceryStoreSimulation
+    speed: float | None
+    interval: int
+    chunk_lines: int
+    time: int
+    inbox: asyncio.Queue[Event | None]
+    _incoming: HeapPriorityQueue
+    _stopped: bool
+
+    def __init__(self, sim: GroceryStoreSimulation,
+                 speed: float | None = 1.0, interval: int = 1,
+                 chunk_lines: int = CHUNK_LINES) -> None:
+        """Initialize a ReplayRunner for <sim> that advances <speed>
+        simulated time units per second, taking a snapshot every <interval>
+        time units.
+
+        Preconditions:
+        - sim has not been run
+        - speed is None or speed > 0
+        - interval >= 1
+        - chunk_lines >= 1
+        """
+        self.sim = sim
+        self.speed = speed
+        self.interval = interval
+        self.chunk_lines = chunk_lines
+        self.time = -1
+        self.inbox = asyncio.Queue()
+        self._incoming = HeapPriorityQueue()
+        self._stopped = False
+
+    def inject(self, event: CustomerArrival | CloseLine) -> None:
+        """Add <event> to the replay.
+
+        The event happens at its timestamp, or as soon as possible if the
+        replay has already reached it. In that case, a new event for the
+        next time unit is scheduled in its place, and <event> itself is not
+        changed. A customer who arrives late has waited since they actually
+        arrived.
+
+        Raise a ValueError if <event> is not a CustomerArrival or a
+        CloseLine.
+        """
+        if not isinstance(event, (CustomerArrival, CloseLine)):
+            raise ValueError(f'cannot inject a {type(event).__name__}')
+        self.inbox.put_nowait(event)
+
+    def stop(self) -> None:
+        """Let a replay that follows injected events end once it has handled
+        all of its events."""
+        self._stopped = True
+        self.inbox.put_nowait(None)
+
+    async def serve(self, host: str = '127.0.0.1',
+                    port: int = 0) -> asyncio.Server:
+        """Start accepting connections on <host> and <port>, and inject the
+        events sent by each client as lines in the event file format.
+
+        Return the server, which should be closed once the replay is over.
+        Use port 0 to listen on any free port.
+        """
+        return await asyncio.start_server(self._read_client, host, port)
+
+    async def _read_client(self, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> None:
+        """Inject the events read from one client until it disconnects."""
+        loop = asyncio.get_running_loop()
+        rest = b''
+        while True:
+            data = await reader.read(READ_SIZE)
+            lines = (rest + data).split(b'\n')
+            rest = b'' if not data else lines.pop()
+            for event in await loop.run_in_executor(None, _parse_lines,
+                                                    lines):
+                self.inject(event)
+            if not data:
+                break
+        writer.close()
+        await writer.wait_closed()
+
+    async def replay(self, event_file: TextIO | None = None,
+                     follow: bool = False) -> AsyncIterator[dict[str, int]]:
+        """Replay the events in <event_file> and any injected events, and
+        yield a snapshot of the statistics every self.interval simulated time
+        units, starting from the time of the first event.
+
+        Each snapshot is a copy of self.sim.stats, with the simulated time it
+        was taken at under 'time'. The replay ends once every event has been
+        handled, or, if <follow> is True, only once stop has also been
+        called. While following, snapshots continue to be taken if
+        self.speed is not None; otherwise the replay waits for the next
+        injected event.
+
+        The next chunk of <event_file> is parsed while the current one is
+        replayed. The run of self.sim is finished when the replay ends, even
+        if it ends early.
+
+        Raise a ValueError if the events in <event_file> are not in
+        timestamp order.
+
+        Precondition: the events are such that the simulation will
+        eventually end
+        """
+        loop = asyncio.get_running_loop()
+        self.sim.start([])
+        try:
+            reading = None
+            more = event_file is not None
+            # The timestamp of the last event read from event_file.
+            last_read = -1
+            if more:
+                reading = loop.run_in_executor(None, _read_events, event_file,
+                                               self.chunk_lines, last_read)
+            # The simulated time of the next snapshot, and the simulated and
+            # loop times of the first one.
+            target = None
+            origin = 0
+            start_time = 0.0
+            while True:
+                # Make sure every event from the file up to target is
+                # scheduled.
+                while more and (target is None or last_read <= target):
+                    events, more = await reading
+                    if events:
+                        last_read = events[-1].timestamp
+                    self._incoming.add_all(events)
+                    reading = loop.run_in_executor(
+                        None, _read_events, event_file, self.chunk_lines,
+                        last_read) if more else None
+                    if target is None and not self._incoming.is_empty():
+                        break
+                self._schedule_injected()
+                idle = not more and self._incoming.is_empty() \
+                    and not self.sim.has_events()
+                if idle and (not follow or self._stopped):
+                    break
+                if idle and self.speed is None:
+                    self._schedule(await self.inbox.get())
+                    continue
+                if target is None:
+                    target = origin = 0 if self._incoming.is_empty() \
+                        else self._incoming.peek().timestamp
+                    start_time = loop.time()
+                    continue
+                if self.speed is None:
+                    await asyncio.sleep(0)
+                else:
+                    due = start_time + (target - origin) / self.speed
+                    await asyncio.sleep(max(0.0, due - loop.time()))
+                self._schedule_injected()
+                self.sim.advance(target, self._incoming)
+                self.time = target
+                snapshot = dict(self.sim.stats)
+                snapshot['time'] = target
+                yield snapshot
+                target += self.interval
+                if self.speed is None and not self._incoming.is_empty() \
+                        and not self.sim.has_events():
+                    # Skip the snapshots in which nothing would happen.
+                    gap = self._incoming.peek().timestamp - target
+                    if gap > 0:
+                        target += gap // self.interval * self.interval
+        finally:
+            self.sim.finish()
+
+    def _schedule_injected(self) -> None:
+        """Schedule the events injected so far."""
+        while not self.inbox.empty():
+            self._schedule(self.inbox.get_nowait())
+
+    def _schedule(self, event: CustomerArrival | CloseLine | None) -> None:
+        """Schedule the injected <event>, or a new event like it at the next
+        time unit if the replay has already passed its timestamp. Do nothing
+        if <event> is None."""
+        if event is None:
+            return
+        now = self.time + 1
+        if event.timestamp < now:
+            if isinstance(event, CustomerArrival):
+                event = CustomerArrival(now, event.customer.copy())
+            else:
+                event = CloseLine(now, event.line_number)
+        self._incoming.add(event)
+
+
+async def _print_snapshots(runner: ReplayRunner, event_file: TextIO | None,
+                           port: int | None) -> None:
+    """Replay <event_file> with <runner>, printing each snapshot as a line
+    of JSON, and injecting the events sent to <port> if it is not None."""
+    server = None
+    if port is not None:
+        server = await runner.serve(port=port)
+    try:
+        async for snapshot in runner.replay(event_file,
+                                            follow=server is not None):
+            print(json.dumps(snapshot), flush=True)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the replay described by the command line arguments <argv>."""
+    parser = argparse.ArgumentParser(
+        description='Replay a grocery store simulation in real time.')
+    parser.add_argument('config')
+    parser.add_argument('events', nargs='?')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='simulated time units per second; 0 for as '
+                             'fast as possible')
+    parser.add_argument('--interval', type=int, default=1)
+    parser.add_argument('--port', type=int, default=None,
+                        help='accept events on this local port')
+    args = parser.parse_args(argv)
+
+    with open(args.config) as config_file:
+        sim = GroceryStoreSimulation(config_file)
+    runner = ReplayRunner(sim, args.speed or None, args.interval)
+    event_file = open(args.events) if args.events else None
+    try:
+        asyncio.run(_print_snapshots(runner, event_file, args.port))
+    except KeyboardInterrupt:
+        sys.exit(1)
+    finally:
+        if event_file is not None:
+            event_file.close()
+
+
+if __name__ == '__main__':
+    main()
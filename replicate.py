@@ -0,0 +1,285 @@
+"""Assignment 1 - Grocery Store Replications
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file runs many randomly perturbed replications of a grocery store
+simulation in parallel, to estimate a statistic such as max_wait with a
+confidence interval. Replications stop as soon as the interval is narrow
+enough. For example:
+
+    python replicate.py config.json events.txt --jitter 30 --target 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from statistics import NormalDist
+
+from event import Event, CustomerArrival
+from sweep import load_events, simulate, clear_event_cache
+
+# The largest number of degrees of freedom for which t_critical computes the
+# exact critical value, rather than an approximation.
+EXACT_T_DF = 10
+
+
+class RunningMean:
+    """The mean and variance of a stream of numbers, updated one number at
+    a time with Welford's method.
+
+    Attributes:
+    - count: The number of values added.
+    - mean: The mean of the values added, or 0 if there are none.
+    - _m2: The sum of squared differences from the mean of the values added.
+
+    Representation Invariants:
+    - self.count >= 0
+    - self._m2 >= 0
+    """
+
+    count: int
+    mean: float
+    _m2: float
+
+    def __init__(self) -> None:
+        """Initialize a RunningMean with no values."""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Add <value> to the stream.
+
+        >>> running = RunningMean()
+        >>> for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+        ...     running.add(value)
+        >>> running.mean, running.variance()
+        (5.0, 4.571428571428571)
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def variance(self) -> float:
+        """Return the sample variance of the values added.
+
+        Precondition:
+        - self.count >= 2
+        """
+        return self._m2 / (self.count - 1)
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        """Return the half-width of a Student's t confidence interval for
+        the mean, at the given <confidence> level, or infinity if fewer than
+        two values have been added.
+
+        Precondition:
+        - 0 < confidence < 1
+        """
+        if self.count < 2:
+            return math.inf
+        critical = t_critical(confidence, self.count - 1)
+        return critical * math.sqrt(self.variance() / self.count)
+
+
+def t_critical(confidence: float, df: int) -> float:
+    """Return the critical value of Student's t distribution with <df>
+    degrees of freedom for a two-sided interval at the given <confidence>.
+
+    For df <= EXACT_T_DF, the exact distribution is inverted by bisection.
+    For larger df, this uses the Cornish-Fisher expansion around the normal
+    distribution, which is accurate to about 0.001 there.
+
+    Preconditions:
+    - 0 < confidence < 1
+    - df >= 1
+
+    >>> round(t_critical(0.95, 1), 2)
+    12.71
+    >>> round(t_critical(0.95, 2), 2)
+    4.3
+    >>> round(t_critical(0.95, 10), 2)
+    2.23
+    >>> round(t_critical(0.95, 1000), 2)
+    1.96
+    """
+    if df <= EXACT_T_DF:
+        low, high = 0.0, math.pi / 2
+        for _ in range(64):
+            middle = (low + high) / 2
+            if _t_confidence(middle, df) < confidence:
+                low = middle
+            else:
+                high = middle
+        return math.sqrt(df) * math.tan((low + high) / 2)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    return (z + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z)
+            / (384 * df ** 3))
+
+
+def _t_confidence(theta: float, df: int) -> float:
+    """Return the probability that a variable with Student's t distribution
+    with <df> degrees of freedom is within t of 0, where
+    t = sqrt(df) * tan(<theta>).
+
+    This is the closed form for integer degrees of freedom from Abramowitz
+    and Stegun, 26.7.3 and 26.7.4.
+
+    Preconditions:
+    - 0 <= theta < pi / 2
+    - df >= 1
+    """
+    cos = math.cos(theta)
+    if df % 2 == 1:
+        # theta + sin(theta) * (cos + 2/3 cos^3 + 2*4/(3*5) cos^5 + ...)
+        term = total = cos if df > 1 else 0.0
+        for k in range(3, df - 1, 2):
+            term *= cos * cos * (k - 1) / k
+            total += term
+        return 2 / math.pi * (theta + math.sin(theta) * total)
+    # sin(theta) * (1 + 1/2 cos^2 + 1*3/(2*4) cos^4 + ...)
+    term = total = 1.0
+    for k in range(2, df - 1, 2):
+        term *= cos * cos * (k - 1) / k
+        total += term
+    return math.sin(theta) * total
+
+
+def jitter_arrivals(events: list[Event], seed: str,
+                    jitter: int) -> list[Event]:
+    """Return a new list of events like <events>, but with each customer
+    arriving up to <jitter> time units earlier or later, at random.
+
+    The randomness is determined by <seed>. Arrival times are never moved
+    before 0. Customers are copied, so <events> is not changed.
+
+    Precondition:
+    - jitter >= 0
+    """
+    rng = random.Random(seed)
+    perturbed = []
+    for event in events:
+        if isinstance(event, CustomerArrival):
+            timestamp = max(0, event.timestamp + rng.randint(-jitter, jitter))
+            perturbed.append(
+                CustomerArrival(timestamp, event.customer.copy()))
+        else:
+            perturbed.append(event)
+    return perturbed
+
+
+def _replication(task: tuple[dict[str, int], str, str, int, str]) -> float:
+    """Return the statistic from one replication, where <task> is the store
+    configuration, the event file name, the seed, the jitter and the name of
+    the statistic."""
+    config, event_file_name, seed, jitter, statistic = task
+    events = jitter_arrivals(load_events(event_file_name), seed, jitter)
+    return simulate(config, events)[statistic]
+
+
+def replicate(config: dict[str, int], event_file_name: str,
+              max_replications: int, seed: int = 0, jitter: int = 10,
+              statistic: str = 'max_wait',
+              target_half_width: float | None = None,
+              confidence: float = 0.95, min_replications: int = 5,
+              max_workers: int | None = None) -> RunningMean:
+    """Return the running mean of <statistic> over replications of the
+    simulation of the events in <event_file_name>, in a store with
+    <config>. Each replication perturbs the arrivals with jitter_arrivals.
+
+    Replications are run over <max_workers> processes, or one per CPU if
+    <max_workers> is None, and their results are added as they finish.
+    Stop after <max_replications>, or as soon as at least
+    <min_replications> have finished and the confidence interval's
+    half-width is at most <target_half_width>, if it is not None.
+
+    Replication i uses the seed f'{seed}:{i}', so a run that goes to
+    <max_replications> gives the same result every time. A run that stops
+    early may include different replications, depending on which finish
+    first.
+
+    Preconditions:
+    - max_replications >= 1
+    - 1 <= min_replications
+    - statistic is a key of GroceryStoreSimulation.stats
+    """
+    running = RunningMean()
+    tasks = ((config, event_file_name, f'{seed}:{i}', jitter, statistic)
+             for i in range(max_replications))
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers,
+                             initializer=clear_event_cache) as executor:
+        # Keep a couple of replications queued per worker, so that no
+        # worker waits, but little is wasted when the target is reached.
+        pending = set()
+        for task in tasks:
+            pending.add(executor.submit(_replication, task))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.add(future.result())
+            if target_half_width is not None \
+                    and running.count >= min_replications \
+                    and running.half_width(confidence) <= target_half_width:
+                for future in pending:
+                    future.cancel()
+                break
+            for _ in done:
+                task = next(tasks, None)
+                if task is not None:
+                    pending.add(executor.submit(_replication, task))
+    return running
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the replications described by the command line arguments
+    <argv>."""
+    parser = argparse.ArgumentParser(
+        description='Estimate a simulation statistic over perturbed '
+                    'replications.')
+    parser.add_argument('config')
+    parser.add_argument('events')
+    parser.add_argument('--replications', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jitter', type=int, default=10)
+    parser.add_argument('--statistic', default='max_wait')
+    parser.add_argument('--target', type=float, default=None)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with open(args.config) as config_file:
+        config = json.load(config_file)
+    running = replicate(config, args.events, args.replications, args.seed,
+                        args.jitter, args.statistic, args.target,
+                        args.confidence, max_workers=args.workers)
+    print(f'{args.statistic}: {running.mean:.2f} '
+          f'+/- {running.half_width(args.confidence):.2f} '
+          f'({running.count} replications)')
+
+
+if __name__ == '__main__':
+    main()
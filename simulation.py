@@ -20,10 +20,19 @@ This file drives a simulation of customers checking out at a grocery store.
 """
 from __future__ import annotations
 
-from typing import TextIO
-from event import Event, create_event_list, CustomerArrival, CheckoutCompleted
-from store import GroceryStore
-from container import PriorityQueue
+import pickle
+from collections import deque
+from operator import attrgetter
+from time import perf_counter
+from typing import Any, Callable, Iterable, TextIO
+from event import Event, create_event_list, in_timestamp_order, \
+    CustomerArrival, CheckoutCompleted, CustomerRetry
+from store import GroceryStore, StoreTemplate
+from container import Container, HeapPriorityQueue
+from instrument import Instrumentation
+from metrics import StatsCollector, HyperLogLog
+from checkpoint import Checkpointer, write_checkpoint, read_checkpoint
+from eventtrace import TraceSink, BLOCK_ROWS
 
 
 class GroceryStoreSimulation:
@@ -35,38 +44,250 @@ class GroceryStoreSimulation:
             if e1 < e2 then e1 will come out of the event queue before e2.
             If e1 == e2 (according to the event comparison defined by __eq__),
             then the event that was inserted *earlier* is the first one to be
-            removed.
+            removed. Any Container that removes events in this order may be
+            used, such as a HeapPriorityQueue or a CalendarQueue.
     - _store: The store being simulated.
     - stats: Summary statistics for the simulation, with these keys and values:
-            'num_customers': the total number of customers in the simulation
+            'num_customers': the total number of customers in the simulation,
+                estimated if customer_error is not None
             'total_time': the timestamp of the last event
             'max_wait': the maximum amount of time a customer waited
       All statistics begin at 0 and are updated as each event is handled.
+    - instrumentation: Measurements of where the simulation spends its time,
+      or None if it is not being measured.
+    - collector: Detailed statistics beyond those in stats, or None if they
+      are not being collected.
+    - checkpointer: What saves checkpoints during each run, or None if they
+      are not being saved.
+    - trace: What records every event handled in the next run, or None if
+      no trace is being written.
+    - customer_error: None if customers are counted exactly. Otherwise, they
+      are counted in constant memory by a HyperLogLog, and num_customers has
+      about this relative standard error.
+    - _customers: The names of the customers seen so far in the latest run,
+      or a HyperLogLog that counts them.
+    - _input: The events the current run was started with, in timestamp
+      order, with events that have the same timestamp in the order they
+      were given. They are kept out of the event queue, so that a
+      checkpoint only holds the events in progress.
+    - _input_read: The number of events in self._input handled so far.
 
     Representation Invariants:
     - For every event in self._events that involves a checkout line number n,
       0 <= n <= self._store.num_lines.
+    - 0 <= self._input_read <= len(self._input)
     """
 
-    _events: PriorityQueue
+    _events: Container
     _store: GroceryStore
     stats: dict[str, int]
+    instrumentation: Instrumentation | None
+    collector: StatsCollector | None
+    checkpointer: Checkpointer | None
+    trace: TraceSink | None
+    customer_error: float | None
+    _customers: set[str] | HyperLogLog
+    _input: list[Event]
+    _input_read: int
 
-    def __init__(self, store_file: TextIO) -> None:
+    def __init__(self, store_file: TextIO | StoreTemplate,
+                 events: Container | None = None,
+                 customer_error: float | None = None) -> None:
         """Initialize a GroceryStoreSimulation using the store information in
-        <store_file>.
+        <store_file>, or a new store made from <store_file> if it is a
+        StoreTemplate.
+
+        Scheduled events are kept in <events>, or in a new HeapPriorityQueue
+        if <events> is None. Customers are counted exactly if
+        <customer_error> is None, and estimated with that relative standard
+        error otherwise.
 
         All statistics begin at 0.
 
         Preconditions:
-        - store_file is a valid JSON configuration file with the keys
-          regular_count, express_count, self_serve_count, and line_capacity
-        - store_file is open
-        - All values in store_file are >= 0
+        - store_file is a StoreTemplate, or an open, valid JSON
+          configuration file with the keys regular_count, express_count,
+          self_serve_count, and line_capacity, all >= 0
+        - events is None or events.is_empty()
+        - customer_error is None or 0 < customer_error < 1
         """
-        self._events = PriorityQueue()
-        self._store = GroceryStore(store_file)
+        if events is None:
+            events = HeapPriorityQueue()
+        self._events = events
+        if isinstance(store_file, StoreTemplate):
+            self._store = store_file.new_store()
+        else:
+            self._store = GroceryStore(store_file)
         self.stats = {'num_customers': 0, 'total_time': 0, 'max_wait': 0}
+        self.instrumentation = None
+        self.collector = None
+        self.checkpointer = None
+        self.trace = None
+        self.customer_error = customer_error
+        self._customers = self._new_customer_counter()
+        self._input = []
+        self._input_read = 0
+
+    def collect_stats(self, accuracy: float = 0.01) -> StatsCollector:
+        """Start collecting detailed statistics, and return the
+        StatsCollector that holds them. Wait time quantiles are estimated to
+        within a relative error of <accuracy>.
+
+        Precondition:
+        - self.collector is None
+        - 0 < accuracy < 1
+        - the simulation has not been run
+        """
+        self.collector = StatsCollector(self._store, accuracy)
+        self._store.record_joins()
+        return self.collector
+
+    def trace_to(self, path: str, block_rows: int = BLOCK_ROWS) -> TraceSink:
+        """Start writing a trace of every event handled in the next run to
+        a new trace file at <path>, and return the TraceSink that writes it.
+
+        The trace is written in blocks of <block_rows> rows, as CSV if <path>
+        ends in .csv, and in binary otherwise (see eventtrace). The trace
+        file is closed when the run finishes, even if it raises an
+        exception.
+
+        Precondition:
+        - self.trace is None
+        - block_rows >= 1
+        """
+        self.trace = TraceSink(path, block_rows)
+        self._store.on_join = self.trace.join
+        return self.trace
+
+    def instrument(self, profile: bool = False) -> Instrumentation:
+        """Start measuring this simulation, and return the Instrumentation
+        that holds the measurements. Also capture a cProfile profile of each
+        run iff <profile> is True.
+
+        Every later run counts and times the events handled and the
+        operations on the event queue.
+
+        Precondition:
+        - self.instrumentation is None
+        - the event queue is empty
+        """
+        self.instrumentation = Instrumentation(self._events, profile)
+        self._events = self.instrumentation.queue
+        return self.instrumentation
+
+    def checkpoint_every(self, path: str, every: int,
+                         level: int = 1) -> Checkpointer:
+        """Start saving a checkpoint to <path> after every <every> events
+        handled by run, and return the Checkpointer that saves them.
+        Checkpoints are saved between timestamps, so they may be a little
+        further apart. Each checkpoint replaces the last, and is compressed
+        at zlib compression <level>.
+
+        Precondition:
+        - self.checkpointer is None
+        - every >= 1
+        """
+        self.checkpointer = Checkpointer(path, every, level)
+        return self.checkpointer
+
+    def save_checkpoint(self, path: str, level: int = 1) -> None:
+        """Save a checkpoint of this simulation to <path>, compressed at zlib
+        compression <level>."""
+        write_checkpoint(path, pickle.dumps(self._state(),
+                                            pickle.HIGHEST_PROTOCOL), level)
+
+    def _state(self) -> dict[str, Any]:
+        """Return everything needed to resume this simulation, apart from
+        the events its run was started with.
+
+        Only the number of those events already handled is included, and
+        the names of the customers seen so far are left out when they are
+        counted exactly, since they are the names of the customers who
+        arrived in those events. Instrumentation and the trace are not
+        included, and a StatsCollector is included as it is.
+        """
+        events = self._events
+        if self.instrumentation is not None:
+            events = self.instrumentation.queue.measured()
+        customers = None
+        if self.customer_error is not None:
+            customers = self._customers
+        return {'events': events, 'store': self._store, 'stats': self.stats,
+                'collector': self.collector, 'customers': customers,
+                'customer_error': self.customer_error,
+                'input_read': self._input_read}
+
+    @classmethod
+    def restore(cls, path: str,
+                initial_events: Iterable[Event] = ()) \
+            -> GroceryStoreSimulation:
+        """Return the simulation saved in the checkpoint at <path>, where
+        <initial_events> are the events its run was started with.
+
+        Call resume on it to finish the run it was saved from, which gives
+        the same statistics as the run would have. It is not instrumented
+        and saves no checkpoints.
+
+        Precondition:
+        - initial_events holds the same events, in the same order, as the
+          run was started with, such as a new list of them read from the
+          same event file
+        """
+        return cls._from_state(read_checkpoint(path), initial_events)
+
+    def snapshot(self) -> bytes:
+        """Return a snapshot of this simulation part way through a run, to
+        continue from with from_snapshot.
+
+        A snapshot is a checkpoint kept in memory: the state is pickled but
+        not compressed, and the customers seen so far are left out, since
+        they can be worked out from the events already handled.
+        """
+        state = self._state()
+        del state['customers']
+        return pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: bytes,
+                      customers: Iterable[str]) -> GroceryStoreSimulation:
+        """Return the simulation saved in <snapshot>, where <customers> are
+        the names of the customers who had arrived when it was taken.
+
+        Continue its run with advance or resume. It is not instrumented and
+        saves no checkpoints.
+        """
+        state = pickle.loads(snapshot)
+        counter = set() if state['customer_error'] is None \
+            else HyperLogLog(state['customer_error'])
+        for name in customers:
+            counter.add(name)
+        state['customers'] = counter
+        return cls._from_state(state)
+
+    @classmethod
+    def _from_state(cls, state: dict[str, Any],
+                    initial_events: Iterable[Event] = ()) \
+            -> GroceryStoreSimulation:
+        """Return the simulation with the state <state>, as returned by
+        _state, whose run was started with <initial_events>."""
+        sim = cls.__new__(cls)
+        sim._events = state['events']
+        sim._store = state['store']
+        sim.stats = state['stats']
+        sim.instrumentation = None
+        sim.collector = state['collector']
+        sim.checkpointer = None
+        sim.trace = None
+        sim.customer_error = state['customer_error']
+        sim._input = sorted(initial_events, key=attrgetter('timestamp'))
+        sim._input_read = state['input_read']
+        sim._customers = state['customers']
+        if sim._customers is None:
+            sim._customers = {
+                event.customer.name
+                for event in sim._input[:sim._input_read]
+                if isinstance(event, CustomerArrival)}
+        return sim
 
     def run(self, initial_events: list[Event]) -> None:
         """Run the simulation on the events stored in <initial_events>.
@@ -83,23 +304,297 @@ class GroceryStoreSimulation:
           made to close when there are remaining customers.
         """
         # Done: Implement this method
-        customers = set()
-        for event in initial_events:
-            self._events.add(event)
-        while not self._events.is_empty():
-            event = self._events.remove()
-            if isinstance(event, CheckoutCompleted):
-                self.stats['total_time'] = event.timestamp
-                self.stats['max_wait'] = max(
-                    self.stats['max_wait'],
-                    event.timestamp - event.customer.arrival_time
-                )
-            if isinstance(event, CustomerArrival):
-                customers.add(event.customer.name)
-            new_events = event.do(self._store)
-            for new_event in new_events:
-                self._events.add(new_event)
+        self.start(initial_events)
+        self.resume()
+
+    def start(self, initial_events: Iterable[Event]) -> None:
+        """Start a run on the events in <initial_events>, without handling
+        any of them. Handle them with advance or resume.
+
+        The events are sorted by timestamp, but not added to the event
+        queue: they are handled in that order as the run reaches them,
+        before the events the simulation schedules for the same time.
+
+        Precondition: the preconditions of run hold for <initial_events>
+        """
+        self._customers = self._new_customer_counter()
+        self._input = sorted(initial_events, key=attrgetter('timestamp'))
+        self._input_read = 0
+
+    def resume(self) -> None:
+        """Handle the remaining events of the run until there are none, and
+        finish the run.
+
+        Events are handled a timestamp at a time. All the events at the
+        earliest timestamp are taken together, those the run was started
+        with first, and the events they generate at that same timestamp are
+        handled straight after them, without going through the queue. The
+        events generated for later timestamps are added to the queue together
+        once the timestamp is done. This handles events in exactly the order
+        that removing them one at a time would.
+
+        When customers who find no line to join are scheduled to retry next
+        time unit straight after other customers who are retrying then, they
+        all retry in one CustomerRetry. Retries that can only fail are
+        skipped, as described in _next_batch.
+
+        This finishes the run of a simulation returned by restore.
+        """
+        handle = self._handler()
+        customers = self._customers
+        checkpointer = self.checkpointer
+        try:
+            while True:
+                batch = self._next_batch(None, None)
+                if not batch:
+                    break
+                handled = self._handle_batch(batch, handle, customers)
+                if checkpointer is not None:
+                    checkpointer.events_handled(handled, self._state)
+        finally:
+            self._finish(customers)
+
+    def advance(self, until: int, incoming: Container | None = None) -> int:
+        """Handle the events up to time <until> a timestamp at a time, as
+        resume does, and return the number of events handled.
+
+        <incoming> holds events from outside the simulation, such as those
+        read from an event file so far. Its events up to time <until> are
+        removed and handled after the events the run was started with, and
+        before the events the simulation scheduled, for the same time, as if
+        they had been in the event queue from the start of the run. They
+        should be no earlier than the last time handled.
+
+        stats['num_customers'] is brought up to date, but the run is not
+        finished: call finish once all of its events have been handled.
+        If an exception is raised, the run is finished before it propagates.
+        Checkpoints are not saved.
+
+        Precondition:
+        - start has been called
+        """
+        handle = self._handler()
+        customers = self._customers
+        handled = 0
+        try:
+            while True:
+                batch = self._next_batch(until, incoming)
+                if not batch:
+                    break
+                handled += self._handle_batch(batch, handle, customers)
+        except BaseException:
+            self._finish(customers)
+            raise
         self.stats['num_customers'] = len(customers)
+        return handled
+
+    def has_events(self) -> bool:
+        """Return True iff the run has events that it has not handled yet,
+        either scheduled or among those it was started with."""
+        return not self._events.is_empty() or \
+            self._input_read < len(self._input)
+
+    def _next_batch(self, until: int | None,
+                    incoming: Container | None) -> deque[Event]:
+        """Remove and return all the events at the earliest time any event
+        of the run is due, or return an empty deque if there are none at or
+        before time <until>. There is no limit if <until> is None.
+
+        The events from self._input come first, then those from <incoming>,
+        if it is not None, and then those in the event queue.
+
+        If the only events due are retries by customers who must wait, they
+        are moved in one CustomerRetry to the next time any other event is
+        due, or to time <until> + 1 if that is sooner, since they would
+        find no line at every time unit before then. Nothing can happen at
+        those time units, so this handles events in the same order as
+        handling the retries at each of them would.
+        """
+        events = self._events
+        inputs = self._input
+        while True:
+            now = self._next_time(incoming)
+            batch = deque()
+            if now is None or (until is not None and now > until):
+                return batch
+            read = self._input_read
+            while read < len(inputs) and inputs[read].timestamp == now:
+                batch.append(inputs[read])
+                read += 1
+            self._input_read = read
+            if incoming is not None and not incoming.is_empty() and \
+                    incoming.peek().timestamp == now:
+                batch.extend(incoming.remove_all_equal())
+            if not events.is_empty() and events.peek().timestamp == now:
+                batch.extend(events.remove_all_equal())
+            if not all(type(event) is CustomerRetry
+                       and event.must_wait(self._store) for event in batch):
+                return batch
+            later = self._next_time(incoming)
+            if until is not None and (later is None or later > until + 1):
+                later = until + 1
+            if later is None or later == now + 1:
+                return batch
+            retry = batch.popleft()
+            while batch:
+                retry.merge(batch.popleft())
+            events.add(CustomerRetry(later, retry.customers, retry.openings,
+                                     retry.express_openings))
+
+    def _next_time(self, incoming: Container | None) -> int | None:
+        """Return the earliest time any event of the run is due, or None if
+        there are no events left."""
+        now = None
+        if self._input_read < len(self._input):
+            now = self._input[self._input_read].timestamp
+        if incoming is not None and not incoming.is_empty() and \
+                (now is None or incoming.peek().timestamp < now):
+            now = incoming.peek().timestamp
+        if not self._events.is_empty() and \
+                (now is None or self._events.peek().timestamp < now):
+            now = self._events.peek().timestamp
+        return now
+
+    def finish(self) -> None:
+        """Finish a run that was started with start and advanced until all
+        of its events were handled."""
+        self._finish(self._customers)
+
+    def _handle_batch(self, batch: deque[Event],
+                      handle: Callable[[Event, set[str] | HyperLogLog],
+                                       list[Event]],
+                      customers: set[str] | HyperLogLog) -> int:
+        """Handle the events in <batch>, which all have the same timestamp,
+        with <handle>, and the events they generate at that timestamp after
+        them. Add the events generated for later timestamps to the event
+        queue, and return the number of events handled.
+
+        <customers> counts the customers seen so far.
+        """
+        now = batch[0].timestamp
+        later = []
+        # The latest event in later for the next time unit.
+        tail = None
+        handled = 0
+        while batch:
+            for new_event in handle(batch.popleft(), customers):
+                if new_event.timestamp == now:
+                    batch.append(new_event)
+                elif new_event.timestamp != now + 1:
+                    later.append(new_event)
+                elif type(new_event) is CustomerRetry \
+                        and type(tail) is CustomerRetry:
+                    tail.merge(new_event)
+                else:
+                    later.append(new_event)
+                    tail = new_event
+            handled += 1
+        self._events.add_all(later)
+        return handled
+
+    def run_stream(self, events: Iterable[Event],
+                   reorder_window: int = 0) -> None:
+        """Run the simulation on <events>, reading them lazily.
+
+        Produce the same statistics as run would on list(events), but hold
+        only the events scheduled by the simulation itself in the event queue.
+        The next event from <events> is read only once the simulation reaches
+        its timestamp, so memory use is bounded by the number of events in
+        progress rather than the length of <events>.
+
+        <events> should be in timestamp order. If it is not, up to
+        <reorder_window> events are held back to put them in order, and a
+        ValueError is raised if that is not enough (see in_timestamp_order).
+
+        Events are handled one at a time. Checkpoints are not saved, since
+        they could not record how much of <events> has been read.
+
+        Precondition:
+        - the preconditions of run hold for list(events)
+        - reorder_window >= 0
+        """
+        self._customers = customers = self._new_customer_counter()
+        handle = self._handler()
+        incoming = in_timestamp_order(events, reorder_window)
+        try:
+            pending = next(incoming, None)
+            while pending is not None or not self._events.is_empty():
+                # Events from the file were added to the queue before any
+                # event the simulation generates, so they go first among
+                # equal events.
+                if pending is not None and (self._events.is_empty()
+                                            or pending <= self._events.peek()):
+                    event = pending
+                    pending = next(incoming, None)
+                else:
+                    event = self._events.remove()
+                self._events.add_all(handle(event, customers))
+        finally:
+            self._finish(customers)
+
+    def _new_customer_counter(self) -> set[str] | HyperLogLog:
+        """Return an empty counter of the customers seen in a run."""
+        if self.customer_error is None:
+            return set()
+        return HyperLogLog(self.customer_error)
+
+    def _handler(self) \
+            -> Callable[[Event, set[str] | HyperLogLog], list[Event]]:
+        """Return the method that handles each event of a run, and start
+        profiling if a profile is being captured."""
+        if self.instrumentation is None:
+            return self._handle
+        if self.instrumentation.profiler is not None:
+            self.instrumentation.profiler.enable()
+        return self._handle_instrumented
+
+    def _finish(self, customers: set[str] | HyperLogLog) -> None:
+        """Finish a run, where <customers> counts the customers seen during
+        the run."""
+        self.stats['num_customers'] = len(customers)
+        self._input = []
+        self._input_read = 0
+        if self.checkpointer is not None:
+            self.checkpointer.wait()
+        if self.trace is not None:
+            trace, self.trace = self.trace, None
+            self._store.on_join = None
+            trace.close()
+        if self.instrumentation is not None and \
+                self.instrumentation.profiler is not None:
+            self.instrumentation.profiler.disable()
+
+    def _handle(self, event: Event,
+                customers: set[str] | HyperLogLog) -> list[Event]:
+        """Update the statistics for <event>, then do it and return the events
+        it generates.
+
+        <customers> counts the customers seen so far.
+        """
+        if isinstance(event, CheckoutCompleted):
+            self.stats['total_time'] = event.timestamp
+            self.stats['max_wait'] = max(
+                self.stats['max_wait'],
+                event.timestamp - event.customer.arrival_time
+            )
+        if isinstance(event, CustomerArrival):
+            customers.add(event.customer.name)
+        new_events = event.do(self._store)
+        if self.collector is not None:
+            self.collector.observe(event, new_events, self._store)
+        if self.trace is not None:
+            self.trace.record(event, new_events)
+        return new_events
+
+    def _handle_instrumented(self, event: Event,
+                             customers: set[str] | HyperLogLog) \
+            -> list[Event]:
+        """Handle <event> like _handle does, and record how long it took."""
+        start = perf_counter()
+        new_events = self._handle(event, customers)
+        self.instrumentation.record_event(type(event).__name__,
+                                          perf_counter() - start)
+        return new_events
 
 
 # We have provided a bit of code to help test your work.
@@ -129,10 +624,18 @@ if __name__ == '__main__':
             config={
                 'allowed-import-modules': [
                     '__future__',
+                    'collections',
+                    'operator',
                     'typing',
                     'event',
                     'store',
                     'container',
+                    'instrument',
+                    'metrics',
+                    'checkpoint',
+                    'eventtrace',
+                    'pickle',
+                    'time',
                     'python_ta',
                     'doctest',
                 ]
@@ -20,7 +20,10 @@ This file contains all the classes necessary to model the relevant entities
 in a grocery store.
 """
 from __future__ import annotations
-from typing import TextIO
+from collections import deque
+from heapq import heapify, heappop, heappush
+from io import StringIO
+from typing import Callable, Iterable, TextIO
 import json
 
 # The maximum number of items a customer can have if they use an express line.
@@ -52,6 +55,21 @@ class GroceryStore:
     - self_serve_count: How many self serve lines this grocery store has.
     - line_capacity: How many customers each line is able to accommodate.
     - lines: lines in the store
+    - joins: The number of the line each customer joined, paired with the
+      customer, in the order they joined, since this list was last cleared,
+      or None if joins are not being recorded.
+    - on_join: What is called with the number of the line each customer
+      joined and the customer, as they join it, or None if nothing is.
+      It is not pickled.
+    - openings: How many times a customer has left an open line, other
+      than an express line, making room in it for another customer.
+    - express_openings: Like openings, but for the express lines.
+    - _open_lines: A binary heap of (length, line number) pairs for the
+      lines that accept any customer, used to find the shortest one quickly.
+      An entry is current iff its line is open, not full, and has that
+      length; entries that are not current are discarded when they reach
+      the top of the heap.
+    - _open_express_lines: Like _open_lines, but for the express lines.
 
     Representation Invariants:
     - self.num_lines > 0
@@ -60,6 +78,12 @@ class GroceryStore:
     - self.self_serve_count >= 0
     - self.line_capacity >= 0
     - len(self.lines) == self.num_lines
+    - self.openings >= 0
+    - self.express_openings >= 0
+    - every open line that is not full has a current entry in
+      self._open_express_lines if it is an ExpressLine, and in
+      self._open_lines otherwise
+    - the lines are only changed through the methods of this GroceryStore
 
     """
 
@@ -69,6 +93,12 @@ class GroceryStore:
     self_serve_count: int
     line_capacity: int
     lines: list[CheckoutLine]
+    joins: list[tuple[int, Customer]] | None
+    on_join: Callable[[int, Customer], object] | None
+    openings: int
+    express_openings: int
+    _open_lines: list[tuple[int, int]]
+    _open_express_lines: list[tuple[int, int]]
 
     def __init__(self, config_file: TextIO) -> None:
         """Initialize a GroceryStore from a configuration file <config_file>.
@@ -95,6 +125,20 @@ class GroceryStore:
             self.lines.append(ExpressLine(self.line_capacity))
         for _ in range(self.self_serve_count):
             self.lines.append(SelfServeLine(self.line_capacity))
+        self.joins = None
+        self.on_join = None
+        self.openings = 0
+        self.express_openings = 0
+        self._open_lines = []
+        self._open_express_lines = []
+        self._rebuild_index()
+
+    def __getstate__(self) -> dict[str, object]:
+        """Return the attributes of this store to pickle, leaving out
+        on_join, which may not be picklable."""
+        state = self.__dict__.copy()
+        state['on_join'] = None
+        return state
 
     def enter_line(self, customer: Customer) -> int:
         """Pick a new line for <customer> to join, using the algorithm from
@@ -109,18 +153,89 @@ class GroceryStore:
         - customer is not currently in any line in this GroceryStore
         """
         # Done: Implement this method
-        cur_min = float('inf')
-        index = -1
-        for i, line in enumerate(self.lines):
-            if line.can_accept(customer):
-                if cur_min > len(line):
-                    cur_min = len(line)
-                    index = i
+        index = self.try_enter_line(customer)
         if index == -1:
             raise NoAvailableLineError
-        self.lines[index].accept(customer)
         return index
 
+    def try_enter_line(self, customer: Customer) -> int:
+        """Add <customer> to a line, picked as enter_line would, and return
+        the index of that line, or -1 if there is no line available for the
+        customer to join.
+
+        Preconditions:
+        - customer is not currently in any line in this GroceryStore
+        """
+        index = self._shortest_line(customer)
+        if index != -1:
+            self.lines[index].accept(customer)
+            self._index_line(index)
+            if self.joins is not None:
+                self.joins.append((index, customer))
+            if self.on_join is not None:
+                self.on_join(index, customer)
+        return index
+
+    def record_joins(self) -> None:
+        """Start recording the lines customers join, and who joined them, in
+        self.joins, if they are not already being recorded."""
+        if self.joins is None:
+            self.joins = []
+
+    def has_room(self) -> bool:
+        """Return True iff some line is open and not full.
+
+        If this is False, no customer can enter a line. Once a customer
+        finds no line, they can only find one after self.openings, or
+        self.express_openings if they could use an express line, changes.
+        """
+        return _current_top(self._open_lines, self.lines) is not None or \
+            _current_top(self._open_express_lines, self.lines) is not None
+
+    def _shortest_line(self, customer: Customer) -> int:
+        """Return the index of the shortest line that can accept <customer>,
+        choosing the lowest index among lines of equal length, or -1 if there
+        is no such line.
+        """
+        best = _current_top(self._open_lines, self.lines)
+        express = _current_top(self._open_express_lines, self.lines)
+        if express is not None and (best is None or express < best) \
+                and self.lines[express[1]].can_accept(customer):
+            best = express
+        if best is None:
+            return -1
+        return best[1]
+
+    def _index_line(self, line_number: int) -> None:
+        """Record the current length of line <line_number> in the index of
+        open lines, if it can still accept customers.
+        """
+        line = self.lines[line_number]
+        if not line.is_open or len(line) >= line.capacity:
+            return
+        if isinstance(line, ExpressLine):
+            heap = self._open_express_lines
+        else:
+            heap = self._open_lines
+        heappush(heap, (len(line), line_number))
+        # Entries that are no longer current pile up when lines change
+        # without being chosen, so start over once they dominate the heap.
+        if len(heap) > 2 * self.num_lines + 8:
+            self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the index of open lines from scratch."""
+        self._open_lines.clear()
+        self._open_express_lines.clear()
+        for i, line in enumerate(self.lines):
+            if line.is_open and len(line) < line.capacity:
+                if isinstance(line, ExpressLine):
+                    self._open_express_lines.append((len(line), i))
+                else:
+                    self._open_lines.append((len(line), i))
+        heapify(self._open_lines)
+        heapify(self._open_express_lines)
+
     def next_checkout_time(self, line_number: int) -> int:
         """Return the time it will take to check out the customer at the front
         of line <line_number>.
@@ -141,7 +256,15 @@ class GroceryStore:
         - 0 <= line_number < self.num_lines
         """
         # Done: Implement this method
-        return self.lines[line_number].remove_front_customer()
+        line = self.lines[line_number]
+        if line.is_open and len(line) > 0:
+            if isinstance(line, ExpressLine):
+                self.express_openings += 1
+            else:
+                self.openings += 1
+        remaining = line.remove_front_customer()
+        self._index_line(line_number)
+        return remaining
 
     def close_line(self, line_number: int) -> list[Customer]:
         """Close checkout line <line_number> by updating its status to indicate
@@ -169,6 +292,110 @@ class GroceryStore:
         # Done: Implement this method
         return self.lines[line_number].first_in_line()
 
+    def reset(self) -> None:
+        """Remove every customer from this store and open all of its lines,
+        as if it had just been created.
+
+        Joins are still recorded if they were before, but the ones recorded
+        so far are forgotten.
+        """
+        for line in self.lines:
+            line.reset()
+        if self.joins is not None:
+            self.joins = []
+        self.openings = 0
+        self.express_openings = 0
+        self._open_lines = []
+        self._open_express_lines = []
+        self._rebuild_index()
+
+    def empty_copy(self) -> GroceryStore:
+        """Return a new GroceryStore with the same configuration as this
+        one, with every line open and empty, without parsing a
+        configuration file.
+
+        >>> store = GroceryStore(StringIO('{"regular_count": 1, '
+        ...     '"express_count": 0, "self_serve_count": 0, '
+        ...     '"line_capacity": 1}'))
+        >>> store.enter_line(Customer('Bo', [Item('milk', 2)]))
+        0
+        >>> copy = store.empty_copy()
+        >>> len(copy.lines[0]), len(store.lines[0])
+        (0, 1)
+        """
+        store = GroceryStore.__new__(GroceryStore)
+        store.num_lines = self.num_lines
+        store.regular_count = self.regular_count
+        store.express_count = self.express_count
+        store.self_serve_count = self.self_serve_count
+        store.line_capacity = self.line_capacity
+        store.lines = [type(line)(line.capacity) for line in self.lines]
+        store.joins = None
+        store.on_join = None
+        store.openings = 0
+        store.express_openings = 0
+        store._open_lines = []
+        store._open_express_lines = []
+        store._rebuild_index()
+        return store
+
+
+class StoreTemplate:
+    """A store configuration, parsed once, from which any number of new
+    GroceryStores can be made without parsing it again.
+
+    Attributes:
+    - config: The store configuration, with the keys regular_count,
+      express_count, self_serve_count, and line_capacity.
+    - _prototype: An empty GroceryStore with this configuration, which is
+      copied to make each new store. It is never changed.
+
+    >>> template = StoreTemplate(StringIO('{"regular_count": 2, '
+    ...     '"express_count": 1, "self_serve_count": 0, "line_capacity": 3}'))
+    >>> store = template.new_store()
+    >>> store.enter_line(Customer('Bo', [Item('milk', 2)]))
+    0
+    >>> len(template.new_store().lines[0])
+    0
+    """
+
+    config: dict[str, int]
+    _prototype: GroceryStore
+
+    def __init__(self, config_file: TextIO) -> None:
+        """Initialize a StoreTemplate from a configuration file
+        <config_file>.
+
+        Preconditions: the same as for GroceryStore.__init__
+        """
+        text = config_file.read()
+        self.config = json.loads(text)
+        self._prototype = GroceryStore(StringIO(text))
+
+    def new_store(self) -> GroceryStore:
+        """Return a new, empty GroceryStore with this configuration.
+
+        The store is an empty copy of the prototype, so the configuration
+        is not parsed again.
+        """
+        return self._prototype.empty_copy()
+
+
+def _current_top(heap: list[tuple[int, int]],
+                 lines: list[CheckoutLine]) -> tuple[int, int] | None:
+    """Return the smallest current entry of <heap>, an index of open lines
+    as described in GroceryStore, or None if it has none.
+
+    Discard the entries in front of it that are no longer current.
+    """
+    while heap:
+        length, line_number = heap[0]
+        line = lines[line_number]
+        if line.is_open and len(line) == length < line.capacity:
+            return heap[0]
+        heappop(heap)
+    return None
+
 
 class Customer:
     """A grocery store customer.
@@ -177,15 +404,25 @@ class Customer:
     - name: A unique identifier for this customer.
     - arrival_time: The first time this customer arrived at the checkout area
       and attempted to join a line, or None if they have not yet arrived.
-    - _items: The items this customer has.
+    - _items: The items this customer has, or None for a customer created
+      with from_item_times, which only knows how many items they have and
+      how long they take to check out.
+    - _num_items: The number of items this customer has.
+    - _item_time: The total time it takes to check out this customer's items.
 
     Representation Invariants:
     - self.arrival_time is None or self.arrival_time >= 0
+    - self._items is None or self._num_items == len(self._items)
+    - self._items is None or self._item_time is the sum of the checkout
+      times of self._items
     """
 
+    __slots__ = ('name', 'arrival_time', '_items', '_num_items', '_item_time')
     name: str
     arrival_time: int | None
-    _items: list[Item]
+    _items: list[Item] | None
+    _num_items: int
+    _item_time: int
 
     def __init__(self, name: str, items: list[Item]) -> None:
         """Initialize a customer with the given <name> and a copy of the
@@ -208,6 +445,55 @@ class Customer:
         self.name = name
         self.arrival_time = None
         self._items = items.copy()
+        self._num_items = len(items)
+        self._item_time = sum(item.time for item in items)
+
+    @classmethod
+    def from_item_times(cls, name: str, times: Iterable[int]) -> Customer:
+        """Return a new customer with the given <name> whose items take
+        <times> to check out, without creating an Item for each of them.
+
+        The customer's arrival_time is initially None.
+
+        Preconditions:
+        - every value in times is > 0
+
+        >>> c = Customer.from_item_times('Bo', [7, 3])
+        >>> c.num_items()
+        2
+        >>> c.item_time()
+        10
+        """
+        num_items = 0
+        item_time = 0
+        for time in times:
+            num_items += 1
+            item_time += time
+        customer = cls.__new__(cls)
+        customer.name = name
+        customer.arrival_time = None
+        customer._items = None
+        customer._num_items = num_items
+        customer._item_time = item_time
+        return customer
+
+    def copy(self) -> Customer:
+        """Return a new customer with the same name and items as this one,
+        who has not yet arrived.
+
+        >>> c = Customer('Bo', [Item('bananas', 7), Item('cheese', 3)])
+        >>> c.arrival_time = 5
+        >>> twin = c.copy()
+        >>> twin.name, twin.item_time(), twin.arrival_time
+        ('Bo', 10, None)
+        """
+        twin = Customer.__new__(Customer)
+        twin.name = self.name
+        twin.arrival_time = None
+        twin._items = None if self._items is None else self._items.copy()
+        twin._num_items = self._num_items
+        twin._item_time = self._item_time
+        return twin
 
     def num_items(self) -> int:
         """Return the number of items this customer has.
@@ -217,7 +503,7 @@ class Customer:
         2
         """
         # Done: Implement this method
-        return len(self._items)
+        return self._num_items
 
     def item_time(self) -> int:
         """Return the number of seconds it takes for a cashier to check out
@@ -229,8 +515,7 @@ class Customer:
         10
         """
         # Done: Implement this method
-        total_time = sum([item.time for item in self._items])
-        return total_time
+        return self._item_time
 
 
 class Item:
@@ -244,6 +529,7 @@ class Item:
     - self.time > 0
     """
 
+    __slots__ = ('name', 'time')
     name: str
     time: int
 
@@ -272,7 +558,7 @@ class CheckoutLine:
     - capacity: The maximum number of customers allowed in this CheckoutLine.
     - is_open: True iff the line is open.
     - _queue: Customers in this line in order by arrival time, with the
-                earliest arrival at the front of the list.
+                earliest arrival at the front of the deque.
 
     Representation Invariants:
     - len(self) <= self.capacity
@@ -281,7 +567,7 @@ class CheckoutLine:
 
     capacity: int
     is_open: bool
-    _queue: list[Customer]
+    _queue: deque[Customer]
 
     def __init__(self, capacity: int) -> None:
         """Initialize an open and empty CheckoutLine, with the given <capacity>.
@@ -295,11 +581,11 @@ class CheckoutLine:
         >>> line.is_open
         True
         >>> line._queue
-        []
+        deque([])
         """
         self.capacity = capacity
         self.is_open = True
-        self._queue = []
+        self._queue = deque()
 
     def __len__(self) -> int:
         """Return the length of this CheckoutLine.
@@ -368,7 +654,7 @@ class CheckoutLine:
         """
         if len(self._queue) == 0:
             return 0
-        self._queue = self._queue[1:]
+        self._queue.popleft()
         return len(self._queue)
 
     def close(self) -> list[Customer]:
@@ -387,9 +673,25 @@ class CheckoutLine:
         self.is_open = False
         if len(self._queue) == 0:
             return []
-        temp = self._queue[1:]
-        self._queue = self._queue[:1]
-        return temp
+        # Keep the front customer in a new deque, and hand back the old one.
+        rest = self._queue
+        self._queue = deque((rest.popleft(),))
+        return list(rest)
+
+    def reset(self) -> None:
+        """Remove every customer from this line and open it.
+
+        >>> line = CheckoutLine(2)
+        >>> line.accept(Customer('Sophia', []))
+        True
+        >>> line.close()
+        []
+        >>> line.reset()
+        >>> len(line), line.is_open
+        (0, True)
+        """
+        self.is_open = True
+        self._queue = deque()
 
     def first_in_line(self) -> Customer | None:
         """Return the first customer in this line, or None if there are no
@@ -446,7 +748,8 @@ if __name__ == '__main__':
         python_ta.check_all(
             config={
                 'allowed-import-modules':
-                    ['__future__', 'typing', 'json', 'python_ta', 'doctest'],
+                    ['__future__', 'collections', 'heapq', 'io', 'typing',
+                     'json', 'python_ta', 'doctest'],
                 'disable': ['W0613'],
             }
         )
@@ -0,0 +1,201 @@
+"""Assignment 1 - Grocery Store Parameter Sweeps
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file runs the grocery store simulation for every combination of a grid
+of store configurations and a list of event files, spreading the runs over
+several processes. For example:
+
+    python sweep.py --regular 2 4 --express 0 1 --self-serve 0 2 \
+        --capacity 5 10 --events day1.txt day2.txt --out sweep.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from itertools import product
+from typing import TextIO
+
+from event import Event, create_event_list
+from simulation import GroceryStoreSimulation
+from store import StoreTemplate
+
+# The configuration keys of a GroceryStore, in the order they are reported.
+CONFIG_KEYS = ['regular_count', 'express_count', 'self_serve_count',
+               'line_capacity']
+
+# The event files parsed so far by this process during a sweep, by file name
+# and modification time. Each worker process parses an event file the first
+# time one of its runs needs it. The cache is cleared when a worker starts,
+# and when a sweep run in this process ends, so parsed events only last as
+# long as the sweep that needed them.
+_parsed_events: dict[tuple[str, int], list[Event]] = {}
+
+# The store templates made so far by this process, by configuration values
+# in the order of CONFIG_KEYS.
+_templates: dict[tuple[int, ...], StoreTemplate] = {}
+
+
+def config_grid(regular_count: list[int], express_count: list[int],
+                self_serve_count: list[int],
+                line_capacity: list[int]) -> list[dict[str, int]]:
+    """Return a store configuration for every combination of the given
+    values.
+
+    >>> grid = config_grid([1, 2], [0], [0, 3], [10])
+    >>> len(grid)
+    4
+    >>> grid[1]['regular_count'], grid[1]['self_serve_count']
+    (1, 3)
+    """
+    return [dict(zip(CONFIG_KEYS, values)) for values in
+            product(regular_count, express_count, self_serve_count,
+                    line_capacity)]
+
+
+def load_events(event_file_name: str) -> list[Event]:
+    """Return the events in the file named <event_file_name>, parsing the
+    file only the first time it is loaded in this process since the cache
+    was last cleared, or since the file last changed.
+
+    The same Event objects are returned every time, and may be run by
+    several simulations one after another, since running events does not
+    change them.
+    """
+    key = (event_file_name, os.stat(event_file_name).st_mtime_ns)
+    events = _parsed_events.get(key)
+    if events is None:
+        with open(event_file_name) as event_file:
+            events = create_event_list(event_file)
+        _parsed_events[key] = events
+    return events
+
+
+def clear_event_cache() -> None:
+    """Forget the events parsed by load_events in this process.
+
+    This is the initializer of every worker process of a sweep or of
+    replicate, and is called when a sweep run in this process ends.
+    """
+    _parsed_events.clear()
+
+
+def store_template(config: dict[str, int]) -> StoreTemplate:
+    """Return a StoreTemplate for <config>, making it only the first time
+    <config> is used in this process."""
+    key = tuple(config[name] for name in CONFIG_KEYS)
+    template = _templates.get(key)
+    if template is None:
+        template = StoreTemplate(StringIO(json.dumps(config)))
+        _templates[key] = template
+    return template
+
+
+def simulate(config: dict[str, int], events: list[Event]) -> dict[str, int]:
+    """Return the stats from simulating <events> in a store with the given
+    <config>."""
+    sim = GroceryStoreSimulation(store_template(config))
+    sim.run(events)
+    return sim.stats
+
+
+def _run_one(task: tuple[dict[str, int], str]) -> dict:
+    """Return the result row for one run of the sweep, where <task> is the
+    store configuration and the event file name to simulate."""
+    config, event_file_name = task
+    row = {'event_file': event_file_name}
+    row.update(config)
+    row.update(simulate(config, load_events(event_file_name)))
+    return row
+
+
+def sweep(configs: list[dict[str, int]], event_file_names: list[str],
+          max_workers: int | None = None) -> list[dict]:
+    """Return one result row for every combination of a configuration in
+    <configs> and an event file in <event_file_names>.
+
+    Each row has the event file name, the configuration values and the
+    simulation stats. Rows are in order by event file, then configuration.
+
+    The runs are spread over <max_workers> processes, or one per CPU if
+    <max_workers> is None. If <max_workers> is 1, they are run in this
+    process instead.
+    """
+    tasks = [(config, name) for name in event_file_names
+             for config in configs]
+    if max_workers == 1:
+        try:
+            return [_run_one(task) for task in tasks]
+        finally:
+            clear_event_cache()
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers,
+                             initializer=clear_event_cache) as executor:
+        # Chunks of runs on the same file let a worker reuse its parsed
+        # events, while leaving enough chunks to keep every worker busy.
+        chunksize = max(1, min(len(configs), len(tasks) // (4 * workers)))
+        return list(executor.map(_run_one, tasks, chunksize=chunksize))
+
+
+def write_csv(rows: list[dict], out: TextIO) -> None:
+    """Write <rows> to <out> as CSV, with a header row."""
+    fieldnames = ['event_file'] + CONFIG_KEYS + \
+        ['num_customers', 'total_time', 'max_wait']
+    writer = csv.DictWriter(out, fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def write_json(rows: list[dict], out: TextIO) -> None:
+    """Write <rows> to <out> as a JSON list of objects."""
+    json.dump(rows, out, indent=1)
+    out.write('\n')
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the sweep described by the command line arguments <argv>."""
+    parser = argparse.ArgumentParser(
+        description='Simulate every store configuration in a grid against '
+                    'every event file.')
+    parser.add_argument('--regular', type=int, nargs='+', default=[1])
+    parser.add_argument('--express', type=int, nargs='+', default=[0])
+    parser.add_argument('--self-serve', type=int, nargs='+', default=[0])
+    parser.add_argument('--capacity', type=int, nargs='+', default=[10])
+    parser.add_argument('--events', nargs='+', required=True)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='-',
+                        help='output file; .json for JSON, otherwise CSV')
+    args = parser.parse_args(argv)
+
+    configs = config_grid(args.regular, args.express, args.self_serve,
+                          args.capacity)
+    rows = sweep(configs, args.events, args.workers)
+    write = write_json if args.out.endswith('.json') else write_csv
+    if args.out == '-':
+        write(rows, sys.stdout)
+    else:
+        with open(args.out, 'w', newline='') as out:
+            write(rows, out)
+
+
+if __name__ == '__main__':
+    main()
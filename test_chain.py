@@ -0,0 +1,76 @@
+"""Assignment 1 - Tests for store chains
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the chain module.
+"""
+from __future__ import annotations
+
+from chain import run_chain_file, split_chain_events
+from conftest import CONFIG, EXPECTED_STATS, make_event_file
+
+
+def write_chain_file(tmp_path, seeds: list[int]) -> str:
+    """Write a chain event file with a store 's<seed>' running the random
+    event file for each of <seeds>, with the stores' lines interleaved, and
+    return its name."""
+    slices = [make_event_file(seed).getvalue().split('\n')
+              for seed in seeds]
+    lines = []
+    for i in range(max(len(s) for s in slices)):
+        for seed, store_lines in zip(seeds, slices):
+            if i < len(store_lines):
+                lines.append(f's{seed} {store_lines[i]}\n')
+    path = tmp_path / 'chain.txt'
+    path.write_text(''.join(lines) + '\n')
+    return str(path)
+
+
+class TestChain:
+    def test_split(self, tmp_path):
+        name = write_chain_file(tmp_path, [0, 3])
+        out_dir = tmp_path / 'split'
+        out_dir.mkdir()
+        paths = split_chain_events(name, str(out_dir))
+        assert set(paths) == {'s0', 's3'}
+        with open(paths['s3']) as store_file:
+            assert store_file.read().split('\n')[:-1] == \
+                make_event_file(3).getvalue().split('\n')
+
+    def test_matches_single_stores(self, tmp_path):
+        seeds = [0, 1, 2, 3]
+        name = write_chain_file(tmp_path, seeds)
+        configs = {f's{seed}': CONFIG for seed in seeds}
+        results = run_chain_file(configs, name, max_workers=1)
+        for seed in seeds:
+            store = results['stores'][f's{seed}']
+            for key, value in EXPECTED_STATS[seed].items():
+                assert store[key] == value
+            assert store['waits'] == 200
+        chain = results['chain']
+        assert chain['num_customers'] == 800
+        assert chain['max_wait'] == max(s['max_wait'] for s in
+                                        EXPECTED_STATS[:4])
+        assert chain['waits'] == 800
+        assert chain['p99_wait'] <= chain['max_wait'] * 1.01
+
+    def test_parallel_matches_serial(self, tmp_path):
+        name = write_chain_file(tmp_path, [1, 4])
+        configs = {'s1': CONFIG, 's4': CONFIG}
+        assert run_chain_file(configs, name, max_workers=2) == \
+            run_chain_file(configs, name, max_workers=1)
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_chain.py'])
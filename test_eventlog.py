@@ -0,0 +1,84 @@
+"""Assignment 1 - Tests for event logs
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the eventlog module.
+"""
+from __future__ import annotations
+
+import pytest
+
+from conftest import EXPECTED_STATS, make_config, make_event_file
+from event import create_event_list
+from eventlog import read_event_columns, compile_events, CompiledEventLog, \
+    describe
+from simulation import GroceryStoreSimulation
+
+
+def write_events(tmp_path, text: str) -> str:
+    """Write <text> to an event file in <tmp_path> and return its name."""
+    path = tmp_path / 'events.txt'
+    path.write_text(text)
+    return str(path)
+
+
+class TestReadEventColumns:
+    def test_matches_create_event_list(self, tmp_path):
+        text = make_event_file(148, n=500).getvalue()
+        name = write_events(tmp_path, text)
+        expected = [describe(e) for e in create_event_list(text.split('\n'))]
+        for chunk_size in [1, 100, 1 << 22]:
+            columns = read_event_columns(name, chunk_size)
+            assert len(columns) == len(expected)
+            assert [describe(e) for e in columns] == expected
+
+    def test_empty_file(self, tmp_path):
+        assert len(read_event_columns(write_events(tmp_path, ''))) == 0
+
+    def test_no_trailing_newline(self, tmp_path):
+        name = write_events(tmp_path, '1 Arrive A x 3\n\n2 Close 4')
+        columns = read_event_columns(name)
+        assert [describe(e) for e in columns] == [(1, 'Arrive', 'A', 1, 3),
+                                                  (2, 'Close', 4)]
+
+
+class TestCompiledEventLog:
+    def test_round_trip(self, tmp_path):
+        text = make_event_file(148, n=500).getvalue()
+        name = write_events(tmp_path, text)
+        out = str(tmp_path / 'events.bin')
+        assert compile_events(name, out) == 502
+        events = create_event_list(text.split('\n'))
+        # The log is sorted by timestamp, keeping the file order of events
+        # with the same timestamp.
+        events.sort()
+        expected = [describe(e) for e in events]
+        with CompiledEventLog(out) as log:
+            assert len(log) == 502
+            assert [describe(e) for e in log] == expected
+
+    def test_run_stream(self, tmp_path):
+        name = write_events(tmp_path, make_event_file(1).getvalue())
+        out = str(tmp_path / 'events.bin')
+        compile_events(name, out)
+        sim = GroceryStoreSimulation(make_config())
+        with CompiledEventLog(out) as log:
+            sim.run_stream(log)
+        assert sim.stats == EXPECTED_STATS[1]
+
+    def test_not_a_log(self, tmp_path):
+        with pytest.raises(ValueError):
+            CompiledEventLog(write_events(tmp_path, '1 Close 0\n' * 10))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_eventlog.py'])
@@ -0,0 +1,155 @@
+"""Assignment 1 - Tests for event traces
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the eventtrace module.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import make_config, make_event_file
+from event import CustomerArrival, create_event_list
+from eventtrace import EVENT_TYPES, read_trace
+from simulation import GroceryStoreSimulation
+from store import Customer
+
+
+def traced_run(path: str, seed: int = 0,
+               block_rows: int = 100) -> GroceryStoreSimulation:
+    """Return a simulation run on a random event file made with <seed>,
+    with a trace written to <path>."""
+    sim = GroceryStoreSimulation(make_config())
+    sink = sim.trace_to(path, block_rows)
+    sim.run(create_event_list(make_event_file(seed)))
+    assert sim.trace is None
+    assert sink.rows > block_rows
+    return sim
+
+
+class TestTrace:
+    def test_binary(self, tmp_path):
+        path = str(tmp_path / 'trace.bin')
+        sim = traced_run(path)
+        trace = read_trace(path)
+        assert list(trace.timestamps) == sorted(trace.timestamps)
+        kinds = [EVENT_TYPES[code].__name__ for code in trace.types]
+        arrived = {name for kind, name in zip(kinds, trace.names)
+                   if kind == 'CustomerArrival'}
+        completed = [(timestamp, name) for timestamp, kind, name
+                     in zip(trace.timestamps, kinds, trace.names)
+                     if kind == 'CheckoutCompleted']
+        assert len(arrived) == len(completed) == sim.stats['num_customers']
+        assert {name for _, name in completed} == arrived
+        assert completed[-1][0] == sim.stats['total_time']
+        assert kinds.count('CloseLine') == 2
+
+    def test_csv_matches_binary(self, tmp_path):
+        traced_run(str(tmp_path / 'trace.bin'), seed=3)
+        traced_run(str(tmp_path / 'trace.csv'), seed=3, block_rows=7)
+        trace = read_trace(str(tmp_path / 'trace.bin'))
+        with open(tmp_path / 'trace.csv') as trace_file:
+            rows = list(csv.DictReader(trace_file))
+        assert [(int(row['timestamp']), row['event'], int(row['line']),
+                 row['customer']) for row in rows] == \
+            [(timestamp, EVENT_TYPES[code].__name__, line_number, name)
+             for timestamp, code, line_number, name in zip(
+                 trace.timestamps, trace.types, trace.lines, trace.names)]
+
+    def test_names_and_retries(self, tmp_path):
+        # One line with room for one customer, so two of the three retry.
+        config = {'regular_count': 1, 'express_count': 0,
+                  'self_serve_count': 0, 'line_capacity': 1}
+        names = ['a,b', 'c\nd', '"e"']
+        rows = {}
+        for path in [str(tmp_path / 'trace.bin'), str(tmp_path / 'trace.csv')]:
+            sim = GroceryStoreSimulation(make_config(config))
+            sim.trace_to(path, 2)
+            sim.run([CustomerArrival(0, Customer.from_item_times(name, [1]))
+                     for name in names])
+            if path.endswith('.csv'):
+                with open(path, newline='') as trace_file:
+                    rows[path] = [(row['event'], int(row['line']),
+                                   row['customer'])
+                                  for row in csv.DictReader(trace_file)]
+            else:
+                trace = read_trace(path)
+                rows[path] = [(EVENT_TYPES[code].__name__, line_number, name)
+                              for code, line_number, name in zip(
+                                  trace.types, trace.lines, trace.names)]
+        binary, text = rows.values()
+        assert binary == text
+        assert [name for kind, _, name in binary
+                if kind == 'CheckoutCompleted'] == names
+        assert ('CustomerRetry', 0, names[1]) in binary
+        assert ('CustomerRetry', 0, names[2]) in binary
+        assert ('CustomerRetry', -1, '') in binary
+
+    def test_closed_when_run_raises(self, tmp_path):
+        path = str(tmp_path / 'trace.bin')
+        sim = GroceryStoreSimulation(make_config())
+        sink = sim.trace_to(path, 5)
+        events = sorted(create_event_list(make_event_file(0)))
+        # The earliest event comes last, so the stream fails near its end.
+        events.append(events.pop(0))
+        with pytest.raises(ValueError):
+            sim.run_stream(iter(events))
+        assert sim.trace is None
+        assert not sink._writer.is_alive()
+        assert len(read_trace(path)) == sink.rows > 0
+
+    def test_checkpoint_while_tracing(self, tmp_path):
+        path = str(tmp_path / 'sim.ckpt')
+        sim = GroceryStoreSimulation(make_config())
+        sink = sim.trace_to(str(tmp_path / 'trace.bin'), 50)
+        sim.checkpoint_every(path, 300)
+        sim.run(create_event_list(make_event_file(2)))
+        restored = GroceryStoreSimulation.restore(
+            path, create_event_list(make_event_file(2)))
+        assert restored._store.on_join is None
+        restored.resume()
+        assert restored.stats == sim.stats
+        assert len(read_trace(str(tmp_path / 'trace.bin'))) == sink.rows
+
+    def test_unclosed_trace_does_not_hang(self, tmp_path):
+        # Neither a sink that is never used nor one whose writer has
+        # started keeps the interpreter from exiting.
+        script = (
+            'import sys\n'
+            'from io import StringIO\n'
+            'from event import CloseLine\n'
+            'from simulation import GroceryStoreSimulation\n'
+            'config = StringIO(\'{"regular_count": 1, "express_count": 0, '
+            '"self_serve_count": 0, "line_capacity": 1}\')\n'
+            'sim = GroceryStoreSimulation(config)\n'
+            'sim.trace_to(sys.argv[1])\n'
+            'sim.trace_to(sys.argv[2], 1).record(CloseLine(0, 0), [])\n')
+        result = subprocess.run(
+            [sys.executable, '-c', script, str(tmp_path / 'unused.bin'),
+             str(tmp_path / 'started.bin')],
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=60)
+        assert result.returncode == 0
+
+    def test_not_a_trace(self, tmp_path):
+        path = tmp_path / 'trace.bin'
+        path.write_bytes(b'not a trace')
+        with pytest.raises(ValueError):
+            read_trace(str(path))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_eventtrace.py'])
@@ -0,0 +1,78 @@
+"""Assignment 1 - Tests for the fast fixed-policy simulation
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the fastsim module.
+"""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from conftest import CONFIG, make_config, make_event_file
+from event import create_event_list
+from eventlog import EventColumns
+from fastsim import assign_lines
+from simulation import GroceryStoreSimulation
+
+
+def columns_for(text: str) -> EventColumns:
+    """Return the events in the event file <text> as an EventColumns."""
+    columns = EventColumns()
+    columns.add_lines(text.encode().split(b'\n'))
+    return columns
+
+
+class TestAssignLines:
+    @pytest.mark.parametrize('seed', range(8))
+    def test_matches_simulation(self, seed):
+        rng = random.Random(seed)
+        config = {'regular_count': rng.randint(1, 3),
+                  'express_count': rng.randint(0, 2),
+                  'self_serve_count': rng.randint(0, 2),
+                  'line_capacity': 1000}
+        text = make_event_file(seed, n=300, closes=0).getvalue()
+        assignment = assign_lines(config, columns_for(text))
+
+        sim = GroceryStoreSimulation(make_config(config))
+        collector = sim.collect_stats()
+        sim.run(create_event_list(text.split('\n')))
+        assert assignment.stats() == sim.stats
+        assert sum(assignment.finishes) - sum(assignment.arrival_times) \
+            == collector.waits.total
+
+    def test_policy(self):
+        text = '\n'.join(['0 Arrive A a 5', '0 Arrive B b 1 c 1',
+                          '0 Arrive C d 2', '0 Arrive D e 1 f 1 g 1 h 1 i 1 '
+                          'j 1 k 1 l 1', '2 Arrive E m 3'])
+        assignment = assign_lines(CONFIG, columns_for(text))
+        # A and B take the empty regular lines, C the express line and D,
+        # with too many items for express, the self-serve line. When E
+        # arrives, B and C are still in line, since arrivals are handled
+        # before the checkouts finishing at the same time, so every line
+        # has one customer and E joins line 0.
+        assert list(assignment.lines) == [0, 1, 2, 3, 0]
+        assert list(assignment.starts) == [0, 0, 0, 0, 5]
+        assert list(assignment.finishes) == [5, 2, 2, 16, 8]
+
+    def test_unsupported(self):
+        with pytest.raises(ValueError):
+            assign_lines(CONFIG, columns_for('0 Close 1'))
+        full = {'regular_count': 1, 'express_count': 0,
+                'self_serve_count': 0, 'line_capacity': 1}
+        with pytest.raises(ValueError):
+            assign_lines(full, columns_for('0 Arrive A a 5\n1 Arrive B b 1'))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_fastsim.py'])
@@ -13,7 +13,10 @@ Jacqueline Smith.
 Module Description:
 This module will contain tests for class PriorityQueue.
 """
-from container import PriorityQueue
+from __future__ import annotations
+
+from container import PriorityQueue, HeapPriorityQueue, CalendarQueue
+from event import Event
 
 # TODO: Put your pytest test functions for class PriorityQueue here
 
@@ -48,6 +51,122 @@ class TestPriorityQueue:
         assert pq.remove() == 'sophia'
         assert pq.is_empty() == True
 
+
+class _Ticket:
+    """An item that compares only by <priority>, so that distinct tickets can
+    be equal to each other."""
+
+    def __init__(self, priority: int, label: str) -> None:
+        self.priority = priority
+        self.label = label
+
+    def __eq__(self, other: _Ticket) -> bool:
+        return self.priority == other.priority
+
+    def __lt__(self, other: _Ticket) -> bool:
+        return self.priority < other.priority
+
+    def __le__(self, other: _Ticket) -> bool:
+        return self.priority <= other.priority
+
+
+class TestHeapPriorityQueue:
+    def test_remove(self):
+        pq = HeapPriorityQueue()
+        pq.add('fred')
+        assert pq.remove() == 'fred'
+        assert pq.is_empty() == True
+
+    def test_add(self):
+        pq = HeapPriorityQueue()
+        for name in ['sophia', 'fred', 'anna', 'anna', 'fred', 'mona']:
+            pq.add(name)
+        removed = [pq.remove() for _ in range(6)]
+        assert removed == ['anna', 'anna', 'fred', 'fred', 'mona', 'sophia']
+        assert pq.is_empty() == True
+
+    def test_ties_are_fifo(self):
+        pq = HeapPriorityQueue()
+        tickets = [_Ticket(p, str(i))
+                   for i, p in enumerate([3, 1, 3, 2, 1, 3])]
+        for ticket in tickets:
+            pq.add(ticket)
+        labels = [pq.remove().label for _ in range(len(tickets))]
+        assert labels == ['1', '4', '3', '0', '2', '5']
+
+    def test_matches_priority_queue(self):
+        pq = PriorityQueue()
+        hpq = HeapPriorityQueue()
+        tickets = [_Ticket((i * 7) % 5, str(i)) for i in range(50)]
+        for ticket in tickets[:30]:
+            pq.add(ticket)
+            hpq.add(ticket)
+        for _ in range(10):
+            assert pq.remove() is hpq.remove()
+        for ticket in tickets[30:]:
+            pq.add(ticket)
+            hpq.add(ticket)
+        while not pq.is_empty():
+            assert pq.remove() is hpq.remove()
+        assert hpq.is_empty() == True
+
+    def test_add_all_and_remove_all_equal(self):
+        pq = PriorityQueue()
+        hpq = HeapPriorityQueue()
+        tickets = [_Ticket((i * 7) % 5, str(i)) for i in range(50)]
+        for ticket in tickets[:5]:
+            pq.add(ticket)
+            hpq.add(ticket)
+        for start in [5, 15]:
+            pq.add_all(tickets[start:start + 10])
+            hpq.add_all(tickets[start:start + 10])
+        pq.add_all(tickets[25:])
+        hpq.add_all(tickets[25:])
+        while not pq.is_empty():
+            assert [t.label for t in pq.remove_all_equal()] == \
+                [t.label for t in hpq.remove_all_equal()]
+        assert hpq.is_empty() == True
+
+
+class TestCalendarQueue:
+    def test_is_empty(self):
+        cq = CalendarQueue()
+        assert cq.is_empty() == True
+        cq.add(Event(4))
+        assert cq.is_empty() == False
+        cq.remove()
+        assert cq.is_empty() == True
+
+    def test_matches_priority_queue(self):
+        pq = PriorityQueue()
+        cq = CalendarQueue()
+        events = [Event((i * 7) % 5) for i in range(40)]
+        for event in events[:25]:
+            pq.add(event)
+            cq.add(event)
+        for _ in range(10):
+            assert pq.remove() is cq.remove()
+        for event in events[25:]:
+            pq.add(event)
+            cq.add(event)
+        while not pq.is_empty():
+            assert pq.remove() is cq.remove()
+        assert cq.is_empty() == True
+        assert len(cq) == 0
+
+    def test_remove_all_equal(self):
+        pq = PriorityQueue()
+        cq = CalendarQueue()
+        events = [Event((i * 7) % 5) for i in range(40)]
+        pq.add_all(events)
+        cq.add_all(events)
+        while not pq.is_empty():
+            batch = cq.remove_all_equal()
+            assert len(batch) == 8
+            assert list(pq.remove_all_equal()) == list(batch)
+        assert cq.is_empty() == True
+
+
 if __name__ == '__main__':
     import pytest
 
@@ -0,0 +1,158 @@
+"""Assignment 1 - Tests for real-time replays
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the replay module.
+"""
+from __future__ import annotations
+
+import asyncio
+from io import StringIO
+
+import pytest
+
+from conftest import make_config, make_event_file
+from event import CustomerArrival, CheckoutStarted, create_event_list
+from replay import ReplayRunner
+from simulation import GroceryStoreSimulation
+from store import Customer
+
+
+def sorted_event_file(seed: int) -> str:
+    """Return a random event file with its lines in timestamp order."""
+    lines = make_event_file(seed).getvalue().split('\n')
+    return '\n'.join(sorted(lines, key=lambda line: int(line.split()[0])))
+
+
+async def collect(runner: ReplayRunner, event_file: StringIO | None,
+                  follow: bool = False) -> list[dict[str, int]]:
+    """Return every snapshot of a replay of <event_file> by <runner>."""
+    return [snapshot async for snapshot in runner.replay(event_file, follow)]
+
+
+class TestReplayRunner:
+    def test_matches_run(self):
+        for seed in range(3):
+            text = sorted_event_file(seed)
+            sim = GroceryStoreSimulation(make_config())
+            sim.run(create_event_list(StringIO(text)))
+            runner = ReplayRunner(GroceryStoreSimulation(make_config()),
+                                  speed=None, interval=7, chunk_lines=16)
+            snapshots = asyncio.run(collect(runner, StringIO(text)))
+            times = [snapshot.pop('time') for snapshot in snapshots]
+            assert all(later > earlier and (later - earlier) % 7 == 0
+                       for earlier, later in zip(times, times[1:]))
+            assert snapshots[-1] == runner.sim.stats == sim.stats
+
+    def test_paced_by_clock(self):
+        runner = ReplayRunner(GroceryStoreSimulation(make_config()),
+                              speed=200, interval=10)
+
+        async def timed() -> tuple[list[dict[str, int]], float]:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            snapshots = await collect(
+                runner, StringIO('0 Arrive A a 5\n40 Arrive B b 3'))
+            return snapshots, loop.time() - start
+
+        snapshots, elapsed = asyncio.run(timed())
+        assert [snapshot['time'] for snapshot in snapshots] == \
+            [0, 10, 20, 30, 40, 50]
+        assert elapsed >= 50 / 200
+        assert snapshots[-1]['total_time'] == 43
+
+    def test_inject(self):
+        runner = ReplayRunner(GroceryStoreSimulation(make_config()),
+                              speed=None)
+
+        async def follow() -> list[dict[str, int]]:
+            snapshots = []
+            async for snapshot in runner.replay(StringIO('0 Arrive A a 5'),
+                                                follow=True):
+                snapshots.append(snapshot)
+                if snapshot['time'] == 0:
+                    # Already past time 0, so B arrives at time 1.
+                    runner.inject(CustomerArrival(
+                        0, Customer.from_item_times('B', [2])))
+                elif snapshot['total_time'] == 5:
+                    runner.stop()
+            return snapshots
+
+        snapshots = asyncio.run(follow())
+        assert snapshots[-1]['num_customers'] == 2
+        assert runner.sim.stats['max_wait'] == 5
+
+    def test_inject_late(self):
+        runner = ReplayRunner(GroceryStoreSimulation(make_config()),
+                              speed=None, interval=50)
+        late = CustomerArrival(5, Customer.from_item_times('L', [1]))
+
+        async def follow() -> list[dict[str, int]]:
+            snapshots = []
+            async for snapshot in runner.replay(
+                    StringIO('0 Arrive A a 1\n60 Arrive B b 1'),
+                    follow=True):
+                snapshots.append(snapshot)
+                if snapshot['time'] == 50:
+                    runner.inject(late)
+                elif snapshot['num_customers'] == 3:
+                    runner.stop()
+            return snapshots
+
+        asyncio.run(follow())
+        # L arrives at time 51, when the replay reaches it, and waits 1.
+        assert runner.sim.stats == {'num_customers': 3, 'total_time': 61,
+                                    'max_wait': 1}
+        assert late.timestamp == 5
+
+    def test_inject_not_arrival_or_close(self):
+        runner = ReplayRunner(GroceryStoreSimulation(make_config()))
+        with pytest.raises(ValueError):
+            runner.inject(CheckoutStarted(3, 0))
+
+    def test_disordered_file(self):
+        for chunk_lines in [1, 16]:
+            runner = ReplayRunner(GroceryStoreSimulation(make_config()),
+                                  speed=None, chunk_lines=chunk_lines)
+            with pytest.raises(ValueError):
+                asyncio.run(collect(runner, StringIO(
+                    '0 Arrive A a 1\n5 Arrive B b 1\n3 Arrive C c 1')))
+
+    def test_socket(self):
+        runner = ReplayRunner(GroceryStoreSimulation(make_config()),
+                              speed=None)
+
+        async def send_and_follow() -> list[dict[str, int]]:
+            server = await runner.serve()
+            port = server.sockets[0].getsockname()[1]
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'3 Arrive A a 2\n4 Arrive B b')
+            writer.write(b' 1\n')
+            await writer.drain()
+            writer.close()
+            snapshots = []
+            async for snapshot in runner.replay(follow=True):
+                snapshots.append(snapshot)
+                if snapshot['num_customers'] == 2 \
+                        and not runner.sim.has_events():
+                    runner.stop()
+            server.close()
+            await server.wait_closed()
+            return snapshots
+
+        snapshots = asyncio.run(send_and_follow())
+        assert snapshots[-1]['num_customers'] == 2
+        assert runner.sim.stats['total_time'] == 5
+
+
+if __name__ == '__main__':
+    pytest.main(['test_replay.py'])
@@ -0,0 +1,61 @@
+"""Assignment 1 - Tests for replications
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the replicate module.
+"""
+from __future__ import annotations
+
+from conftest import CONFIG, EXPECTED_STATS, make_event_file, \
+    write_event_files
+from event import create_event_list
+from replicate import jitter_arrivals, replicate, t_critical
+
+
+class TestReplicate:
+    def test_jitter_arrivals(self):
+        events = create_event_list(make_event_file(0))
+        perturbed = jitter_arrivals(events, 'a', 3)
+        assert perturbed == jitter_arrivals(events, 'a', 3)
+        for before, after in zip(events, perturbed):
+            assert abs(before.timestamp - after.timestamp) <= 3
+            if hasattr(before, 'customer'):
+                assert after.customer is not before.customer
+                assert after.customer.arrival_time == after.timestamp
+
+    def test_t_critical(self):
+        # Two-sided critical values from a table of Student's t.
+        table = {(1, 0.95): 12.706, (2, 0.95): 4.303, (3, 0.99): 5.841,
+                 (5, 0.9): 2.015, (10, 0.99): 3.169, (11, 0.95): 2.201,
+                 (30, 0.99): 2.750}
+        for (df, confidence), expected in table.items():
+            assert abs(t_critical(confidence, df) - expected) < 0.002
+
+    def test_no_jitter(self, tmp_path):
+        names = write_event_files(tmp_path, [0])
+        running = replicate(CONFIG, names[0], 4, jitter=0, max_workers=2)
+        assert running.count == 4
+        assert running.mean == EXPECTED_STATS[0]['max_wait']
+        assert running.half_width() == 0
+
+    def test_stops_at_target(self, tmp_path):
+        names = write_event_files(tmp_path, [0])
+        running = replicate(CONFIG, names[0], 50, jitter=0,
+                            target_half_width=1, min_replications=3,
+                            max_workers=1)
+        assert 3 <= running.count <= 4
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_replicate.py'])
@@ -0,0 +1,236 @@
+"""Assignment 1 - Tests for the grocery store simulation
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for class GroceryStoreSimulation.
+"""
+from __future__ import annotations
+
+import random
+from io import StringIO
+
+import pytest
+
+from conftest import CONFIG, EXPECTED_STATS, make_config, make_event_file
+from container import CalendarQueue, PriorityQueue
+from simulation import GroceryStoreSimulation
+from event import create_event_list, iter_events
+
+
+def run_stats(seed: int, **kwargs) -> dict[str, int]:
+    """Return the stats from running the simulation on a random event file
+    made with <seed>, passing <kwargs> to GroceryStoreSimulation."""
+    sim = GroceryStoreSimulation(make_config(), **kwargs)
+    sim.run(create_event_list(make_event_file(seed)))
+    return sim.stats
+
+
+class TestGroceryStoreSimulation:
+    def test_single_customer(self):
+        sim = GroceryStoreSimulation(make_config())
+        sim.run(create_event_list(StringIO('3 Arrive Bo bread 4 milk 2')))
+        assert sim.stats == {'num_customers': 1, 'total_time': 9,
+                             'max_wait': 6}
+
+    def test_matches_original(self):
+        for seed, expected in enumerate(EXPECTED_STATS):
+            assert run_stats(seed) == expected
+
+    def test_calendar_queue_matches_default(self):
+        for seed in range(5):
+            expected = run_stats(seed)
+            assert run_stats(seed, events=CalendarQueue()) == expected
+
+    def test_list_queue_matches_default(self):
+        for seed in range(5):
+            assert run_stats(seed, events=PriorityQueue()) == run_stats(seed)
+
+    def test_run_stream_sorted(self):
+        for seed in range(5):
+            events = create_event_list(make_event_file(seed))
+            events.sort()
+            sim = GroceryStoreSimulation(make_config())
+            sim.run_stream(iter(events))
+            assert sim.stats == run_stats(seed)
+
+    def test_run_stream_reorder_window(self):
+        for seed in range(5):
+            sim = GroceryStoreSimulation(make_config())
+            sim.run_stream(iter_events(make_event_file(seed)), 250)
+            assert sim.stats == run_stats(seed)
+
+    def test_run_stream_local_disorder(self):
+        # Shuffling blocks of 8 sorted events moves each event at most 7
+        # positions, so a window of 8 events puts a much longer stream back
+        # in order, and a window of 4 is too small.
+        rng = random.Random(148)
+        events = create_event_list(make_event_file(5, n=2000))
+        events.sort()
+        disordered = []
+        for start in range(0, len(events), 8):
+            block = events[start:start + 8]
+            rng.shuffle(block)
+            disordered.extend(block)
+        expected = GroceryStoreSimulation(make_config())
+        expected.run(disordered)
+        sim = GroceryStoreSimulation(make_config())
+        sim.run_stream(iter(disordered), 8)
+        assert sim.stats == expected.stats
+        with pytest.raises(ValueError):
+            GroceryStoreSimulation(make_config()).run_stream(
+                iter(disordered), 4)
+
+    def test_crowded_store(self):
+        config = {'regular_count': 1, 'express_count': 1,
+                  'self_serve_count': 0, 'line_capacity': 2}
+        for seed in range(3):
+            events = create_event_list(
+                make_event_file(seed, n=100, closes=0))
+            events.sort()
+            sim = GroceryStoreSimulation(make_config(config))
+            instrumentation = sim.instrument()
+            sim.run(events)
+            stream_sim = GroceryStoreSimulation(make_config(config))
+            stream_sim.run_stream(iter(events))
+            assert sim.stats == stream_sim.stats
+            # Crowds of customers waiting for a line retry together.
+            retries = instrumentation.report()['events']['CustomerRetry']
+            assert retries['count'] < sim.stats['total_time']
+
+    def test_blocked_crowd_waits(self):
+        # Only the express line has room while the crowd of big baskets
+        # waits, so the crowd only retries when the regular line empties.
+        config = {'regular_count': 1, 'express_count': 1,
+                  'self_serve_count': 0, 'line_capacity': 1}
+        items = ' '.join(f'item{j} 1' for j in range(10))
+        events = create_event_list(StringIO('\n'.join(
+            f'0 Arrive c{i} {items}' for i in range(50))))
+        sim = GroceryStoreSimulation(make_config(config))
+        instrumentation = sim.instrument()
+        sim.run(events)
+        assert sim.stats == {'num_customers': 50, 'total_time': 500,
+                             'max_wait': 500}
+        retries = instrumentation.report()['events']['CustomerRetry']
+        assert retries['count'] <= 2 * 50
+        stream_sim = GroceryStoreSimulation(make_config(config))
+        stream_sim.run_stream(iter(create_event_list(StringIO('\n'.join(
+            f'0 Arrive c{i} {items}' for i in range(50))))))
+        assert stream_sim.stats == sim.stats
+
+    def test_run_stream_window_too_small(self):
+        sim = GroceryStoreSimulation(make_config())
+        with pytest.raises(ValueError):
+            sim.run_stream(iter_events(make_event_file(0)), 3)
+
+    def test_instrumented(self):
+        sim = GroceryStoreSimulation(make_config())
+        instrumentation = sim.instrument(profile=True)
+        events = create_event_list(make_event_file(2))
+        sim.run(events)
+        assert sim.stats == EXPECTED_STATS[2]
+        report = instrumentation.report()
+        assert report['events']['CustomerArrival']['count'] >= 200
+        assert report['events']['CloseLine']['count'] == 2
+        handled = sum(e['count'] for e in report['events'].values())
+        # Events generated for the timestamp being handled skip the queue,
+        # and the events the run starts with never enter it.
+        assert report['queue']['adds'] == report['queue']['removes'] \
+            < handled - len(events)
+        assert 0 < report['queue']['peak_depth'] < len(events)
+        instrumentation.print_profile(StringIO())
+
+    def test_collect_stats(self):
+        sim = GroceryStoreSimulation(make_config())
+        collector = sim.collect_stats()
+        sim.run(create_event_list(make_event_file(1)))
+        assert sim.stats == EXPECTED_STATS[1]
+        report = collector.report()
+        assert report['wait']['count'] == 200
+        assert report['wait']['p99'] <= sim.stats['max_wait'] * 1.01
+        assert sum(line['completed'] for line in report['lines']) == 200
+        for line in report['lines']:
+            assert 0 <= line['utilization'] <= 1
+            assert 0 <= line['mean_length'] <= CONFIG['line_capacity']
+        assert set(report['throughput']) == {'RegularLine', 'ExpressLine',
+                                             'SelfServeLine'}
+
+    def test_collect_stats_single_customer(self):
+        sim = GroceryStoreSimulation(make_config())
+        collector = sim.collect_stats()
+        sim.run(create_event_list(StringIO('3 Arrive Bo bread 4 milk 2')))
+        report = collector.report()
+        assert report['wait']['p50'] == pytest.approx(6, rel=0.01)
+        assert report['lines'][0]['utilization'] == pytest.approx(6 / 9)
+        assert report['lines'][0]['mean_length'] == pytest.approx(6 / 9)
+        assert report['throughput']['RegularLine'] == pytest.approx(1 / 9)
+
+    def test_approximate_customer_count(self):
+        for seed, expected in enumerate(EXPECTED_STATS):
+            stats = run_stats(seed, customer_error=0.05)
+            assert stats['num_customers'] == pytest.approx(200, rel=0.05)
+            assert stats['total_time'] == expected['total_time']
+            assert stats['max_wait'] == expected['max_wait']
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        path = str(tmp_path / 'sim.ckpt')
+        for seed, every, error in [(2, 300, None), (3, 1, 0.01)]:
+            sim = GroceryStoreSimulation(make_config(), CalendarQueue(),
+                                         customer_error=error)
+            collector = sim.collect_stats()
+            checkpointer = sim.checkpoint_every(path, every)
+            sim.run(create_event_list(make_event_file(seed)))
+            assert checkpointer.saved >= 2
+            restored = GroceryStoreSimulation.restore(
+                path, create_event_list(make_event_file(seed)))
+            restored.resume()
+            assert restored.stats == sim.stats
+            if error is None:
+                assert sim.stats == EXPECTED_STATS[seed]
+            assert restored.collector.report() == collector.report()
+
+    def test_restore_mid_run(self, tmp_path):
+        path = str(tmp_path / 'sim.ckpt')
+        sim = GroceryStoreSimulation(make_config())
+        collector = sim.collect_stats()
+        sim.start(create_event_list(make_event_file(2)))
+        sim.advance(800)
+        sim.save_checkpoint(path)
+        sim.resume()
+        assert sim.stats == EXPECTED_STATS[2]
+        events = create_event_list(make_event_file(2))
+        restored = GroceryStoreSimulation.restore(path, events)
+        # Customers were in line, and others had yet to arrive.
+        assert any(len(line) > 1 for line in restored._store.lines)
+        assert 0 < restored._input_read < len(events)
+        restored.resume()
+        assert restored.stats == sim.stats
+        assert restored.collector.report() == collector.report()
+
+    def test_save_checkpoint_before_run(self, tmp_path):
+        path = str(tmp_path / 'sim.ckpt')
+        sim = GroceryStoreSimulation(make_config())
+        sim.start(create_event_list(make_event_file(4)))
+        sim.save_checkpoint(path)
+        restored = GroceryStoreSimulation.restore(
+            path, create_event_list(make_event_file(4)))
+        restored.resume()
+        assert restored.stats == EXPECTED_STATS[4]
+
+    def test_restore_not_a_checkpoint(self, tmp_path):
+        path = tmp_path / 'events.txt'
+        path.write_text('3 Arrive Bo bread 4 milk 2')
+        with pytest.raises(ValueError):
+            GroceryStoreSimulation.restore(str(path))
+
+
+if __name__ == '__main__':
+    pytest.main(['test_simulation.py'])
@@ -0,0 +1,142 @@
+"""Assignment 1 - Tests for the grocery store models
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for class GroceryStore and the checkout lines.
+"""
+from __future__ import annotations
+
+import json
+import random
+from io import StringIO
+
+import pytest
+
+from store import GroceryStore, Customer, NoAvailableLineError, \
+    StoreTemplate
+
+
+def make_store(regular: int, express: int, self_serve: int,
+               capacity: int) -> GroceryStore:
+    """Return a new GroceryStore with the given line counts and capacity."""
+    return GroceryStore(StringIO(json.dumps({
+        'regular_count': regular, 'express_count': express,
+        'self_serve_count': self_serve, 'line_capacity': capacity})))
+
+
+def scan_for_line(store: GroceryStore, customer: Customer) -> int:
+    """Return the line <customer> should join by checking every line, or -1
+    if there is none."""
+    best = -1
+    for i, line in enumerate(store.lines):
+        if line.can_accept(customer) and \
+                (best == -1 or len(line) < len(store.lines[best])):
+            best = i
+    return best
+
+
+class TestEnterLine:
+    def test_no_line(self):
+        store = make_store(1, 0, 0, 1)
+        store.enter_line(Customer.from_item_times('a', [1]))
+        with pytest.raises(NoAvailableLineError):
+            store.enter_line(Customer.from_item_times('b', [1]))
+
+    def test_express_limit(self):
+        store = make_store(1, 1, 0, 5)
+        store.enter_line(Customer.from_item_times('a', [1]))
+        assert store.enter_line(Customer.from_item_times('b', [1] * 8)) == 0
+        assert store.enter_line(Customer.from_item_times('c', [1] * 7)) == 1
+
+    def test_try_enter_line_and_has_room(self):
+        store = make_store(1, 1, 0, 1)
+        assert store.try_enter_line(Customer.from_item_times('a', [1] * 9)) \
+            == 0
+        assert store.has_room()
+        assert store.try_enter_line(Customer.from_item_times('b', [1] * 9)) \
+            == -1
+        assert store.try_enter_line(Customer.from_item_times('c', [1])) == 1
+        assert not store.has_room()
+
+    def test_matches_scan(self):
+        rng = random.Random(148)
+        store = make_store(6, 3, 4, 4)
+        for i in range(3000):
+            op = rng.random()
+            line_number = rng.randrange(store.num_lines)
+            if op < 0.55:
+                customer = Customer.from_item_times(
+                    str(i), [1] * rng.randint(1, 12))
+                expected = scan_for_line(store, customer)
+                if expected == -1:
+                    with pytest.raises(NoAvailableLineError):
+                        store.enter_line(customer)
+                else:
+                    assert store.enter_line(customer) == expected
+            elif op < 0.995:
+                store.remove_front_customer(line_number)
+            else:
+                store.close_line(line_number)
+
+
+class TestStoreTemplate:
+    def test_new_stores_are_independent(self):
+        config = {'regular_count': 1, 'express_count': 1,
+                  'self_serve_count': 1, 'line_capacity': 1}
+        template = StoreTemplate(StringIO(json.dumps(config)))
+        assert template.config == config
+        store = template.new_store()
+        for name in 'abc':
+            store.enter_line(Customer.from_item_times(name, [1]))
+        store.close_line(0)
+        assert not store.has_room()
+        other = template.new_store()
+        assert [len(line) for line in other.lines] == [0, 0, 0]
+        assert other.enter_line(Customer.from_item_times('d', [1])) == 0
+
+    def test_empty_copy(self):
+        store = make_store(2, 1, 1, 2)
+        store.record_joins()
+        for i in range(6):
+            store.enter_line(Customer.from_item_times(str(i), [1]))
+        store.remove_front_customer(0)
+        store.close_line(1)
+        copy = store.empty_copy()
+        fresh = make_store(2, 1, 1, 2)
+        assert vars(copy).keys() == vars(fresh).keys()
+        assert copy.joins is None and copy.openings == 0
+        assert [type(line) for line in copy.lines] == \
+            [type(line) for line in fresh.lines]
+        assert all(line.is_open and len(line) == 0 for line in copy.lines)
+        assert [copy.enter_line(Customer.from_item_times(str(i), [1]))
+                for i in range(8)] == [0, 1, 2, 3, 0, 1, 2, 3]
+        assert [(line_number, customer.name)
+                for line_number, customer in store.joins] == \
+            [(0, '0'), (1, '1'), (2, '2'), (3, '3'), (0, '4'), (1, '5')]
+
+    def test_reset(self):
+        store = make_store(2, 1, 1, 2)
+        store.record_joins()
+        for i in range(6):
+            store.enter_line(Customer.from_item_times(str(i), [1]))
+        store.close_line(1)
+        store.reset()
+        assert store.joins == []
+        assert all(line.is_open and len(line) == 0 for line in store.lines)
+        assert [store.enter_line(Customer.from_item_times(str(i), [1]))
+                for i in range(8)] == [0, 1, 2, 3, 0, 1, 2, 3]
+        assert [line_number for line_number, _ in store.joins] == \
+            [0, 1, 2, 3, 0, 1, 2, 3]
+
+
+if __name__ == '__main__':
+    pytest.main(['test_store.py'])
@@ -0,0 +1,67 @@
+"""Assignment 1 - Tests for parameter sweeps
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the sweep module.
+"""
+from __future__ import annotations
+
+import csv
+import os
+from io import StringIO
+
+import sweep as sweep_module
+from conftest import CONFIG, EXPECTED_STATS, make_event_file, \
+    write_event_files
+from sweep import config_grid, sweep, write_csv
+
+
+class TestSweep:
+    def test_matches_single_runs(self, tmp_path):
+        names = write_event_files(tmp_path, [0, 1])
+        rows = sweep([CONFIG], names, max_workers=1)
+        for seed, row in enumerate(rows):
+            assert row['event_file'] == names[seed]
+            assert row['line_capacity'] == CONFIG['line_capacity']
+            for key, value in EXPECTED_STATS[seed].items():
+                assert row[key] == value
+
+    def test_parallel_matches_serial(self, tmp_path):
+        names = write_event_files(tmp_path, [2, 3])
+        configs = config_grid([2, 3], [1], [1, 2], [3])
+        serial = sweep(configs, names, max_workers=1)
+        assert sweep(configs, names, max_workers=2) == serial
+
+    def test_events_not_kept(self, tmp_path):
+        names = write_event_files(tmp_path, [0])
+        assert sweep([CONFIG], names, max_workers=1)[0]['max_wait'] \
+            == EXPECTED_STATS[0]['max_wait']
+        assert not sweep_module._parsed_events
+        with open(names[0], 'w') as event_file:
+            event_file.write(make_event_file(1).getvalue())
+        os.utime(names[0], ns=(0, 0))
+        assert sweep([CONFIG], names, max_workers=1)[0]['max_wait'] \
+            == EXPECTED_STATS[1]['max_wait']
+
+    def test_write_csv(self, tmp_path):
+        names = write_event_files(tmp_path, [0])
+        out = StringIO()
+        write_csv(sweep([CONFIG], names, max_workers=1), out)
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        assert len(rows) == 1
+        assert rows[0]['max_wait'] == str(EXPECTED_STATS[0]['max_wait'])
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_sweep.py'])
@@ -0,0 +1,81 @@
+"""Assignment 1 - Tests for what-if simulations
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the whatif module.
+"""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from conftest import EXPECTED_STATS, make_config, make_event_file
+from event import CloseLine, create_event_list
+from simulation import GroceryStoreSimulation
+from whatif import WhatIf
+
+
+def vary(text: str, seed: int) -> str:
+    """Return the event file <text> with one random change."""
+    rng = random.Random(seed)
+    lines = text.split('\n')
+    i = rng.randrange(len(lines))
+    change = rng.choice(['drop', 'move', 'add'])
+    if change == 'drop':
+        del lines[i]
+    elif change == 'move':
+        parts = lines[i].split(' ', 1)
+        lines[i] = f'{int(parts[0]) + rng.randint(1, 50)} {parts[1]}'
+    else:
+        lines.append(f'{rng.randrange(1600)} Arrive new bread 3 milk 2')
+    return '\n'.join(lines)
+
+
+class TestWhatIf:
+    @pytest.mark.parametrize('seed', range(5))
+    def test_base_stats(self, seed):
+        text = make_event_file(seed).getvalue()
+        what_if = WhatIf(make_config(), create_event_list(text.split('\n')))
+        assert what_if.stats == EXPECTED_STATS[seed]
+
+    @pytest.mark.parametrize('seed', range(6))
+    def test_rerun_matches_run(self, seed):
+        text = make_event_file(seed % 3).getvalue()
+        what_if = WhatIf(make_config(), create_event_list(text.split('\n')),
+                         interval=25)
+        varied = vary(text, seed)
+        sim = GroceryStoreSimulation(make_config())
+        sim.run(create_event_list(varied.split('\n')))
+        events = create_event_list(varied.split('\n'))
+        rerun, start = what_if.rerun(events)
+        assert rerun.stats == sim.stats
+        assert start < what_if.divergence(events)
+
+    def test_late_close(self):
+        events = create_event_list(make_event_file(1, closes=0))
+        what_if = WhatIf(make_config(), events)
+        assert what_if.divergence(events) is None
+        assert what_if.rerun(events)[0].stats == what_if.stats
+
+        late = max(event.timestamp for event in events) - 20
+        varied = events + [CloseLine(late, 0)]
+        sim = GroceryStoreSimulation(make_config())
+        sim.run(create_event_list(make_event_file(1, closes=0))
+                + [CloseLine(late, 0)])
+        rerun, start = what_if.rerun(varied)
+        assert rerun.stats == sim.stats
+        assert start >= late - what_if.interval
+
+
+if __name__ == '__main__':
+    pytest.main(['test_whatif.py'])
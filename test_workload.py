@@ -0,0 +1,72 @@
+"""Assignment 1 - Tests for synthetic workloads
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+This module contains tests for the workload module.
+"""
+from __future__ import annotations
+
+import io
+
+from event import create_event_list
+from eventlog import describe
+import workload
+from workload import Workload, PRESETS
+
+
+def small_workload(**kwargs) -> Workload:
+    """Return a small Workload with two closing lines."""
+    return Workload(1000, rate=0.5, closes=[(0.5, 1), (0.25, 0)], **kwargs)
+
+
+class TestWorkload:
+    def test_text_matches_columns(self, monkeypatch):
+        monkeypatch.setattr(workload, 'BATCH_SIZE', 300)
+        w = small_workload(diurnal_amplitude=0.5, period=500)
+        out = io.StringIO()
+        assert w.write(out, 1) == 1002
+        out.seek(0)
+        parsed = [describe(e) for e in create_event_list(out)]
+        assert parsed == [describe(e) for e in w.columns(1)]
+        assert [e[1] for e in parsed].count('Close') == 2
+
+    def test_in_timestamp_order(self):
+        timestamps = list(small_workload().columns(7).timestamps)
+        assert timestamps == sorted(timestamps)
+
+    def test_seeded(self):
+        w = small_workload()
+        assert [describe(e) for e in w.columns(3)] == \
+            [describe(e) for e in w.columns(3)]
+        assert [describe(e) for e in w.columns(3)] != \
+            [describe(e) for e in w.columns(4)]
+
+    def test_rate_and_baskets(self):
+        columns = Workload(20000, rate=2, basket_mean=4,
+                           max_items=10).columns(0)
+        assert 9000 <= columns.timestamps[-1] <= 11000
+        sizes = [columns.item_offsets[i + 1] - columns.item_offsets[i]
+                 for i in range(len(columns))]
+        assert 1 <= min(sizes) and max(sizes) <= 10
+        assert 3.5 <= sum(sizes) / len(sizes) <= 4.5
+
+    def test_presets_have_store_configs(self):
+        for preset in PRESETS.values():
+            assert set(preset.store_config) == {
+                'regular_count', 'express_count', 'self_serve_count',
+                'line_capacity'}
+
+
+if __name__ == '__main__':
+    import pytest
+
+    pytest.main(['test_workload.py'])
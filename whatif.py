@@ -0,0 +1,152 @@
+"""Assignment 1 - Incremental What-If Simulations
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file re-runs variations of a base scenario without simulating the whole
+scenario again. The base scenario is run once, taking a snapshot of the
+simulation every few time units. A variation, such as the same day with a
+line closed later, only differs from the base scenario from the time of its
+first changed event, so it is continued from the last snapshot before that
+time, and only the rest of it is simulated.
+"""
+from __future__ import annotations
+
+import sys
+from operator import attrgetter
+from typing import TextIO
+
+from container import HeapPriorityQueue
+from event import Event, CustomerArrival
+from eventlog import describe
+from simulation import GroceryStoreSimulation
+from store import StoreTemplate
+
+# The number of snapshots taken over the events of a base scenario when no
+# interval is given.
+DEFAULT_SNAPSHOTS = 100
+
+
+class WhatIf:
+    """A base scenario that was run with snapshots, and that variations of
+    it can be run from.
+
+    Attributes:
+    - template: The configuration of the store.
+    - interval: The number of time units between snapshots.
+    - stats: The statistics of the base scenario.
+    - _base: The description of each event of the base scenario, in the
+      order they are handled.
+    - _snapshots: (time, snapshot) pairs, in order by time, where each
+      snapshot was taken once every event up to that time had been handled.
+      The first is taken before any event is handled, at time -1.
+
+    Representation Invariants:
+    - self.interval >= 1
+    - len(self._snapshots) >= 1
+    """
+
+    template: StoreTemplate
+    interval: int
+    stats: dict[str, int]
+    _base: list[tuple]
+    _snapshots: list[tuple[int, bytes]]
+
+    def __init__(self, store_file: TextIO, initial_events: list[Event],
+                 interval: int | None = None) -> None:
+        """Initialize a WhatIf by running the base scenario <initial_events>
+        in the store described by <store_file>, taking a snapshot every
+        <interval> time units, or DEFAULT_SNAPSHOTS over the times of the
+        events if <interval> is None.
+
+        Preconditions:
+        - the preconditions of GroceryStoreSimulation.__init__ and
+          GroceryStoreSimulation.run hold
+        - interval is None or interval >= 1
+        """
+        self.template = StoreTemplate(store_file)
+        ordered = sorted(initial_events, key=attrgetter('timestamp'))
+        if interval is None:
+            span = ordered[-1].timestamp - ordered[0].timestamp \
+                if ordered else 0
+            interval = span // DEFAULT_SNAPSHOTS + 1
+        self.interval = interval
+        self._base = [describe(event) for event in ordered]
+
+        sim = GroceryStoreSimulation(self.template)
+        sim.start([])
+        self._snapshots = [(-1, sim.snapshot())]
+        incoming = HeapPriorityQueue()
+        incoming.add_all(ordered)
+        time = (ordered[0].timestamp if ordered else 0) + interval - 1
+        while sim.has_events() or not incoming.is_empty():
+            if sim.advance(time, incoming) > 0:
+                self._snapshots.append((time, sim.snapshot()))
+            time += interval
+        sim.finish()
+        self.stats = sim.stats
+
+    def divergence(self, initial_events: list[Event]) -> int | None:
+        """Return the earliest time at which <initial_events> differs from
+        the base scenario, or None if it is the same."""
+        ordered = sorted(initial_events, key=attrgetter('timestamp'))
+        for base, event in zip(self._base, ordered):
+            if describe(event) != base:
+                return min(base[0], event.timestamp)
+        if len(ordered) > len(self._base):
+            return ordered[len(self._base)].timestamp
+        if len(ordered) < len(self._base):
+            return self._base[len(ordered)][0]
+        return None
+
+    def rerun(self, initial_events: list[Event]) \
+            -> tuple[GroceryStoreSimulation, int]:
+        """Run the variation <initial_events> of the base scenario, and
+        return the finished simulation and the time it was continued from.
+
+        The simulation gives the same statistics as running
+        <initial_events> from the start would. Only the events after the
+        time it was continued from are handled.
+
+        Precondition:
+        - the preconditions of GroceryStoreSimulation.run hold
+        """
+        start = self.divergence(initial_events)
+        if start is None:
+            start = sys.maxsize
+        # The last snapshot taken before the first changed event.
+        low, high = 0, len(self._snapshots) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._snapshots[middle][0] < start:
+                low = middle
+            else:
+                high = middle - 1
+        time, snapshot = self._snapshots[low]
+
+        customers = []
+        incoming = HeapPriorityQueue()
+        later = []
+        for event in sorted(initial_events, key=attrgetter('timestamp')):
+            if event.timestamp > time:
+                later.append(event)
+            elif isinstance(event, CustomerArrival):
+                customers.append(event.customer.name)
+        incoming.add_all(later)
+        sim = GroceryStoreSimulation.from_snapshot(snapshot, customers)
+        sim.advance(sys.maxsize, incoming)
+        sim.finish()
+        return sim, time
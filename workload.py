@@ -0,0 +1,305 @@
+"""Assignment 1 - Grocery Store Workloads
+
+CSC148 Winter 2024
+Department of Computer Science,
+University of Toronto
+
+This code is provided solely for the personal and private use of
+students taking the CSC148 course at the University of Toronto.
+Copying for purposes other than this use is expressly prohibited.
+All forms of distribution of this code, whether as given or with
+any changes, are expressly prohibited.
+
+All of the files in this directory are
+Copyright (c) Jonathan Calver, Diane Horton, Sophia Huynh, Joonho Kim and
+Jacqueline Smith.
+
+Module Description:
+
+This file generates synthetic event files for the grocery store simulation,
+with customers arriving at random and carrying random baskets. Workloads are
+seeded, so the same workload and seed always give the same events. Write a
+preset workload to a file with, for example:
+
+    python workload.py weekday events.txt --seed 1
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterator, TextIO
+
+from eventlog import EventColumns, ARRIVE, CLOSE
+
+# The items customers choose from, with the time each takes to check out.
+# Items are chosen with random bytes, so the number of items must divide 256.
+CATALOG = [('bananas', 7), ('bread', 3), ('cheese', 3), ('milk', 2),
+           ('eggs', 4), ('apples', 5), ('cereal', 2), ('chicken', 4),
+           ('flowers', 22), ('chips', 4), ('gum', 1), ('water', 6),
+           ('rice', 3), ('soup', 2), ('yogurt', 2), ('coffee', 3)]
+
+# Maps a random byte to the index in CATALOG of a random item.
+_ITEM_FROM_BYTE = bytes(i % len(CATALOG) for i in range(256))
+
+# Maps the index in CATALOG of an item to the time it takes to check out.
+_ITEM_TIMES = bytes(CATALOG[i % len(CATALOG)][1] for i in range(256))
+
+# The number of customers generated at a time.
+BATCH_SIZE = 1 << 16
+
+
+class Workload:
+    """A random stream of customers arriving at a grocery store.
+
+    Customers arrive as a Poisson process. If diurnal_amplitude is not 0,
+    the arrival rate rises and falls over each period like a sine wave:
+    at time t it is rate * (1 + diurnal_amplitude * sin(2 pi t / period)).
+
+    Each customer's basket size is geometrically distributed with mean
+    basket_mean, capped at max_items, and each item is chosen uniformly from
+    CATALOG.
+
+    Attributes:
+    - num_customers: The number of customers who arrive.
+    - rate: The mean number of customers arriving per unit of time.
+    - diurnal_amplitude: How much the arrival rate varies over a period, as
+      a fraction of rate.
+    - period: The length of one period of the arrival rate.
+    - basket_mean: The mean number of items in a basket.
+    - max_items: The largest number of items in a basket.
+    - closes: For each line that closes, the fraction of the expected
+      length of the workload at which it closes, and its line number.
+    - store_config: The store configuration this workload is meant for.
+
+    Representation Invariants:
+    - self.num_customers >= 0
+    - self.rate > 0
+    - 0 <= self.diurnal_amplitude <= 1
+    - self.period > 0
+    - 1 <= self.basket_mean <= self.max_items
+    """
+
+    num_customers: int
+    rate: float
+    diurnal_amplitude: float
+    period: float
+    basket_mean: float
+    max_items: int
+    closes: list[tuple[float, int]]
+    store_config: dict[str, int]
+
+    def __init__(self, num_customers: int, rate: float,
+                 basket_mean: float = 5, max_items: int = 40,
+                 diurnal_amplitude: float = 0, period: float = 86400,
+                 closes: list[tuple[float, int]] | None = None,
+                 store_config: dict[str, int] | None = None) -> None:
+        """Initialize a Workload with the given parameters.
+
+        If <store_config> is None, use a store with enough regular lines to
+        keep up with the mean arrival rate.
+        """
+        self.num_customers = num_customers
+        self.rate = rate
+        self.basket_mean = basket_mean
+        self.max_items = max_items
+        self.diurnal_amplitude = diurnal_amplitude
+        self.period = period
+        self.closes = [] if closes is None else closes
+        if store_config is None:
+            mean_item_time = sum(t for _, t in CATALOG) / len(CATALOG)
+            store_config = {
+                'regular_count': math.ceil(
+                    2 * rate * basket_mean * mean_item_time),
+                'express_count': 0, 'self_serve_count': 0,
+                'line_capacity': 10}
+        self.store_config = store_config
+
+    def _basket_weights(self) -> list[float]:
+        """Return the cumulative weights of basket sizes 1 to max_items."""
+        p = 1 / self.basket_mean
+        weights = [p * (1 - p) ** (k - 1) for k in range(1, self.max_items)]
+        weights.append(1 - sum(weights))
+        return list(accumulate(weights))
+
+    def _arrival_times(self, rng: random.Random,
+                       start: float, n: int) -> list[float]:
+        """Return the next <n> arrival times after <start>."""
+        peak = self.rate * (1 + self.diurnal_amplitude)
+        times = []
+        t = start
+        expovariate = rng.expovariate
+        if self.diurnal_amplitude == 0:
+            gaps = [expovariate(peak) for _ in range(n)]
+            return list(accumulate(gaps, initial=start))[1:]
+        # Thinning: draw arrivals at the peak rate, and keep each one with
+        # probability proportional to the arrival rate at that time.
+        scale = 2 * math.pi / self.period
+        amplitude = self.diurnal_amplitude
+        keep = 1 + amplitude
+        while len(times) < n:
+            t += expovariate(peak)
+            if rng.random() * keep <= 1 + amplitude * math.sin(scale * t):
+                times.append(t)
+        return times
+
+    def batches(self, seed: int) -> Iterator[EventColumns]:
+        """Yield the events of this workload, in timestamp order, as
+        EventColumns of up to BATCH_SIZE customers each (plus any lines that
+        close among them). Names are 'c' followed by the customer number.
+        """
+        for columns, _ in self._batches(seed):
+            yield columns
+
+    def _batches(self, seed: int) -> Iterator[tuple[EventColumns, bytes]]:
+        """Yield the batches of self.batches(seed), each with the index in
+        CATALOG of each of its items."""
+        rng = random.Random(seed)
+        sizes = range(1, self.max_items + 1)
+        cum_weights = self._basket_weights()
+        expected_length = self.num_customers / self.rate
+        closes = sorted((round(fraction * expected_length), line_number)
+                        for fraction, line_number in self.closes)
+        next_close = 0
+        t = 0.0
+        for first in range(0, self.num_customers, BATCH_SIZE):
+            n = min(BATCH_SIZE, self.num_customers - first)
+            times = self._arrival_times(rng, t, n)
+            t = times[-1]
+            baskets = rng.choices(sizes, cum_weights=cum_weights, k=n)
+            items = rng.randbytes(sum(baskets)).translate(_ITEM_FROM_BYTE)
+            timestamps = list(map(int, times))
+            item_ends = list(accumulate(baskets))
+            names = [f'c{i}' for i in range(first, first + n)]
+            columns = EventColumns()
+            start = 0
+            while next_close < len(closes) and \
+                    closes[next_close][0] < timestamps[-1]:
+                # The line closes after every arrival up to its close time.
+                end = bisect_right(timestamps, closes[next_close][0])
+                _add_arrivals(columns, timestamps[start:end], names[start:end],
+                              item_ends[start:end])
+                _add_close(columns, *closes[next_close])
+                start = end
+                next_close += 1
+            _add_arrivals(columns, timestamps[start:], names[start:],
+                          item_ends[start:])
+            columns.item_times = array('i', list(items.translate(_ITEM_TIMES)))
+            yield columns, items
+        if next_close < len(closes):
+            columns = EventColumns()
+            for close in closes[next_close:]:
+                _add_close(columns, *close)
+            yield columns, b''
+
+    def columns(self, seed: int) -> EventColumns:
+        """Return all the events of this workload as one EventColumns."""
+        everything = EventColumns()
+        for batch in self.batches(seed):
+            offset = everything.item_offsets[-1]
+            everything.timestamps.extend(batch.timestamps)
+            everything.kinds.extend(batch.kinds)
+            everything.names.extend(batch.names)
+            everything.line_numbers.extend(batch.line_numbers)
+            everything.item_offsets.extend(
+                offset + o for o in batch.item_offsets[1:])
+            everything.item_times.extend(batch.item_times)
+        return everything
+
+    def write(self, out: TextIO, seed: int) -> int:
+        """Write the events of this workload to <out> in the event file
+        format, and return the number of events written."""
+        items = [f'{name} {time}' for name, time in CATALOG]
+        written = 0
+        for batch, chosen in self._batches(seed):
+            lines = []
+            for i in range(len(batch)):
+                if batch.kinds[i] == CLOSE:
+                    lines.append(f'{batch.timestamps[i]} Close '
+                                 f'{batch.line_numbers[i]}\n')
+                    continue
+                start = batch.item_offsets[i]
+                end = batch.item_offsets[i + 1]
+                lines.append(f'{batch.timestamps[i]} Arrive {batch.names[i]} '
+                             + ' '.join([items[k] for k in chosen[start:end]])
+                             + '\n')
+            out.write(''.join(lines))
+            written += len(lines)
+        return written
+
+
+def _add_arrivals(columns: EventColumns, timestamps: list[int],
+                  names: list[str], item_ends: list[int]) -> None:
+    """Add ARRIVE events to <columns> for customers with the given <names>
+    arriving at <timestamps>, whose items end at <item_ends> in the items of
+    the batch."""
+    columns.timestamps.extend(timestamps)
+    columns.kinds.extend(bytes([ARRIVE]) * len(timestamps))
+    columns.names.extend(names)
+    columns.line_numbers.extend(array('i', [-1]) * len(timestamps))
+    columns.item_offsets.extend(item_ends)
+
+
+def _add_close(columns: EventColumns, timestamp: int,
+               line_number: int) -> None:
+    """Add a CLOSE event for <line_number> at <timestamp> to <columns>."""
+    columns.timestamps.append(timestamp)
+    columns.kinds.append(CLOSE)
+    columns.names.append('')
+    columns.line_numbers.append(line_number)
+    columns.item_offsets.append(columns.item_offsets[-1])
+
+
+# Standard workloads for benchmarking, from small to large.
+PRESETS = {
+    'small': Workload(10 ** 4, rate=0.05, basket_mean=8,
+                      closes=[(0.5, 0)],
+                      store_config={'regular_count': 3, 'express_count': 2,
+                                    'self_serve_count': 4,
+                                    'line_capacity': 10}),
+    'weekday': Workload(10 ** 5, rate=0.2, basket_mean=10,
+                        diurnal_amplitude=0.8, period=43200,
+                        closes=[(0.4, 0), (0.8, 1)],
+                        store_config={'regular_count': 12,
+                                      'express_count': 4,
+                                      'self_serve_count': 8,
+                                      'line_capacity': 8}),
+    'rush': Workload(10 ** 5, rate=0.5, basket_mean=6,
+                     store_config={'regular_count': 12, 'express_count': 6,
+                                   'self_serve_count': 12,
+                                   'line_capacity': 5}),
+    'big_box': Workload(10 ** 6, rate=2, basket_mean=15, max_items=80,
+                        diurnal_amplitude=0.5, period=86400,
+                        store_config={'regular_count': 150,
+                                      'express_count': 30,
+                                      'self_serve_count': 60,
+                                      'line_capacity': 12}),
+    'huge': Workload(10 ** 7, rate=10, basket_mean=5,
+                     store_config={'regular_count': 300,
+                                   'express_count': 100,
+                                   'self_serve_count': 200,
+                                   'line_capacity': 10}),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Write the preset workload named by the command line arguments
+    <argv> to an event file."""
+    parser = argparse.ArgumentParser(
+        description='Write a synthetic grocery store event file.')
+    parser.add_argument('preset', choices=sorted(PRESETS))
+    parser.add_argument('out')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with open(args.out, 'w') as out:
+        written = PRESETS[args.preset].write(out, args.seed)
+    print(f'wrote {written} events; store config: '
+          f'{PRESETS[args.preset].store_config}')
+
+
+if __name__ == '__main__':
+    main()